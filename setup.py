@@ -13,8 +13,10 @@ setup(
     py_modules=[splitext(basename(path))[0] for path in glob('src/*.py')],
     include_package_data=True,
     zip_safe=False,
+    python_requires=">=3.9",
     install_requires=[
         'pyglet',
+        'numpy',
         "pytest",
         "tox"
     ]
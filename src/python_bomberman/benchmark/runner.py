@@ -0,0 +1,156 @@
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+from python_bomberman.benchmark.scenarios import SCENARIOS
+
+# metrics compared against a baseline, and whether a bigger number is better
+METRICS = {
+    "ticks_per_second": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "alloc_kib_per_tick": False
+}
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction (0-1) of the sorted values, using the nearest rank.
+    :param values:
+    :param fraction:
+    :return:
+    """
+    ordered = sorted(values)
+    rank = min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)
+    return ordered[rank]
+
+
+def run(scenario, ticks=600, warmup=60, allocation_ticks=100):
+    """
+    Runs a scenario and returns its measurements.
+
+    Latency is measured with tracemalloc off.  Allocations are then measured over a separate run of
+    'allocation_ticks' ticks (continuing on from the timed ones), as the peak memory traced during
+    each tick over what was in use when it started.
+    :param scenario:
+    :param ticks:
+    :param warmup:
+    :param allocation_ticks:
+    :return:
+    """
+    scenario.setup()
+    tick = 0
+    for _ in range(0, warmup):
+        scenario.prepare(tick)
+        scenario.tick()
+        tick += 1
+
+    latencies = []
+    for _ in range(0, ticks):
+        scenario.prepare(tick)
+        start = time.perf_counter_ns()
+        scenario.tick()
+        latencies.append(time.perf_counter_ns() - start)
+        tick += 1
+
+    allocated = 0
+    if allocation_ticks:
+        tracemalloc.start()
+        try:
+            for _ in range(0, allocation_ticks):
+                scenario.prepare(tick)
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                scenario.tick()
+                _, peak = tracemalloc.get_traced_memory()
+                allocated += peak - before
+                tick += 1
+        finally:
+            tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "scenario": scenario.name,
+        "ticks": ticks,
+        "ticks_per_second": len(latencies) / (total / 1e9) if total else float("inf"),
+        "mean_ms": total / len(latencies) / 1e6,
+        "p50_ms": percentile(latencies, .5) / 1e6,
+        "p99_ms": percentile(latencies, .99) / 1e6,
+        "alloc_kib_per_tick": allocated / allocation_ticks / 1024 if allocation_ticks else 0.0
+    }
+
+
+def compare(results, baseline, tolerance=.1):
+    """
+    Compares results against a baseline (both lists of run() results).  Returns a list of
+    (scenario, metric, baseline value, current value, relative change, regressed) tuples, where
+    'regressed' is set when a metric got worse by more than the tolerance.
+    :param results:
+    :param baseline:
+    :param tolerance:
+    :return:
+    """
+    baseline = {result["scenario"]: result for result in baseline}
+    comparisons = []
+    for result in results:
+        previous = baseline.get(result["scenario"])
+        if previous is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in previous:
+                continue
+            old, new = previous[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            regressed = (-change if higher_is_better else change) > tolerance
+            comparisons.append((result["scenario"], metric, old, new, change, regressed))
+    return comparisons
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Runs the game engine benchmarks.")
+    parser.add_argument(
+        "scenarios", nargs="*", help="scenarios to run (default: all of {})".format(", ".join(sorted(SCENARIOS)))
+    )
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--allocation-ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write the results to a baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=.1, help="allowed relative regression (default: 0.1)")
+    args = parser.parse_args(args)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario: {}".format(name))
+
+    results = []
+    for name in args.scenarios or sorted(SCENARIOS):
+        result = run(SCENARIOS[name](seed=args.seed), args.ticks, args.warmup, args.allocation_ticks)
+        results.append(result)
+        print(
+            "{scenario:<16} {ticks_per_second:>10.1f} ticks/s  p50 {p50_ms:>8.3f} ms  p99 {p99_ms:>8.3f} ms  "
+            "{alloc_kib_per_tick:>9.1f} KiB/tick".format(**result)
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        for scenario, metric, old, new, change, metric_regressed in compare(results, baseline, args.tolerance):
+            regressed = regressed or metric_regressed
+            print("{:<16} {:<20} {:>10.3f} -> {:>10.3f} ({:+.1%}){}".format(
+                scenario, metric, old, new, change, "  REGRESSED" if metric_regressed else ""
+            ))
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import json
+import numpy
+import random
+from python_bomberman.common import protocol
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player, Bomb
+from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.tasks import DetonationTask
+import python_bomberman.common.map as map
+from python_bomberman.common.map import arena_map
+from python_bomberman.common.utils import Coordinate
+
+
+class Scenario(object):
+    """
+    A reproducible workload.  setup() builds the initial state, then for every tick the runner calls
+    prepare() (untimed - used to issue player actions and the like) followed by tick() (timed).
+    """
+    name = None
+    description = None
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.random = None
+        self.game = None
+
+    def setup(self):
+        self.random = random.Random(self.seed)
+        self.game = self.build()
+
+    def build(self):
+        raise GameException.method_unimplemented(self.__class__, "build")
+
+    def prepare(self, tick):
+        pass
+
+    def tick(self):
+        self.game.process()
+
+
+class BotScenario(Scenario):
+    """
+    Players wander around at random, dropping bombs as they go.  Players that get blown up respawn
+    on a random empty space so the population (and so the workload) stays steady.
+    """
+    dimensions = None
+    destructible_ratio = .5
+    players = 4
+    move_chance = .5
+    bomb_chance = .1
+
+    def build(self):
+        game_map = arena_map(self.dimensions, self.destructible_ratio, self.players, self.seed)
+        return Game(game_map, clock=FastForwardClock())
+
+    def prepare(self, tick):
+        for _ in range(len(self.game.entities.of_type(Player)), self.players):
+            location = Coordinate(
+                self.random.randrange(0, self.dimensions.x, 2), self.random.randrange(0, self.dimensions.y, 2)
+            )
+            space = self.game.board.get(location)
+            if space.entity is None and not space.has_fire():
+                self.game.add(Player(location))
+
+        for player in list(self.game.entities.of_type(Player)):
+            if player.destroyed or player.moving:
+                continue
+            if self.random.random() < self.bomb_chance:
+                self.game.drop_bomb(player)
+            if self.random.random() < self.move_chance:
+                self.game.move(player, self.random.choice(MovementDirection.all_directions()), 1)
+
+
+class EmptyArenaScenario(BotScenario):
+    name = "empty_arena"
+    description = "15x13 arena with pillars only, 4 bots"
+    dimensions = Coordinate(15, 13)
+    destructible_ratio = 0
+
+
+class MazeScenario(BotScenario):
+    name = "maze_256"
+    description = "256x256 arena, 40% destructible walls, 16 bots"
+    dimensions = Coordinate(256, 256)
+    destructible_ratio = .4
+    players = 16
+
+
+class BombSpamScenario(BotScenario):
+    name = "bomb_spam_64"
+    description = "64x64 arena, 64 bots dropping bombs whenever they can"
+    dimensions = Coordinate(64, 64)
+    destructible_ratio = .2
+    players = 64
+    bomb_chance = 1
+
+
+class ChainReactionScenario(Scenario):
+    """
+    A lattice of bombs covering the whole board, close enough together that setting off one sets
+    off all of them.  The lattice is replanted whenever it's gone.
+    """
+    name = "chain_reaction"
+    description = "64x64 board covered in bombs that all go off together"
+    dimensions = Coordinate(64, 64)
+    fuse = .5
+
+    def build(self):
+        game = Game(map.Map(self.dimensions), clock=FastForwardClock())
+        self.owner = game.add(Player(Coordinate(1, 1)))
+        return game
+
+    def prepare(self, tick):
+        if len(self.game.tasks.tasks(DetonationTask)):
+            return
+        for x in range(0, self.dimensions.x, 2):
+            for y in range(0, self.dimensions.y, 2):
+                space = self.game.board.get(Coordinate(x, y))
+                if space.bomb is None:
+                    # only the first bomb has a short fuse - the rest are set off by it.
+                    bomb = self.game.add(Bomb(space.location, radius=3, duration=self.fuse if x == y == 0 else 60))
+                    self.game.tasks.register_detonation_task(bomb, self.owner)
+
+
+class BoardGetScenario(Scenario):
+    name = "board_get"
+    description = "10,000 single-step Board.get calls on a 15x13 arena"
+    calls = 10000
+
+    def build(self):
+        game = Game(arena_map(Coordinate(15, 13), .5, 4, self.seed), clock=FastForwardClock())
+        self.calls = [
+            (Coordinate(self.random.randrange(15), self.random.randrange(13)), self.random.randrange(4))
+            for _ in range(0, self.calls)
+        ]
+        return game
+
+    def tick(self):
+        get = self.game.board.get
+        for location, direction in self.calls:
+            get(location, direction, 1)
+
+
+class BlastRadiusScenario(Scenario):
+    name = "blast_radius"
+    description = "1,000 Board.blast_radius calls (radius 3) on a 15x13 arena"
+    calls = 1000
+
+    def build(self):
+        game = Game(arena_map(Coordinate(15, 13), .5, 4, self.seed), clock=FastForwardClock())
+        self.calls = [Coordinate(self.random.randrange(15), self.random.randrange(13)) for _ in range(0, self.calls)]
+        return game
+
+    def tick(self):
+        blast_radius = self.game.board.blast_radius
+        for location in self.calls:
+            blast_radius(location, 3)
+
+
+class ForkScenario(Scenario):
+    name = "fork"
+    description = "100 Game.fork calls on a 15x13 arena"
+    calls = 100
+
+    def build(self):
+        return Game(arena_map(Coordinate(15, 13), .5, 4, self.seed), clock=FastForwardClock())
+
+    def tick(self):
+        for _ in range(0, self.calls):
+            self.game.fork()
+
+
+class BatchScenario(Scenario):
+    name = "batch_256"
+    description = "256 15x13 arenas stepped in lockstep by BatchGame, 4 random players each"
+    games = 256
+
+    def build(self):
+        self.actions = None
+        self.numpy_random = numpy.random.default_rng(self.seed)
+        return batch.BatchGame([arena_map(Coordinate(15, 13), .5, 4, self.seed + game) for game in range(self.games)])
+
+    def prepare(self, tick):
+        self.actions = self.numpy_random.integers(batch.NOOP, batch.DROP_BOMB + 1, size=self.game.present.shape)
+
+    def tick(self):
+        self.game.step(self.actions)
+
+
+class StateBinaryScenario(BombSpamScenario):
+    name = "state_binary"
+    description = "encoding the full state of bomb_spam_64 with the binary protocol"
+
+    def build(self):
+        self.encoder = protocol.Encoder()
+        self.state = None
+        return super().build()
+
+    def prepare(self, tick):
+        # the game itself runs untimed - only encoding its state is measured
+        super().prepare(tick)
+        self.game.process()
+        self.state = protocol.State(tick, self.game.clock.now, protocol.entity_states(self.game))
+
+    def tick(self):
+        self.encoder.encode(self.state)
+
+
+class StateJsonScenario(StateBinaryScenario):
+    name = "state_json"
+    description = "encoding the full state of bomb_spam_64 as JSON, for comparison with state_binary"
+
+    def tick(self):
+        json.dumps({
+            "tick": self.state.tick,
+            "time": self.state.time,
+            "entities": [entity._asdict() for entity in self.state.entities]
+        }).encode("utf-8")
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        EmptyArenaScenario,
+        MazeScenario,
+        BombSpamScenario,
+        ChainReactionScenario,
+        BoardGetScenario,
+        BlastRadiusScenario,
+        ForkScenario,
+        BatchScenario,
+        StateBinaryScenario,
+        StateJsonScenario
+    ]
+}
@@ -0,0 +1,233 @@
+import numpy
+from python_bomberman.common.game.board import Board, BoardSpace
+from python_bomberman.common.game.exceptions import GameException
+import python_bomberman.common.utils as utils
+
+# each board space can hold one entity per layer - these are the bits used for each
+# layer in the occupancy and destroyed masks.
+ENTITY_LAYER = 1
+BOMB_LAYER = 2
+FIRE_LAYER = 4
+MODIFIER_LAYER = 8
+
+# maps BoardSpace attribute names to (layer bit, index into the entity handle grid)
+LAYERS = {
+    "entity": (ENTITY_LAYER, 0),
+    "bomb": (BOMB_LAYER, 1),
+    "fire": (FIRE_LAYER, 2),
+    "modifier": (MODIFIER_LAYER, 3)
+}
+
+EMPTY = -1
+
+
+class ArrayBoard(Board):
+    """
+    A board backed by NumPy arrays instead of a grid of BoardSpace objects.
+
+    Every space is described by:
+        - a bit per layer in the occupancy mask, set while an entity sits on that layer
+        - a bit per layer in the destroyed mask, set while that entity is flagged as destroyed
+        - a bit in the indestructible mask if its entity can't be destroyed
+        - an integer handle per layer referring to the entity itself
+
+    This makes whole-board questions ('where is there fire?') single array operations.
+    get() still works, returning a lightweight ArrayBoardSpace view for the requested location.
+
+    Destroyed state is only tracked for entities destroyed through ArrayBoard.destroy.
+    """
+    def __init__(self, dimensions, tables=None):
+        self.dimensions = dimensions
+        self.listeners = []
+        shape = (dimensions.x, dimensions.y)
+        self.occupancy = numpy.zeros(shape, dtype=numpy.uint8)
+        self.destroyed = numpy.zeros(shape, dtype=numpy.uint8)
+        self.indestructible = numpy.zeros(shape, dtype=bool)
+        self.handles = numpy.full((len(LAYERS),) + shape, EMPTY, dtype=numpy.int32)
+        self._entities = []
+        self._free_handles = []
+        # array boards never build locations (see space_at), so only the neighbor tables are shared
+        self._build_tables(tables[0] if tables is not None else None)
+        self._build_blast_cache()
+        self._build_chunks()
+
+        # flat views sharing memory with the masks above, addressed by flat index
+        self._flat_occupancy = self.occupancy.ravel()
+        self._flat_destroyed = self.destroyed.ravel()
+        self._flat_indestructible = self.indestructible.ravel()
+
+    def _tables(self):
+        return self._neighbors, None
+
+    def space_at(self, index):
+        return ArrayBoardSpace(self, divmod(index, self.dimensions.y))
+
+    def _blocks_blast(self, index):
+        live = self._flat_occupancy[index] & ~self._flat_destroyed[index]
+        return bool(live & BOMB_LAYER or (live & ENTITY_LAYER and self._flat_indestructible[index]))
+
+    def add_all(self, entities):
+        """
+        Adds many entities at once, filling in each layer with a handful of array operations.
+        Every entity is checked before anything is added.
+        :param entities:
+        :return:
+        """
+        by_attr = {}
+        for entity in entities:
+            by_attr.setdefault(BoardSpace._entity_to_attribute(entity), []).append(entity)
+
+        layers = []
+        for attr, group in by_attr.items():
+            locations = numpy.array([entity.logical_location for entity in group], dtype=numpy.int64).reshape(-1, 2)
+            out_of_bounds = ((locations < 0) | (locations >= self.dimensions)).any(axis=1)
+            if out_of_bounds.any():
+                raise GameException.location_invalid(group[int(numpy.flatnonzero(out_of_bounds)[0])].logical_location)
+
+            layer, index = LAYERS[attr]
+            flat = locations[:, 0] * self.dimensions.y + locations[:, 1]
+            taken = (self._flat_occupancy[flat] & layer) != 0
+            _, first = numpy.unique(flat, return_index=True)
+            duplicate = numpy.ones(len(flat), dtype=bool)
+            duplicate[first] = False
+            if (taken | duplicate).any():
+                raise GameException.entity_at_location_exists(group[int(numpy.flatnonzero(taken | duplicate)[0])])
+            layers.append((attr, group, flat))
+
+        for attr, group, flat in layers:
+            layer, index = LAYERS[attr]
+            handles = numpy.arange(len(self._entities), len(self._entities) + len(group), dtype=numpy.int32)
+            self._entities.extend(group)
+            self.handles[index].ravel()[flat] = handles
+            self._flat_occupancy[flat] |= layer
+            destroyed = numpy.array([entity.destroyed for entity in group], dtype=bool)
+            self._flat_destroyed[flat[destroyed]] |= layer
+            if attr == "entity":
+                self._flat_indestructible[flat] = [not entity.can_destroy for entity in group]
+
+        self._touch_all()
+        for listener in self.listeners:
+            listener.entities_added(entities)
+
+    def destroy(self, entity):
+        super().destroy(entity)
+        layer, index = LAYERS[BoardSpace._entity_to_attribute(entity)]
+        location = entity.logical_location
+        if self._entity_at(index, location) is entity:
+            self.destroyed[location] |= layer
+
+    def all_entities(self):
+        return [entity for entity in self._entities if entity is not None]
+
+    def live(self, layer):
+        """
+        Returns a boolean array flagging every space with a non-destroyed entity in the given layer(s).
+        :param layer:
+        :return:
+        """
+        return (self.occupancy & ~self.destroyed & layer) != 0
+
+    def blockers(self):
+        """
+        Returns a boolean array flagging every space that will stop the spread of a bomb blast.
+        :return:
+        """
+        return (self.indestructible & self.live(ENTITY_LAYER)) | self.live(BOMB_LAYER)
+
+    def _entity_at(self, index, location):
+        handle = self.handles[index][location]
+        return self._entities[handle] if handle != EMPTY else None
+
+    def _place(self, entity, attr, location):
+        layer, index = LAYERS[attr]
+        if self._free_handles:
+            handle = self._free_handles.pop()
+            self._entities[handle] = entity
+        else:
+            handle = len(self._entities)
+            self._entities.append(entity)
+
+        self.handles[index][location] = handle
+        self.occupancy[location] |= layer
+        if entity.destroyed:
+            self.destroyed[location] |= layer
+        if attr == "entity":
+            self.indestructible[location] = not entity.can_destroy
+
+    def _displace(self, attr, location):
+        layer, index = LAYERS[attr]
+        handle = self.handles[index][location]
+        self._entities[handle] = None
+        self._free_handles.append(handle)
+
+        self.handles[index][location] = EMPTY
+        self.occupancy[location] &= ~numpy.uint8(layer)
+        self.destroyed[location] &= ~numpy.uint8(layer)
+        if attr == "entity":
+            self.indestructible[location] = False
+
+
+class ArrayBoardSpace(BoardSpace):
+    """
+    A view of a single location on an ArrayBoard with the same interface as a BoardSpace.
+    """
+    def __init__(self, board, location):
+        self.board = board
+        self.location = utils.Coordinate(*location)
+
+    @property
+    def entity(self):
+        return self.board._entity_at(0, self.location)
+
+    @property
+    def bomb(self):
+        return self.board._entity_at(1, self.location)
+
+    @property
+    def fire(self):
+        return self.board._entity_at(2, self.location)
+
+    @property
+    def modifier(self):
+        return self.board._entity_at(3, self.location)
+
+    def add(self, entity):
+        attr = self._entity_to_attribute(entity)
+        if self._present(LAYERS[attr][0]):
+            raise GameException.entity_at_location_exists(entity)
+        self.board._place(entity, attr, self.location)
+
+    def remove(self, entity):
+        attr = self._entity_to_attribute(entity)
+        found_entity = getattr(self, attr)
+        if found_entity is None:
+            raise GameException.entity_at_location_doesnt_exist(entity)
+        if found_entity != entity:
+            raise GameException.entity_to_remove_doesnt_match(entity, found_entity)
+        self.board._displace(attr, self.location)
+
+    def occupied(self, entity):
+        return self._live(LAYERS[self._entity_to_attribute(entity)][0])
+
+    def vacant(self, entity):
+        return not self._present(LAYERS[self._entity_to_attribute(entity)][0])
+
+    def has_modifier(self):
+        return self._live(MODIFIER_LAYER)
+
+    def has_fire(self):
+        return self._live(FIRE_LAYER)
+
+    def has_bomb(self):
+        return self._live(BOMB_LAYER)
+
+    def has_indestructible_entity(self):
+        return (
+            bool(self.board.indestructible[self.location]) and self._live(ENTITY_LAYER)
+        ) or self._live(BOMB_LAYER)
+
+    def _present(self, layer):
+        return bool(self.board.occupancy[self.location] & layer)
+
+    def _live(self, layer):
+        return bool(self.board.occupancy[self.location] & ~self.board.destroyed[self.location] & layer)
@@ -0,0 +1,342 @@
+import numpy
+from python_bomberman.common.game.constants import MovementDirection, GameAction
+from python_bomberman.common.game.exceptions import GameException
+import python_bomberman.common.game.entities as entities
+import python_bomberman.common.map as map
+import python_bomberman.common.utils as utils
+
+# what can be in each space of the wall layer
+NO_WALL = 0
+DESTRUCTIBLE_WALL = 1
+INDESTRUCTIBLE_WALL = 2
+
+# what can be in each space of the modifier layer
+NO_MODIFIER = 0
+BOMB_MODIFIER = 1
+BOMB_RADIUS_MODIFIER = 2
+MOVEMENT_SPEED_MODIFIER = 3
+
+# the actions a player can take in a step - moves are MovementDirection + 1
+NOOP = 0
+MOVE_UP = MovementDirection.UP + 1
+MOVE_DOWN = MovementDirection.DOWN + 1
+MOVE_LEFT = MovementDirection.LEFT + 1
+MOVE_RIGHT = MovementDirection.RIGHT + 1
+DROP_BOMB = 5
+
+_origin = utils.Coordinate(0, 0)
+_player = entities.Player(_origin)
+BOMB_DURATION = entities.Bomb(_origin, radius=0).duration
+FIRE_DURATION = entities.Fire(_origin).duration
+MODIFIER_AMOUNTS = {
+    BOMB_MODIFIER: entities.BombModifier(_origin).amount,
+    BOMB_RADIUS_MODIFIER: entities.BombRadiusModifier(_origin).amount,
+    MOVEMENT_SPEED_MODIFIER: entities.MovementSpeedModifier(_origin).amount
+}
+
+# unit offsets for each direction, indexed by direction
+_VECTORS = numpy.array([MovementDirection.VECTORS[direction] for direction in MovementDirection.all_directions()])
+
+
+def game_action(action, unique_id, moving):
+    """
+    Converts a single action into the equivalent action for Game.step, or None if it doesn't do
+    anything (including moves for a player that's already moving).
+    :param action:
+    :param unique_id:
+    :param moving: whether the player is moving
+    :return:
+    """
+    if action == DROP_BOMB:
+        return GameAction.DROP_BOMB, unique_id
+    if MOVE_UP <= action <= MOVE_RIGHT and not moving:
+        return GameAction.MOVE, unique_id, int(action) - 1, 1
+    return None
+
+
+class BatchGame(object):
+    """
+    Runs many games of the same size in lockstep, with the state of every game held in NumPy arrays
+    with a leading game axis.
+
+    Board layers are (games, width, height) arrays:
+        - walls: NO_WALL, DESTRUCTIBLE_WALL or INDESTRUCTIBLE_WALL
+        - modifiers: NO_MODIFIER or one of the *_MODIFIER types
+        - bombs / fires: whether there's a bomb / fire, with their deadlines (and for bombs, their
+          radius, owner and the order they were dropped in) alongside
+
+    Players are (games, players) arrays, in the order the players appear in each game's map.  Games
+    with fewer players than the others are padded with players that aren't 'present'.
+
+    step() takes a (games, players) array of actions and advances every game by one tick, following
+    the same rules in the same order as Game.step/Game.process - a game run here ends up in exactly
+    the state it would be in as a Game fed the equivalent actions (see game_actions).  Almost all of
+    the work is done for every game at once; the exceptions are starting moves (looped over player
+    index, since players moving in the same tick can get in each other's way) and resolving
+    explosions (looped over the games that have any, since chain reactions are sequential).
+
+    Unlike Game.move, a move action for a player that's already moving is ignored, and every move
+    is a single space.
+    """
+    def __init__(self, game_maps, step=1 / 60):
+        dimensions = game_maps[0].dimensions
+        for game_map in game_maps:
+            if game_map.dimensions != dimensions:
+                raise GameException.batch_dimensions_mismatch(dimensions, game_map.dimensions)
+
+        self.dimensions = dimensions
+        self.step_size = step
+        self.now = 0.0
+        self.last_update = None
+        self._sequence = 0
+
+        players = [
+            [obj.location for obj in game_map.all_objects() if isinstance(obj, map.Player)] for game_map in game_maps
+        ]
+        shape = (len(game_maps), dimensions.x, dimensions.y)
+        player_shape = (len(game_maps), max(len(locations) for locations in players))
+
+        self.walls = numpy.zeros(shape, dtype=numpy.int8)
+        self.modifiers = numpy.zeros(shape, dtype=numpy.int8)
+        self.bombs = numpy.zeros(shape, dtype=bool)
+        self.bomb_deadlines = numpy.full(shape, numpy.inf)
+        self.bomb_radii = numpy.zeros(shape, dtype=numpy.int64)
+        self.bomb_owners = numpy.full(shape, -1, dtype=numpy.int64)
+        self.bomb_sequences = numpy.zeros(shape, dtype=numpy.int64)
+        self.fires = numpy.zeros(shape, dtype=bool)
+        self.fire_deadlines = numpy.full(shape, numpy.inf)
+
+        self.present = numpy.zeros(player_shape, dtype=bool)
+        self.destroyed = numpy.zeros(player_shape, dtype=bool)
+        self.x = numpy.zeros(player_shape, dtype=numpy.int64)
+        self.y = numpy.zeros(player_shape, dtype=numpy.int64)
+        self.physical_x = numpy.zeros(player_shape)
+        self.physical_y = numpy.zeros(player_shape)
+        self.moving = numpy.zeros(player_shape, dtype=bool)
+        self.direction = numpy.zeros(player_shape, dtype=numpy.int64)
+        self.remaining = numpy.zeros(player_shape)
+        self.movement_speed = numpy.full(player_shape, float(_player.movement_speed))
+        self.player_bombs = numpy.full(player_shape, _player.bombs, dtype=numpy.int64)
+        self.player_bomb_radius = numpy.full(player_shape, _player.bomb_radius, dtype=numpy.int64)
+
+        # bombs and fires that have been added, but whose timers haven't started yet
+        self._unstarted_bombs = numpy.zeros(shape, dtype=bool)
+        self._unstarted_fires = numpy.zeros(shape, dtype=bool)
+
+        # which spaces hold a player (used to check whether a player can move into a space)
+        self._occupied = numpy.zeros(shape, dtype=bool)
+
+        for game, game_map in enumerate(game_maps):
+            for obj in game_map.all_objects():
+                if isinstance(obj, map.IndestructibleWall):
+                    self.walls[(game,) + tuple(obj.location)] = INDESTRUCTIBLE_WALL
+                elif isinstance(obj, map.DestructibleWall):
+                    self.walls[(game,) + tuple(obj.location)] = DESTRUCTIBLE_WALL
+            for player, location in enumerate(players[game]):
+                self.present[game, player] = True
+                self.x[game, player], self.y[game, player] = location
+                self._occupied[(game,) + tuple(location)] = True
+        self.physical_x[:] = self.x
+        self.physical_y[:] = self.y
+
+        # neighbor tables (as in Board) for walking blasts
+        width, height = dimensions
+        indices = numpy.arange(width * height)
+        xs, ys = numpy.divmod(indices, height)
+        self._neighbors = [
+            (((xs + offset_x) % width) * height + (ys + offset_y) % height).tolist() for offset_x, offset_y in _VECTORS
+        ]
+
+    def __len__(self):
+        return len(self.walls)
+
+    def game_actions(self, game, actions, player_ids):
+        """
+        Converts one game's row of actions into the equivalent actions for Game.step, given the entity
+        ids of the game's players (in map order).  Should be called before the actions are stepped.
+        :param game:
+        :param actions:
+        :param player_ids:
+        :return:
+        """
+        converted = [
+            game_action(action, unique_id, self.moving[game, player])
+            for player, (action, unique_id) in enumerate(zip(actions, player_ids))
+        ]
+        return [action for action in converted if action is not None]
+
+    def step(self, actions, dt=None):
+        """
+        Applies a (games, players) array of actions, then advances every game by one tick.
+        :param actions:
+        :param dt:
+        :return:
+        """
+        actions = numpy.asarray(actions)
+        self._drop_bombs(actions == DROP_BOMB)
+        moves = (actions >= MOVE_UP) & (actions <= MOVE_RIGHT) & self.present & ~self.moving
+
+        now = self.now = self.now + (self.step_size if dt is None else dt)
+
+        # these follow the phases of TaskManager.run
+        self._run_movement(now)
+        self._start(now, moves, actions - 1)
+        expired = self._run_timers(now)
+        self._resolve(expired)
+        self._remove_destroyed()
+
+    def _drop_bombs(self, drop):
+        games = numpy.arange(len(self))[:, None]
+        drop &= self.present & ~self.moving & (self.player_bombs > 0) & ~self.bombs[games, self.x, self.y]
+        games, players = numpy.nonzero(drop)
+        location = (games, self.x[games, players], self.y[games, players])
+
+        self.bombs[location] = True
+        self.bomb_radii[location] = self.player_bomb_radius[games, players]
+        self.bomb_owners[location] = players
+        self.bomb_sequences[location] = numpy.arange(self._sequence, self._sequence + len(games))
+        self._sequence += len(games)
+        self._unstarted_bombs[location] = True
+        self.player_bombs[games, players] -= 1
+
+    def _run_movement(self, now):
+        elapsed = 0.0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+        if elapsed <= 0 or not self.moving.any():
+            return
+
+        # the same arithmetic MovementIntegrator does, for every moving player
+        moving = self.moving
+        travelled = self.movement_speed * elapsed
+        vectors = _VECTORS[self.direction].astype(numpy.float64)
+        self.remaining = numpy.where(moving, self.remaining - travelled, self.remaining)
+        for physical, vector, dimension in [
+            (self.physical_x, vectors[..., 0], self.dimensions.x),
+            (self.physical_y, vectors[..., 1], self.dimensions.y)
+        ]:
+            position = numpy.where(moving, physical + vector * travelled, physical)
+            position = numpy.where(position < -.5, position + dimension, position)
+            physical[:] = numpy.where(position > dimension - .5, position - dimension, position)
+
+        games, players = numpy.nonzero(moving & (self.remaining <= 0))
+        if not len(games):
+            return
+        self.moving[games, players] = False
+        x, y = self.x[games, players], self.y[games, players]
+        self.physical_x[games, players] = x
+        self.physical_y[games, players] = y
+
+        modifiers = self.modifiers[games, x, y]
+        for modifier, attribute in [
+            (BOMB_MODIFIER, self.player_bombs),
+            (BOMB_RADIUS_MODIFIER, self.player_bomb_radius),
+            (MOVEMENT_SPEED_MODIFIER, self.movement_speed)
+        ]:
+            picked_up = modifiers == modifier
+            attribute[games[picked_up], players[picked_up]] += MODIFIER_AMOUNTS[modifier]
+        self.modifiers[games, x, y] = NO_MODIFIER
+
+        burnt = self.fires[games, x, y]
+        self.destroyed[games[burnt], players[burnt]] = True
+
+    def _start(self, now, moves, directions):
+        # timers start counting down from the tick after they're added
+        self.fire_deadlines[self._unstarted_fires] = now + FIRE_DURATION
+        self._unstarted_fires[:] = False
+        self.bomb_deadlines[self._unstarted_bombs] = now + BOMB_DURATION
+        self._unstarted_bombs[:] = False
+
+        # moves are started in player order, as a player moving out of a space can
+        # let a later one move into it (and two players can't move into the same space).
+        width, height = self.dimensions
+        for player in range(0, moves.shape[1]):
+            games = numpy.flatnonzero(moves[:, player] & ~self.destroyed[:, player])
+            if not len(games):
+                continue
+            direction = directions[games, player]
+            x, y = self.x[games, player], self.y[games, player]
+            target_x = (x + _VECTORS[direction, 0]) % width
+            target_y = (y + _VECTORS[direction, 1]) % height
+
+            vacant = (self.walls[games, target_x, target_y] == NO_WALL) & ~self._occupied[games, target_x, target_y]
+            games, direction = games[vacant], direction[vacant]
+            x, y, target_x, target_y = x[vacant], y[vacant], target_x[vacant], target_y[vacant]
+
+            self._occupied[games, x, y] = False
+            self._occupied[games, target_x, target_y] = True
+            self.x[games, player], self.y[games, player] = target_x, target_y
+            self.moving[games, player] = True
+            self.direction[games, player] = direction
+            self.remaining[games, player] = 1.0
+
+    def _run_timers(self, now):
+        burnt_out = self.fires & (self.fire_deadlines <= now)
+        self.fires[burnt_out] = False
+        self.fire_deadlines[burnt_out] = numpy.inf
+
+        # bombs go off in the order the task manager's schedule would pop them - by deadline, then
+        # by the order they were dropped in.
+        games, xs, ys = numpy.nonzero(self.bombs & (self.bomb_deadlines <= now))
+        order = numpy.lexsort((self.bomb_sequences[games, xs, ys], self.bomb_deadlines[games, xs, ys], games))
+        games, xs, ys = games[order], xs[order], ys[order]
+        numpy.add.at(self.player_bombs, (games, self.bomb_owners[games, xs, ys]), 1)
+
+        expired = {}
+        for game, index in zip(games.tolist(), (xs * self.dimensions.y + ys).tolist()):
+            expired.setdefault(game, []).append(index)
+        return expired
+
+    def _resolve(self, expired):
+        # the same search DetonationResolver does, one game at a time.
+        neighbors = self._neighbors
+        for game, queue in expired.items():
+            walls = self.walls[game].ravel()
+            bombs = self.bombs[game].ravel()
+            radii = self.bomb_radii[game].ravel()
+            owners = self.bomb_owners[game].ravel()
+
+            detonated = set(queue)
+            blasted = set()
+            position = 0
+            while position < len(queue):
+                origin = queue[position]
+                position += 1
+                blasted.add(origin)
+
+                stops = []
+                for table in neighbors:
+                    index = origin
+                    for _ in range(0, radii[origin] - 1):
+                        index = table[index]
+                        if walls[index] == INDESTRUCTIBLE_WALL or (bombs[index] and index not in detonated):
+                            stops.append(index)
+                            break
+                        blasted.add(index)
+                for index in stops:
+                    if bombs[index] and index not in detonated:
+                        detonated.add(index)
+                        queue.append(index)
+                        self.player_bombs[game, owners[index]] += 1
+
+            detonated = numpy.fromiter(detonated, dtype=numpy.int64)
+            bombs[detonated] = False
+            self.bomb_deadlines[game].ravel()[detonated] = numpy.inf
+
+            blasted = numpy.fromiter(blasted, dtype=numpy.int64)
+            walls[blasted] = numpy.where(walls[blasted] == DESTRUCTIBLE_WALL, NO_WALL, walls[blasted])
+            self.modifiers[game].ravel()[blasted] = NO_MODIFIER
+            self.fires[game].ravel()[blasted] = True
+            self.fire_deadlines[game].ravel()[blasted] = numpy.inf
+            self._unstarted_fires[game].ravel()[blasted] = True
+
+            hit = numpy.isin(self.x[game] * self.dimensions.y + self.y[game], blasted) & self.present[game]
+            self.destroyed[game, hit] = True
+
+    def _remove_destroyed(self):
+        games, players = numpy.nonzero(self.destroyed)
+        if not len(games):
+            return
+        self._occupied[games, self.x[games, players], self.y[games, players]] = False
+        self.present[games, players] = False
+        self.moving[games, players] = False
+        self.destroyed[:] = False
@@ -1,20 +1,178 @@
+import array
+import collections
+import itertools
 from python_bomberman.common.game.constants import MovementDirection
 import python_bomberman.common.game.entities as entities
 import python_bomberman.common.utils as utils
 from python_bomberman.common.game.exceptions import GameException
 
+# chunk versions, for every board in the process (see Board._build_chunks)
+_chunk_versions = itertools.count(1)
+
 
 class Board:
     """
     This is a data container that maps location data to entities via a 2D array.
+
+    Objects in 'listeners' are told about every change made to the board, as it happens, through
+    entity_added(entity), entities_added(entities) (for add_all), entity_removed(entity) and
+    entity_destroyed(entity).
     """
-    def __init__(self, dimensions):
+    # how many blast shapes to remember (see blast)
+    BLAST_CACHE_SIZE = 4096
+
+    # the width and height of the square regions the board is divided into for versioning (see _build_chunks)
+    CHUNK_SIZE = 8
+
+    def __init__(self, dimensions, tables=None):
         self.dimensions = dimensions
+        self.listeners = []
+        neighbors, locations = tables if tables is not None else (None, None)
+        self._build_tables(neighbors)
+
+        # the location of every flat index, which never change either - so boards of the same size
+        # share them too
+        width, height = dimensions
+        self._locations = locations if locations is not None else [
+            utils.Coordinate(x, y) for x in range(0, width) for y in range(0, height)
+        ]
+        self._spaces = [BoardSpace(location) for location in self._locations]
         self._board = [
-            [
-                BoardSpace(utils.Coordinate(x, y)) for y in range(0, dimensions.y)
-            ] for x in range(0, dimensions.x)
+            self._spaces[x * dimensions.y:(x + 1) * dimensions.y] for x in range(0, dimensions.x)
         ]
+        self._build_blast_cache()
+        self._build_chunks()
+
+    def blank(self):
+        """
+        Returns an empty board of the same type and size, sharing this board's tables.
+        :return:
+        """
+        return self.__class__(self.dimensions, tables=self._tables())
+
+    def _tables(self):
+        return self._neighbors, self._locations
+
+    def _build_tables(self, neighbors=None):
+        """
+        Spaces are also addressed by a flat index (x * height + y).  This precomputes, for
+        each direction, a table mapping every flat index to the flat index of its neighbor
+        in that direction (wrapping around the edges of the board), so stepping across the
+        board never has to build coordinates or do any arithmetic.
+
+        These tables never change, so boards of the same size can share them.
+        :param neighbors:
+        :return:
+        """
+        if neighbors is not None:
+            self._neighbors = neighbors
+            return
+
+        width, height = self.dimensions
+        self._neighbors = []
+        for direction in MovementDirection.all_directions():
+            offset_x, offset_y = MovementDirection.VECTORS[direction]
+            # flat indices fit in 32 bits ("l" would be 64 on most platforms)
+            self._neighbors.append(array.array("i", [
+                ((x + offset_x) % width) * height + (y + offset_y) % height
+                for x in range(0, width) for y in range(0, height)
+            ]))
+
+    def _build_blast_cache(self):
+        """
+        A blast only travels along the row and column of its origin, and can only be cut short by
+        indestructible entities and bombs.  So we keep a generation counter for every row and column
+        that's bumped whenever one of those is added, removed or destroyed, and key cached blasts on
+        the generations of the rows and columns they travel along.  Stale entries are never hit
+        again and eventually fall out of the cache.
+        :return:
+        """
+        self._row_generations = [0] * self.dimensions.y
+        self._column_generations = [0] * self.dimensions.x
+        self._blast_cache = collections.OrderedDict()
+
+    def _build_chunks(self):
+        """
+        The board is divided into CHUNK_SIZE x CHUNK_SIZE chunks, each with a version that changes
+        whenever a non-dynamic entity in it (a wall, a modifier) is added, removed or destroyed.  Those
+        are the only ways such entities ever change, so two equal versions of a chunk always hold the
+        same static content - which lets snapshots share the unchanged parts of the board.
+
+        Versions come from a single counter shared by every board in the process, so they're never
+        reused - not even between a game and its forks, which restore each other's snapshots.
+        :return:
+        """
+        self._chunk_rows = -(-self.dimensions.y // self.CHUNK_SIZE)
+        self.chunk_versions = [0] * (-(-self.dimensions.x // self.CHUNK_SIZE) * self._chunk_rows)
+
+    def _touch(self, entity):
+        location = entity.logical_location
+        if not entity.can_destroy:
+            self._row_generations[location.y] += 1
+            self._column_generations[location.x] += 1
+        if not entity.dynamic:
+            self.chunk_versions[self.chunk(location)] = next(_chunk_versions)
+
+    def _touch_all(self):
+        # rather than touching each entity's row, column and chunk, start the blast cache over
+        # and give every chunk a new version.
+        self._build_blast_cache()
+        self.chunk_versions = [next(_chunk_versions) for _ in self.chunk_versions]
+
+    def chunk(self, location):
+        """
+        Returns the index of the chunk containing the given location.
+        :param location:
+        :return:
+        """
+        return (location[0] // self.CHUNK_SIZE) * self._chunk_rows + location[1] // self.CHUNK_SIZE
+
+    def chunk_indices(self, chunk):
+        """
+        Returns the flat indices of every space in the given chunk.
+        :param chunk:
+        :return:
+        """
+        chunk_x, chunk_y = divmod(chunk, self._chunk_rows)
+        xs = range(chunk_x * self.CHUNK_SIZE, min((chunk_x + 1) * self.CHUNK_SIZE, self.dimensions.x))
+        ys = range(chunk_y * self.CHUNK_SIZE, min((chunk_y + 1) * self.CHUNK_SIZE, self.dimensions.y))
+        return [x * self.dimensions.y + y for x in xs for y in ys]
+
+    def clear_chunk(self, chunk):
+        """
+        Removes every entity in the given chunk from the board.
+        :param chunk:
+        :return:
+        """
+        for index in self.chunk_indices(chunk):
+            for entity in self.space_at(index).all_entities():
+                self.remove(entity)
+
+    def index(self, location):
+        """
+        Converts a location into a flat index, checking that it's in bounds.
+        :param location:
+        :return:
+        """
+        if not 0 <= location.x < self.dimensions.x or not 0 <= location.y < self.dimensions.y:
+            raise GameException.location_invalid(location)
+        return location.x * self.dimensions.y + location.y
+
+    def walk(self, index, direction, distance):
+        """
+        Returns the flat indices of the spaces 1 through distance away from the
+        space at the given flat index, in the given direction.
+        :param index:
+        :param direction:
+        :param distance:
+        :return:
+        """
+        neighbors = self._neighbors[direction]
+        indices = []
+        for _ in range(0, distance):
+            index = neighbors[index]
+            indices.append(index)
+        return indices
 
     def add(self, entity):
         """
@@ -23,6 +181,21 @@ class Board:
         :return:
         """
         self.get(entity.logical_location).add(entity)
+        self._touch(entity)
+        for listener in self.listeners:
+            listener.entity_added(entity)
+
+    def add_all(self, entities):
+        """
+        Adds many entities to the board at once.
+        :param entities:
+        :return:
+        """
+        for entity in entities:
+            self.get(entity.logical_location).add(entity)
+        self._touch_all()
+        for listener in self.listeners:
+            listener.entities_added(entities)
 
     def remove(self, entity):
         """
@@ -37,6 +210,23 @@ class Board:
         :return:
         """
         self.get(entity.logical_location).remove(entity)
+        self._touch(entity)
+        for listener in self.listeners:
+            listener.entity_removed(entity)
+
+    def move(self, entity, location):
+        """
+        Moves an entity from the board space at its logical location to the
+        board space at the given location, updating its logical location.
+        :param entity:
+        :param location:
+        :return:
+        """
+        # make sure the destination is valid before touching anything
+        self.get(location)
+        self.remove(entity)
+        entity.logical_location = location
+        self.add(entity)
 
     def get(self, location, direction=None, distance=None):
         """
@@ -57,19 +247,12 @@ class Board:
         :param distance:
         :return:
         """
-        if not 0 <= location.x < self.dimensions.x or not 0 <= location.y < self.dimensions.y:
-            raise GameException.location_invalid(location)
+        index = self.index(location)
 
         if distance is not None and direction is not None:
-            direction_map = {
-                MovementDirection.UP: utils.Coordinate(location[0], (location[1] - distance) % self.dimensions.y),
-                MovementDirection.DOWN: utils.Coordinate(location[0], (location[1] + distance) % self.dimensions.y),
-                MovementDirection.LEFT: utils.Coordinate((location[0] - distance) % self.dimensions.x, location[1]),
-                MovementDirection.RIGHT: utils.Coordinate((location[0] + distance) % self.dimensions.x, location[1])
-            }
-            new_location = utils.Coordinate(*direction_map.get(direction, location))
+            index = self._offset(index, direction, distance)
         elif distance is None and direction is None:
-            new_location = location
+            pass
         else:
             raise GameException.incomplete_args(
                 self.__class__, "get",
@@ -79,14 +262,47 @@ class Board:
                     "distance": distance
                 }
             )
-        return self._board[new_location.x][new_location.y]
+        return self.space_at(index)
+
+    def _offset(self, index, direction, distance):
+        if distance == 1:
+            return self._neighbors[direction][index]
+        width, height = self.dimensions
+        x, y = divmod(index, height)
+        offset_x, offset_y = MovementDirection.VECTORS[direction]
+        return ((x + offset_x * distance) % width) * height + (y + offset_y * distance) % height
+
+    def space_at(self, index):
+        """
+        Retrieves the board space at the given flat index.
+        :param index:
+        :return:
+        """
+        return self._spaces[index]
+
+    def _blocks_blast(self, index):
+        return self._spaces[index].has_indestructible_entity()
+
+    def destroy(self, entity):
+        """
+        Flags an entity as destroyed.
+
+        Anything that destroys an entity should go through here rather than setting the
+        flag directly, so boards that keep their own record of destroyed entities stay in sync.
+        :param entity:
+        :return:
+        """
+        entity.destroyed = True
+        self._touch(entity)
+        for listener in self.listeners:
+            listener.entity_destroyed(entity)
 
     def all_entities(self):
         """
         Convenience method to get all entities that the board is aware of.
         :return:
         """
-        return [entity for row in self._board for space in row for entity in space.all_entities()]
+        return [entity for space in self._spaces for entity in space.all_entities()]
 
     def blast_radius(self, location, radius):
         """
@@ -98,16 +314,41 @@ class Board:
         :param radius:
         :return:
         """
-        locations = {location}
+        indices, _ = self.blast(location, radius)
+        return [self.space_at(index) for index in indices]
+
+    def blast(self, location, radius):
+        """
+        Does the work for blast_radius, but in terms of flat indices.  Returns a tuple of
+        the indices included in the blast, and the indices of the spaces that cut the blast
+        short (both tuples, in no particular order).
+
+        Results are cached - see _build_blast_cache.
+        :param location:
+        :param radius:
+        :return:
+        """
+        origin = self.index(location)
+        key = (origin, radius, self._row_generations[location.y], self._column_generations[location.x])
+        cached = self._blast_cache.get(key)
+        if cached is not None:
+            self._blast_cache.move_to_end(key)
+            return cached
+
+        indices = {origin}
+        stops = []
 
         for direction in MovementDirection.all_directions():
-            for distance in range(1, radius):
-                space = self.get(location, direction=direction, distance=distance)
-                if space.has_indestructible_entity():
+            for index in self.walk(origin, direction, radius - 1):
+                if self._blocks_blast(index):
+                    stops.append(index)
                     break
-                locations.add(space.location)
+                indices.add(index)
 
-        return [self.get(space_location) for space_location in list(locations)]
+        result = self._blast_cache[key] = (tuple(indices), tuple(stops))
+        if len(self._blast_cache) > self.BLAST_CACHE_SIZE:
+            self._blast_cache.popitem(last=False)
+        return result
 
 
 class BoardSpace:
@@ -116,6 +357,8 @@ class BoardSpace:
     There are a few things that can co-exist at a single location in a
     bomberman game, which predicated me writing it out as a class instead.
     """
+    __slots__ = ("location", "modifier", "fire", "bomb", "entity")
+
     def __init__(self, location):
         self.location = location
         self.modifier = None
@@ -168,13 +411,19 @@ class BoardSpace:
         :param entity:
         :return:
         """
-        if isinstance(entity, entities.Bomb):
-            return "bomb"
-        elif isinstance(entity, entities.Modifier):
-            return "modifier"
-        elif isinstance(entity, entities.Fire):
-            return "fire"
-        return "entity"
+        cls = entity.__class__
+        attr = _attributes.get(cls)
+        if attr is None:
+            if issubclass(cls, entities.Bomb):
+                attr = "bomb"
+            elif issubclass(cls, entities.Modifier):
+                attr = "modifier"
+            elif issubclass(cls, entities.Fire):
+                attr = "fire"
+            else:
+                attr = "entity"
+            _attributes[cls] = attr
+        return attr
 
     def occupied(self, entity):
         """
@@ -186,6 +435,15 @@ class BoardSpace:
         entity = getattr(self, self._entity_to_attribute(entity), None)
         return entity is not None and not entity.destroyed
 
+    def vacant(self, entity):
+        """
+        Checks to see if an entity could be added to this space.  Unlike occupied, a
+        destroyed entity that hasn't been cleaned up yet still counts against a space.
+        :param entity:
+        :return:
+        """
+        return getattr(self, self._entity_to_attribute(entity), None) is None
+
     def has_modifier(self):
         """
         Convenience method to return whether or not there's a modifier in this location
@@ -222,11 +480,6 @@ class BoardSpace:
             self.bomb is not None and not self.bomb.destroyed
         )
 
-    def destroy_all(self):
-        """
-        If this space is included in a bomb's blast radius, this will set the destroyed
-        flag for all entities that can be destroyed.
-        :return:
-        """
-        for entity in [entity for entity in self.all_entities() if entity.can_destroy]:
-            entity.destroyed = True
+
+# BoardSpace attribute names by entity class (see BoardSpace._entity_to_attribute)
+_attributes = {}
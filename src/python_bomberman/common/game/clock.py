@@ -0,0 +1,86 @@
+import time
+
+
+class Clock(object):
+    """
+    The single source of time for a game.
+
+    Every call to Game.process() asks the clock how much simulated time should
+    elapse (via steps()), and the game advances the clock by each step before
+    running its tasks.  Tasks read clock.now instead of the wall clock, so every
+    timer in a game moves in lockstep and a game can be run faster (or slower)
+    than real time simply by swapping the clock.
+
+    This base clock is variable-timestep: each call to steps() yields one step
+    equal to the wall time elapsed since the previous call.
+    """
+    def __init__(self, time_source=time.perf_counter):
+        self.now = 0.0
+        self.dt = 0.0
+        self._time_source = time_source
+        self._last_time = None
+
+    def advance(self, dt):
+        """
+        Moves simulated time forward by dt seconds.
+        :param dt:
+        :return:
+        """
+        self.dt = dt
+        self.now += dt
+
+    def steps(self):
+        """
+        Returns the list of timesteps that should be simulated for this call.
+        :return:
+        """
+        return [self._elapsed()]
+
+    def _elapsed(self):
+        current_time = self._time_source()
+        elapsed = 0.0 if self._last_time is None else current_time - self._last_time
+        self._last_time = current_time
+        return elapsed
+
+
+class FixedStepClock(Clock):
+    """
+    A fixed-timestep clock driven by wall time.
+
+    Elapsed wall time is collected in an accumulator, and steps() yields as many
+    whole steps of length 'step' as the accumulator holds.  Any remainder is
+    carried over to the next call.  'max_steps' caps the amount of catch-up work
+    done in a single call so that a slow tick can't snowball into slower ones.
+    """
+    def __init__(self, step=1 / 60, max_steps=5, time_source=time.perf_counter):
+        super().__init__(time_source=time_source)
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def steps(self):
+        self.accumulator += self._elapsed()
+
+        num_steps = int(self.accumulator // self.step)
+        if num_steps > self.max_steps:
+            # we're too far behind to catch up - drop the extra time on the floor.
+            num_steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= num_steps * self.step
+
+        return [self.step] * num_steps
+
+
+class FastForwardClock(Clock):
+    """
+    A clock that isn't tied to wall time at all - every call to steps() yields
+    exactly one step of length 'step'.  Used for headless simulations, bots and
+    replays, which run as fast as the host can process ticks.
+    """
+    def __init__(self, step=1 / 60):
+        super().__init__()
+        self.step = step
+
+    def steps(self):
+        return [self.step]
@@ -4,6 +4,21 @@ class MovementDirection(object):
     LEFT = 2
     RIGHT = 3
 
+    # unit (x, y) offsets for each direction
+    VECTORS = {
+        UP: (0, -1),
+        DOWN: (0, 1),
+        LEFT: (-1, 0),
+        RIGHT: (1, 0)
+    }
+
     @staticmethod
     def all_directions():
-        return [MovementDirection.UP, MovementDirection.DOWN, MovementDirection.LEFT, MovementDirection.RIGHT]
\ No newline at end of file
+        return [MovementDirection.UP, MovementDirection.DOWN, MovementDirection.LEFT, MovementDirection.RIGHT]
+
+
+class GameAction(object):
+    # (MOVE, entity id, direction, distance)
+    MOVE = "move"
+    # (DROP_BOMB, entity id)
+    DROP_BOMB = "drop_bomb"
@@ -0,0 +1,69 @@
+import python_bomberman.common.game.entities as entities
+
+
+class DetonationResolver(object):
+    """
+    Resolves bomb detonations in batches.
+
+    Detonation tasks hand their bomb to the resolver when they finish.  While the task manager is
+    running it defers resolution, so every bomb that goes off during a tick is resolved together:
+    blasts that reach another bomb set it off too (following the chain reaction breadth-first),
+    the union of all blasted spaces is computed once, and destruction and fire are then applied
+    to each blasted space exactly once.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.deferred = False
+        self._pending = []
+
+    def add(self, task):
+        """
+        Queues up a finished detonation task.  Resolves immediately unless resolution is deferred.
+        :param task:
+        :return:
+        """
+        self._pending.append(task)
+        if not self.deferred:
+            self.resolve()
+
+    def resolve(self):
+        """
+        Resolves every queued detonation, along with any bombs set off by them.
+        :return:
+        """
+        board = self.game.board
+        task_manager = self.game.tasks
+        blasted = {}
+
+        # finishing a chained detonation task queues it up here, extending the search.
+        self.deferred = True
+        queue = self._pending
+        position = 0
+        while position < len(queue):
+            task = queue[position]
+            position += 1
+
+            indices, stops = board.blast(task.entity.logical_location, task.entity.radius)
+            for index in indices:
+                blasted[index] = None
+            for index in stops:
+                bomb = board.space_at(index).bomb
+                chained = task_manager.get(bomb, task.__class__) if bomb is not None else None
+                if chained is not None and not chained.done:
+                    chained.finish()
+        self._pending = []
+        self.deferred = False
+
+        for index in blasted:
+            self._blast(board.space_at(index))
+
+    def _blast(self, space):
+        for entity in space.all_entities():
+            if entity.can_destroy and entity is not space.fire:
+                self.game.destroy(entity)
+
+        # any fire already in this space is replaced with a fresh one
+        if space.fire is not None:
+            self.game.remove(space.fire)
+        fire = self.game.add(entities.Fire(space.location))
+        self.game.tasks.register_burning_task(fire)
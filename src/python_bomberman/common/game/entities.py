@@ -1,91 +1,156 @@
-import uuid
+import enum
 from python_bomberman.common.game.exceptions import GameException
 
 
+class Capability(enum.IntFlag):
+    MOVE = 1                # is this entity capable of moving
+    DESTROY = 2             # is this entity capable of being destroyed by other entities
+    COLLIDE = 4             # is this entity capable of being collided with
+    BURN = 8                # is this entity capable of burning
+    MODIFY = 16             # is this entity capable of modifying other entities
+    DROP_BOMBS = 32         # is this entity capable of dropping bombs
+    BE_MODIFIED = 64        # is this entity capable of being modified by modifiers
+    DETONATE = 128          # is this entity capable of blowing up
+
+
+# the boolean class attributes derived from an entity class' capabilities
+CAPABILITY_ATTRIBUTES = {
+    "can_move": Capability.MOVE,
+    "can_destroy": Capability.DESTROY,
+    "can_collide": Capability.COLLIDE,
+    "can_burn": Capability.BURN,
+    "can_modify": Capability.MODIFY,
+    "can_drop_bombs": Capability.DROP_BOMBS,
+    "can_be_modified": Capability.BE_MODIFIED,
+    "can_detonate": Capability.DETONATE
+}
+
+# capabilities that let an entity's state change without it being added to, removed from or
+# destroyed on the board (moving, counting down, picking things up).
+DYNAMIC_CAPABILITIES = (
+    Capability.MOVE | Capability.BURN | Capability.DETONATE | Capability.DROP_BOMBS | Capability.BE_MODIFIED
+)
+
+
+# maps identifiers (as used by map objects) to the entity classes they represent.
+# entity classes that declare an identifier register themselves here when they're defined.
+registry = {}
+
+
 class Entity(object):
-    def __init__(
-            self,
-            location,
-            unique_id=None,
-            can_move=False,             # is this entity capable of moving
-            can_destroy=False,          # is this entity capable of being destroyed by other entities
-            can_collide=False,          # is this entity capable of being collided with
-            can_burn=False,             # is this entity capable of burning
-            can_modify=False,           # is this entity capable of modifying other entities
-            can_drop_bombs=False,       # is this entity capable of dropping bombs
-            can_be_modified=False,      # is this entity capable of being modified by modifiers
-            can_detonate=False          # is this entity capable of blowing up
-    ):
-        if unique_id is None:
-            unique_id = uuid.uuid4()
+    # what entities can or can't do is constant for each class, so it's declared once per class
+    # as a capability mask (and expanded into can_* class attributes when the class is created).
+    # everything that varies between instances lives in slots.
+    __slots__ = (
+        "unique_id",
+        "physical_location",
+        "logical_location",
+
+        # some attributes for communicating state
+        "destroyed",
+        "moving",
+        "detonating",
+        "burning"
+    )
+    capabilities = Capability(0)
+
+    def __init__(self, location, unique_id=None):
+        # entities without an id are given one by the game they're added to
         self.unique_id = unique_id
         self.physical_location = location
         self.logical_location = location
 
-        # some attributes for communicating state
         self.destroyed = False
         self.moving = False
         self.detonating = False
         self.burning = False
 
-        # some attributes for communicating what entities can or can't do.
-        self.can_move = can_move
-        self.can_drop_bombs = can_drop_bombs
-        self.can_destroy = can_destroy
-        self.can_collide = can_collide
-        self.can_burn = can_burn
-        self.can_modify = can_modify
-        self.can_be_modified = can_be_modified
-        self.can_detonate = can_detonate
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _set_class_attributes(cls)
+        if "identifier" in cls.__dict__:
+            registry[cls.identifier] = cls
+
+
+def _set_class_attributes(cls):
+    for attr, capability in CAPABILITY_ATTRIBUTES.items():
+        setattr(cls, attr, capability in cls.capabilities)
+
+    # whether the entity's state can change behind the board's back
+    cls.dynamic = bool(cls.capabilities & DYNAMIC_CAPABILITIES)
+    # whether the game never changes the entity's state at all once it's been added
+    cls.immutable = not cls.dynamic and not cls.can_destroy
+
+    # every slot of the class, base classes first (unique_id is always first) - together they're
+    # the entire state of an instance.
+    cls.state_attributes = tuple(
+        slot for klass in reversed(cls.__mro__) for slot in klass.__dict__.get("__slots__", ())
+    )
+
+
+_set_class_attributes(Entity)
 
 
 class IndestructibleWall(Entity):
+    __slots__ = ()
     identifier = "indestructible_wall"
+    capabilities = Capability.COLLIDE
 
     def __init__(self, location):
-        super().__init__(location, can_collide=True)
+        super().__init__(location)
 
 
 class DestructibleWall(Entity):
+    __slots__ = ()
     identifier = "destructible_wall"
+    capabilities = Capability.COLLIDE | Capability.DESTROY
 
     def __init__(self, location):
-        super().__init__(location, can_collide=True, can_destroy=True)
+        super().__init__(location)
 
 
 class Player(Entity):
+    __slots__ = ("movement_speed", "bombs", "bomb_radius")
     identifier = "player"
+    capabilities = (
+        Capability.MOVE | Capability.COLLIDE | Capability.DESTROY | Capability.BE_MODIFIED | Capability.DROP_BOMBS
+    )
 
     def __init__(self, location):
-        super().__init__(
-            location, can_move=True, can_collide=True, can_destroy=True, can_be_modified=True, can_drop_bombs=True
-        )
+        super().__init__(location)
         self.movement_speed = 1
         self.bombs = 1
         self.bomb_radius = 3
 
 
 class Bomb(Entity):
+    __slots__ = ("movement_speed", "duration", "radius")
     identifier = "bomb"
+    capabilities = Capability.MOVE | Capability.DETONATE | Capability.COLLIDE
 
     def __init__(self, location, radius, duration=2):
-        super().__init__(location, can_move=True, can_detonate=True, can_collide=True)
+        super().__init__(location)
         self.movement_speed = 1
         self.duration = duration
         self.radius = radius
 
 
 class Fire(Entity):
+    __slots__ = ("duration",)
     identifier = "fire"
+    capabilities = Capability.DESTROY | Capability.BURN
 
     def __init__(self, location, duration=2):
-        super().__init__(location, can_destroy=True, can_burn=True)
+        super().__init__(location)
         self.duration = duration
 
 
 class Modifier(Entity):
+    __slots__ = ("amount",)
+    capabilities = Capability.DESTROY | Capability.MODIFY
+
     def __init__(self, location, amount):
-        super().__init__(location, can_destroy=True, can_modify=True)
+        super().__init__(location)
         self.amount = amount
 
     def modify(self, entity):
@@ -93,6 +158,7 @@ class Modifier(Entity):
 
 
 class BombModifier(Modifier):
+    __slots__ = ()
     identifier = "bomb_modifier"
 
     def __init__(self, location, amount=1):
@@ -103,6 +169,7 @@ class BombModifier(Modifier):
 
 
 class BombRadiusModifier(Modifier):
+    __slots__ = ()
     identifier = "bomb_radius_modifier"
 
     def __init__(self, location, amount=1):
@@ -113,6 +180,7 @@ class BombRadiusModifier(Modifier):
 
 
 class MovementSpeedModifier(Modifier):
+    __slots__ = ()
     identifier = "movement_speed_modifier"
 
     def __init__(self, location, amount=.1):
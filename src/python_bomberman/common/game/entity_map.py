@@ -1,20 +1,126 @@
 from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.common.game.ids import EntityIdAllocator
+import python_bomberman.common.game.entities as entities
 
 
 class EntityMap:
-    def __init__(self):
+    # entity state flags that are indexed (see set_state)
+    STATES = ("moving", "detonating", "burning")
+
+    def __init__(self, ids=None):
+        self.ids = ids if ids is not None else EntityIdAllocator()
+        self._build_indexes()
+
+    def _build_indexes(self):
         self._entities = {}
 
+        # entities that have been destroyed, but not yet removed
+        self._destroyed = {}
+
+        # secondary indexes (each mapping unique id -> entity) by entity class (an entity is
+        # indexed under its own class and every entity class it inherits from), and by state flag.
+        self._by_type = {}
+        self._by_state = {state: {} for state in self.STATES}
+
+        # entities whose state can change without going through the board
+        self._dynamic = {}
+
     def add(self, entity):
+        # entities are given an id when they're first added
+        if entity.unique_id is None:
+            entity.unique_id = self.ids.allocate()
         if entity.unique_id in self._entities:
             raise GameException.entity_with_id_exists(entity)
         self._entities[entity.unique_id] = entity
+        if entity.destroyed:
+            self._destroyed[entity.unique_id] = entity
+        if entity.dynamic:
+            self._dynamic[entity.unique_id] = entity
+
+        for cls in _indexed_classes(entity.__class__):
+            self._by_type.setdefault(cls, {})[entity.unique_id] = entity
+        for state, index in self._by_state.items():
+            if getattr(entity, state):
+                index[entity.unique_id] = entity
+
+    def add_all(self, entities):
+        """
+        Adds many entities at once, updating each index once per entity class rather than once per entity.
+        :param entities:
+        :return:
+        """
+        by_class = {}
+        for entity in entities:
+            if entity.unique_id is None:
+                entity.unique_id = self.ids.allocate()
+            if entity.unique_id in self._entities:
+                raise GameException.entity_with_id_exists(entity)
+            by_class.setdefault(entity.__class__, {})[entity.unique_id] = entity
+
+        for cls, group in by_class.items():
+            self._entities.update(group)
+            if cls.dynamic:
+                self._dynamic.update(group)
+            for indexed in _indexed_classes(cls):
+                self._by_type.setdefault(indexed, {}).update(group)
+
+            for entity in group.values():
+                if entity.destroyed:
+                    self._destroyed[entity.unique_id] = entity
+                for state, index in self._by_state.items():
+                    if getattr(entity, state):
+                        index[entity.unique_id] = entity
 
     def all_entities(self):
         return self._entities.values()
 
+    def of_type(self, cls):
+        """
+        Returns a live view of every entity that's an instance of the given class.
+        :param cls:
+        :return:
+        """
+        return self._by_type.setdefault(cls, {}).values()
+
+    def dynamic_entities(self):
+        """
+        Returns a live view of every dynamic entity (see Entity.dynamic).
+        :return:
+        """
+        return self._dynamic.values()
+
+    def in_state(self, state):
+        """
+        Returns a live view of every entity with the given state flag set.
+        :param state:
+        :return:
+        """
+        return self._by_state[state].values()
+
+    def set_state(self, entity, state, value):
+        """
+        Sets one of an entity's state flags.  State flags should be changed through here
+        rather than directly, so the state indexes stay in sync.
+        :param entity:
+        :param state:
+        :param value:
+        :return:
+        """
+        setattr(entity, state, value)
+        if self._entities.get(entity.unique_id) is not entity:
+            return
+        if value:
+            self._by_state[state][entity.unique_id] = entity
+        else:
+            self._by_state[state].pop(entity.unique_id, None)
+
     def destroyed_entities(self):
-        return [entity for entity in self.all_entities() if entity.destroyed]
+        return list(self._destroyed.values())
+
+    def mark_destroyed(self, entity):
+        # entities that aren't in the map yet are picked up when they're added.
+        if self._entities.get(entity.unique_id) is entity:
+            self._destroyed[entity.unique_id] = entity
 
     def get(self, unique_id):
         return self._entities[unique_id] if unique_id in self._entities else None
@@ -23,3 +129,30 @@ class EntityMap:
         if entity.unique_id not in self._entities:
             raise GameException.entity_with_id_doesnt_exist(entity)
         self._entities.pop(entity.unique_id) if entity.unique_id in self._entities else None
+        self._destroyed.pop(entity.unique_id, None)
+        self._dynamic.pop(entity.unique_id, None)
+        for cls in _indexed_classes(entity.__class__):
+            self._by_type[cls].pop(entity.unique_id, None)
+        for index in self._by_state.values():
+            index.pop(entity.unique_id, None)
+        if self.ids.is_live(entity.unique_id):
+            self.ids.release(entity.unique_id)
+
+    def clear(self):
+        """
+        Forgets every entity without releasing any ids.
+        :return:
+        """
+        self._build_indexes()
+
+
+_indexed_classes_cache = {}
+
+
+def _indexed_classes(cls):
+    # the entity classes an instance of cls is indexed under
+    if cls not in _indexed_classes_cache:
+        _indexed_classes_cache[cls] = [
+            parent for parent in cls.__mro__ if issubclass(parent, entities.Entity) and parent is not entities.Entity
+        ]
+    return _indexed_classes_cache[cls]
@@ -38,3 +38,18 @@ class GameException(Exception):
     def incomplete_args(cls, class_obj, method, args):
         return cls("Call to {}.{} has incomplete args: {}".format(class_obj.__name__, method, args))
 
+    @classmethod
+    def entity_ids_exhausted(cls, index):
+        return cls("Ran out of entity ids (index {} is out of range).".format(index))
+
+    @classmethod
+    def entity_id_not_live(cls, unique_id):
+        return cls("Entity id {} is not live.".format(unique_id))
+
+    @classmethod
+    def action_invalid(cls, action):
+        return cls("Invalid action: {}".format(action))
+
+    @classmethod
+    def batch_dimensions_mismatch(cls, expected, actual):
+        return cls("Every game in a batch needs the same dimensions ({}), got {}.".format(expected, actual))
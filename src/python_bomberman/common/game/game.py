@@ -1,46 +1,79 @@
 from python_bomberman.common.game.board import Board
+from python_bomberman.common.game.clock import Clock, FastForwardClock
+from python_bomberman.common.game.constants import GameAction
 from python_bomberman.common.game.entity_map import EntityMap
 from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.common.game.ids import EntityIdAllocator
+from python_bomberman.common.game.snapshot import Snapshotter
 from python_bomberman.common.game.tasks import TaskManager
 import python_bomberman.common.game.entities as entities
 
 
 class Game:
-    def __init__(self, game_map):
-        self.board = Board(dimensions=game_map.dimensions)
-        self.entities = EntityMap()
+    def __init__(self, game_map, clock=None, board_cls=Board, profiler=None):
+        self._build(clock, board_cls(dimensions=game_map.dimensions), profiler)
+        self._populate(game_map)
+
+    def _build(self, clock, board, profiler):
+        self.clock = clock if clock is not None else Clock()
+        # set to a TickProfiler to measure each tick
+        self.profiler = profiler
+        self.board = board
+        self.ids = EntityIdAllocator()
+        self.entities = EntityMap(ids=self.ids)
         self.tasks = TaskManager(self)
+        self._snapshotter = Snapshotter(self)
 
-        map_obj_cls = {}
-        to_check = entities.Entity.__subclasses__()
-        while to_check:
-            cls = to_check.pop()
-            to_check.extend(cls.__subclasses__())
-            if hasattr(cls, "identifier"):
-                map_obj_cls[cls.identifier] = cls
-        for map_obj in game_map.all_objects():
-            if map_obj.identifier in map_obj_cls:
-                self.add(map_obj_cls[map_obj.identifier](location=map_obj.location))
+    def _populate(self, game_map):
+        # the board is empty, so none of the fire/modifier checks in add can apply -
+        # entities for the map's objects go straight onto the board and into the entity map.
+        created = [
+            entities.registry[map_obj.identifier](location=map_obj.location)
+            for map_obj in game_map.all_objects() if map_obj.identifier in entities.registry
+        ]
+        for entity in created:
+            entity.unique_id = self.ids.allocate()
+        self.board.add_all(created)
+        self.entities.add_all(created)
 
     def add(self, entity):
+        # entities get their id before anything sees them, board listeners included
+        if entity.unique_id is None:
+            entity.unique_id = self.ids.allocate()
         space = self.board.get(entity.logical_location)
 
         if space.has_fire() and entity.can_destroy:
-            entity.destroyed = True
+            self.destroy(entity)
         if space.has_modifier() and entity.can_be_modified:
             space.modifier.modify(entity)
-            space.modifier.destroyed = True
+            self.destroy(space.modifier)
             
         self.board.add(entity)
         self.entities.add(entity)
 
         return entity
 
+    def map_players(self):
+        """
+        Returns the ids of the players from the game's map, in map order.  Only meaningful before any
+        other players have been added.
+        :return:
+        """
+        # games add map objects in order, so sorting players by id puts them in map order
+        return sorted(player.unique_id for player in self.entities.of_type(entities.Player))
+
     def remove(self, entity):
+        self.tasks.unregister_entity(entity)
         self.board.remove(entity)
         self.entities.remove(entity)
         return entity
 
+    def destroy(self, entity):
+        # destroyed entities are recorded as they're destroyed, so cleaning
+        # them up at the end of a tick doesn't require searching for them.
+        self.board.destroy(entity)
+        self.entities.mark_destroyed(entity)
+
     def drop_bomb(self, entity):
         if not entity.can_drop_bombs:
             raise GameException.entity_incapable_of_performing_action(entity, "drop bomb")
@@ -61,6 +94,7 @@ class Game:
             radius=entity.bomb_radius
         )
         entity.bombs -= 1
+        self.add(bomb)
         self.tasks.register_detonation_task(bomb, entity)
 
     def move(self, entity, direction, num_spaces):
@@ -70,10 +104,79 @@ class Game:
             return
         self.tasks.register_movement_task(entity, direction, num_spaces)
 
-    def process(self):
-        # process the tasks that are active
+    def snapshot(self):
+        """
+        Captures the state of the game (see Snapshotter).  Should be called between ticks.
+        :return:
+        """
+        return self._snapshotter.capture()
+
+    def restore(self, snapshot):
+        """
+        Puts the game back into the state captured by a snapshot of it.
+        :param snapshot:
+        :return:
+        """
+        self._snapshotter.restore(snapshot)
+
+    def fork(self, step=1 / 60):
+        """
+        Returns an independent copy of this game that runs on simulated time (a FastForwardClock with
+        the given step, starting from this game's current time).  Nothing mutable is shared between the
+        two - the fork gets its own entities and tasks - but the board's neighbor tables and the
+        snapshot records of unchanged board chunks are.  Should be called between ticks.
+        :param step:
+        :return:
+        """
+        fork = self.__class__.__new__(self.__class__)
+        fork._build(FastForwardClock(step=step), self.board.blank(), None)
+        fork.restore(self.snapshot())
+        return fork
+
+    def step(self, actions=(), dt=None):
+        """
+        Performs the given actions, then processes the game.  Each action is a tuple of
+        (GameAction, entity id, arguments...) - see GameAction.  Actions for entities that
+        no longer exist are ignored.
+        :param actions:
+        :param dt:
+        :return:
+        """
+        for action, unique_id, *args in actions:
+            entity = self.entities.get(unique_id)
+            if entity is None:
+                continue
+            if action == GameAction.MOVE:
+                self.move(entity, *args)
+            elif action == GameAction.DROP_BOMB:
+                self.drop_bomb(entity)
+            else:
+                raise GameException.action_invalid(action)
+        self.process(dt)
+
+    def process(self, dt=None):
+        # the clock decides how many steps to simulate (and how long each is) unless
+        # the caller provides an explicit timestep.
+        steps = self.clock.steps() if dt is None else [dt]
+        for step in steps:
+            self.clock.advance(step)
+            self._step()
+
+    def _step(self):
+        profiler = self.profiler
+        if profiler is None:
+            self.tasks.run()
+            self._remove_destroyed()
+            return
+
+        start = profiler.timer()
         self.tasks.run()
+        removal = profiler.timer()
+        self._remove_destroyed()
+        end = profiler.timer()
+        profiler.record_phase("removal", end - removal)
+        profiler.end_tick(end - start)
 
-        # remove any destroyed entities
+    def _remove_destroyed(self):
         for entity in self.entities.destroyed_entities():
             self.remove(entity)
@@ -0,0 +1,101 @@
+import collections
+from python_bomberman.common.game.exceptions import GameException
+
+
+class EntityIdAllocator(object):
+    """
+    Hands out entity ids for a single game.
+
+    Ids are unsigned 32-bit integers, so they can be written as-is into wire formats and replays.
+    The low INDEX_BITS bits are an index that's recycled once the entity holding it is released,
+    and the remaining bits are a generation that's bumped every time that happens.  A stale id
+    (one held onto after its entity was released) will never match the id of whatever entity
+    reuses its index.
+
+    Released indices are only recycled once MINIMUM_FREE_INDICES of them have piled up, so
+    a freshly released index isn't immediately handed out again.
+    """
+    INDEX_BITS = 20
+    GENERATION_BITS = 12
+    INDEX_MASK = (1 << INDEX_BITS) - 1
+    GENERATION_MASK = (1 << GENERATION_BITS) - 1
+    MINIMUM_FREE_INDICES = 1024
+
+    def __init__(self):
+        self._generations = []
+        self._live = bytearray()
+        self._free = collections.deque()
+
+    def __len__(self):
+        return len(self._generations) - len(self._free)
+
+    def allocate(self):
+        """
+        Returns a new id.
+        :return:
+        """
+        if len(self._free) >= self.MINIMUM_FREE_INDICES:
+            index = self._free.popleft()
+        else:
+            index = len(self._generations)
+            if index > self.INDEX_MASK:
+                raise GameException.entity_ids_exhausted(index)
+            self._generations.append(0)
+            self._live.append(0)
+
+        self._live[index] = 1
+        return (self._generations[index] << self.INDEX_BITS) | index
+
+    def release(self, unique_id):
+        """
+        Returns an id to the allocator.  The id (and any copies of it) will no longer be live.
+        :param unique_id:
+        :return:
+        """
+        if not self.is_live(unique_id):
+            raise GameException.entity_id_not_live(unique_id)
+        index = unique_id & self.INDEX_MASK
+        self._live[index] = 0
+        self._generations[index] = (self._generations[index] + 1) & self.GENERATION_MASK
+        self._free.append(index)
+
+    def is_live(self, unique_id):
+        """
+        Checks whether an id was handed out by this allocator and hasn't been released since.
+        :param unique_id:
+        :return:
+        """
+        if not isinstance(unique_id, int):
+            return False
+        index = unique_id & self.INDEX_MASK
+        return (
+            index < len(self._generations) and
+            self._live[index] == 1 and
+            self._generations[index] == unique_id >> self.INDEX_BITS
+        )
+
+    def get_state(self):
+        """
+        Returns an immutable copy of the allocator's state.
+        :return:
+        """
+        return tuple(self._generations), bytes(self._live), tuple(self._free)
+
+    def set_state(self, state):
+        """
+        Puts the allocator back into a state returned by get_state.
+        :param state:
+        :return:
+        """
+        generations, live, free = state
+        self._generations = list(generations)
+        self._live = bytearray(live)
+        self._free = collections.deque(free)
+
+    @classmethod
+    def index(cls, unique_id):
+        return unique_id & cls.INDEX_MASK
+
+    @classmethod
+    def generation(cls, unique_id):
+        return unique_id >> cls.INDEX_BITS
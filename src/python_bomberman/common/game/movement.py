@@ -0,0 +1,118 @@
+import numpy
+from python_bomberman.common.game.constants import MovementDirection
+import python_bomberman.common.utils as utils
+
+
+class MovementIntegrator(object):
+    """
+    Advances every active movement task in a single vectorized step.
+
+    Positions, direction vectors, speeds and remaining distances of all moving entities are
+    kept in parallel arrays (one row per task).  Each tick they're all advanced at once, wrapped
+    around the edges of the board and checked for arrival.  Tasks are responsible for everything
+    else (starting, finishing, chaining) - this only does the arithmetic.
+    """
+    def __init__(self, dimensions, capacity=16):
+        self.dimensions = numpy.array(dimensions, dtype=numpy.float64)
+        self.last_update = None
+        self._tasks = []
+        self._slots = {}
+        self._position = numpy.zeros((capacity, 2))
+        self._vector = numpy.zeros((capacity, 2))
+        self._speed = numpy.zeros(capacity)
+        self._remaining = numpy.zeros(capacity)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task):
+        return task in self._slots
+
+    def add(self, task):
+        """
+        Starts integrating a (started) movement task.
+        :param task:
+        :return:
+        """
+        size = len(self._tasks)
+        if size == len(self._speed):
+            self._grow()
+
+        self._slots[task] = size
+        self._tasks.append(task)
+        self._position[size] = task.entity.physical_location
+        self._vector[size] = MovementDirection.VECTORS[task.direction]
+        self._speed[size] = task.entity.movement_speed
+        self._remaining[size] = task.remaining
+
+    def discard(self, task):
+        """
+        Stops integrating a movement task, if it's being integrated.
+
+        The last row is swapped into the removed task's row so the arrays stay dense.
+        :param task:
+        :return:
+        """
+        slot = self._slots.pop(task, None)
+        if slot is None:
+            return
+
+        last = len(self._tasks) - 1
+        last_task = self._tasks.pop()
+        if slot != last:
+            self._tasks[slot] = last_task
+            self._slots[last_task] = slot
+            for array in (self._position, self._vector, self._speed, self._remaining):
+                array[slot] = array[last]
+
+    def tasks(self):
+        """
+        Returns the tasks being integrated, in the order they're stored.
+        :return:
+        """
+        return list(self._tasks)
+
+    def clear(self):
+        """
+        Stops integrating every task.
+        :return:
+        """
+        self._tasks = []
+        self._slots = {}
+
+    def _grow(self):
+        capacity = len(self._speed) * 2
+        self._position = numpy.resize(self._position, (capacity, 2))
+        self._vector = numpy.resize(self._vector, (capacity, 2))
+        self._speed = numpy.resize(self._speed, capacity)
+        self._remaining = numpy.resize(self._remaining, capacity)
+
+    def advance(self, now):
+        """
+        Moves every task forward by the time elapsed since the last call, writing the new physical
+        locations back onto the entities.  Returns the tasks that have reached their target.
+        :param now:
+        :return:
+        """
+        dt = 0.0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+
+        size = len(self._tasks)
+        if not size or dt <= 0:
+            return []
+
+        travelled = self._speed[:size] * dt
+        remaining = self._remaining[:size]
+        remaining -= travelled
+
+        # if we're going off the edge of the board, move it to the other side.
+        position = self._position[:size]
+        position += self._vector[:size] * travelled[:, None]
+        position[:] = numpy.where(position < -.5, position + self.dimensions, position)
+        position[:] = numpy.where(position > self.dimensions - .5, position - self.dimensions, position)
+
+        for task, (x, y), task_remaining in zip(self._tasks, position.tolist(), remaining.tolist()):
+            task.entity.physical_location = utils.Coordinate(x, y)
+            task.remaining = task_remaining
+
+        return [self._tasks[slot] for slot in numpy.flatnonzero(remaining <= 0).tolist()]
@@ -0,0 +1,151 @@
+import collections
+import math
+import time
+from python_bomberman.common.logging import logger
+
+# the phases of a tick, in the order they happen
+PHASES = (
+    "movement",  # advancing moving entities and finishing the moves that have arrived
+    "start",  # starting newly registered tasks
+    "timers",  # running detonation and burning tasks whose deadlines have passed
+    "detonation",  # resolving this tick's explosions
+    "removal"  # removing destroyed entities
+)
+
+
+class RollingHistogram(object):
+    """
+    Keeps the last 'window' samples added to it and summarizes them.
+    """
+    def __init__(self, window):
+        self.samples = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, fraction):
+        """
+        Returns the nearest-rank value at the given fraction (0-1) of the samples.
+        :param fraction:
+        :return:
+        """
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+    def buckets(self):
+        """
+        Returns a mapping of power-of-two bucket upper bound -> number of samples in that bucket.
+        :return:
+        """
+        counts = collections.Counter(1 << int(sample).bit_length() for sample in self.samples)
+        return dict(sorted(counts.items()))
+
+    def summary(self):
+        total = sum(self.samples)
+        return {
+            "count": len(self.samples),
+            "mean": total / len(self.samples) if self.samples else 0,
+            "p50": self.percentile(.5),
+            "p99": self.percentile(.99),
+            "max": max(self.samples) if self.samples else 0
+        }
+
+
+@logger.create()
+class TickProfiler(object):
+    """
+    Records how long each tick, and each phase of a tick, takes (in nanoseconds, from perf_counter_ns),
+    along with how many tasks of each type ran in a tick and how long they took altogether.  Every
+    measurement goes into a rolling histogram covering the last 'window' ticks.
+
+    Profiling is opt-in: a game only measures anything while its 'profiler' attribute is set.  If
+    'dump_interval' is given, a summary is logged every 'dump_interval' ticks.
+    """
+    # the timer used for every measurement
+    timer = time.perf_counter_ns
+
+    def __init__(self, window=600, dump_interval=None):
+        self.window = window
+        self.dump_interval = dump_interval
+        self.ticks = 0
+        self.tick_times = RollingHistogram(window)
+        self.phase_times = {phase: RollingHistogram(window) for phase in PHASES}
+        self.task_counts = {}
+        self.task_times = {}
+
+        # per-task totals for the tick in progress, folded into the histograms by end_tick()
+        self._counts = {}
+        self._times = {}
+
+    def record_phase(self, phase, duration):
+        self.phase_times[phase].add(duration)
+
+    def record_task(self, task_type, duration):
+        name = task_type.__name__
+        self._counts[name] = self._counts.get(name, 0) + 1
+        self._times[name] = self._times.get(name, 0) + duration
+
+    def end_tick(self, duration):
+        """
+        Records the total duration of a tick, and the task totals collected during it.
+        :param duration:
+        :return:
+        """
+        self.ticks += 1
+        self.tick_times.add(duration)
+
+        for name in self._counts:
+            if name not in self.task_counts:
+                self.task_counts[name] = RollingHistogram(self.window)
+                self.task_times[name] = RollingHistogram(self.window)
+        for name in self.task_counts:
+            self.task_counts[name].add(self._counts.get(name, 0))
+            self.task_times[name].add(self._times.get(name, 0))
+        self._counts = {}
+        self._times = {}
+
+        if self.dump_interval and not self.ticks % self.dump_interval:
+            self.dump()
+
+    def summary(self):
+        """
+        Summarizes every histogram: count, mean, p50, p99 and max of each.
+        :return:
+        """
+        return {
+            "ticks": self.ticks,
+            "tick": self.tick_times.summary(),
+            "phases": {phase: histogram.summary() for phase, histogram in self.phase_times.items()},
+            "tasks": {
+                name: {"count": self.task_counts[name].summary(), "time": self.task_times[name].summary()}
+                for name in self.task_counts
+            }
+        }
+
+    def dump(self):
+        """
+        Logs a summary of the recorded ticks.
+        :return:
+        """
+        summary = self.summary()
+        lines = ["tick profile over the last {} of {} ticks:".format(summary["tick"]["count"], summary["ticks"])]
+        lines.append(self._format("tick", summary["tick"]))
+        for phase, stats in summary["phases"].items():
+            lines.append(self._format(phase, stats))
+        for name, stats in summary["tasks"].items():
+            lines.append(self._format(name, stats["time"]) + " count {:.1f}/tick".format(stats["count"]["mean"]))
+        self.logger.info("\n".join(lines))
+
+    @staticmethod
+    def _format(name, stats):
+        return "  {:<16} mean {:>10.1f}us  p50 {:>10.1f}us  p99 {:>10.1f}us  max {:>10.1f}us".format(
+            name, stats["mean"] / 1000, stats["p50"] / 1000, stats["p99"] / 1000, stats["max"] / 1000
+        )
+
+    def reset(self):
+        self.__init__(window=self.window, dump_interval=self.dump_interval)
@@ -0,0 +1,205 @@
+import collections
+import operator
+import python_bomberman.common.game.entities as entities
+
+# the attributes every task has that refer to the game it belongs to - these aren't recorded,
+# they're filled in from the game a snapshot is restored into.
+TASK_CONTEXT = ("game", "board", "task_manager", "clock")
+
+
+# stands in for an entity referred to by a recorded task
+EntityReference = collections.namedtuple("EntityReference", ["unique_id"])
+
+
+class Snapshot(object):
+    """
+    The complete state of a game at a point in time.  Everything in here is immutable, and
+    parts that haven't changed between snapshots are shared between them.
+
+        - time: (now, dt) of the game's clock
+        - ids: the state of the game's id allocator
+        - chunks: per board chunk, (version, records of the non-dynamic entities in it, the
+          immutable entities in it)
+        - entities: records of every dynamic entity
+        - detached: records of entities no longer in the game that tasks still refer to
+        - tasks: (task records, then indices into those records for the unstarted tasks,
+          the integrated tasks and the schedule, the next sequence number and the last
+          time the integrator ran)
+
+    An entity record is (class, values of the class' state_attributes).
+    A task record is (class, ((attribute, value), ...)) with entities replaced by EntityReferences.
+    """
+    __slots__ = ("time", "ids", "chunks", "entities", "detached", "tasks")
+
+    def __init__(self, time, ids, chunks, entities, detached, tasks):
+        self.time = time
+        self.ids = ids
+        self.chunks = chunks
+        self.entities = entities
+        self.detached = detached
+        self.tasks = tasks
+
+
+class Snapshotter(object):
+    """
+    Takes and restores snapshots of a game.
+
+    Walls and modifiers (non-dynamic entities) only ever change by being added to, removed from
+    or destroyed on the board, each of which bumps the version of the board chunk they're in.
+    The records for each chunk are kept alongside the version they were taken at, and reused for
+    as long as that version doesn't change - so a snapshot only copies the chunks that changed
+    since the last one, plus the handful of dynamic entities and tasks.
+
+    Restoring works the same way in reverse: only chunks whose version differs from the snapshot's
+    are rebuilt.  Entities that still exist are restored in place, so references to them held
+    outside the game stay valid; entities that have since been removed are recreated.
+
+    Immutable entities (see Entity.immutable) are never copied - snapshots refer to the entities
+    themselves, and every game restored from them shares them.
+
+    Only simulated time is restored - wall time bookkeeping in the clock is left alone.
+    """
+    def __init__(self, game):
+        self.game = game
+        self._chunks = [None] * len(game.board.chunk_versions)
+
+    def capture(self):
+        game = self.game
+        board = game.board
+
+        chunks = self._chunks
+        for chunk, version in enumerate(board.chunk_versions):
+            cached = chunks[chunk]
+            if cached is None or cached[0] != version:
+                static = [
+                    entity
+                    for index in board.chunk_indices(chunk)
+                    for entity in board.space_at(index).all_entities() if not entity.dynamic
+                ]
+                chunks[chunk] = (
+                    version,
+                    tuple(_record(entity) for entity in static),
+                    tuple(entity for entity in static if entity.immutable)
+                )
+
+        registered, unstarted, integrated, schedule, next_sequence, last_update = game.tasks.get_state()
+        positions = {task: position for position, task in enumerate(registered)}
+        detached = {}
+        tasks = (
+            tuple(self._task_record(task, detached) for task in registered),
+            tuple(positions[task] for task in unstarted),
+            tuple(positions[task] for task in integrated),
+            tuple((deadline, sequence, positions[task]) for deadline, sequence, task in schedule),
+            next_sequence,
+            last_update
+        )
+
+        return Snapshot(
+            time=(game.clock.now, game.clock.dt),
+            ids=game.ids.get_state(),
+            chunks=tuple(chunks),
+            entities=tuple(_record(entity) for entity in game.entities.dynamic_entities()),
+            detached=tuple(detached.values()),
+            tasks=tasks
+        )
+
+    def restore(self, snapshot):
+        game = self.game
+        board = game.board
+        live = {entity.unique_id: entity for entity in game.entities.all_entities()}
+
+        # take everything that could differ from the snapshot off the board
+        for entity in list(game.entities.dynamic_entities()):
+            board.remove(entity)
+        changed = {
+            chunk for chunk, (version, _, _) in enumerate(snapshot.chunks) if board.chunk_versions[chunk] != version
+        }
+        for chunk in changed:
+            # chunks that are still on their first version have never had anything in them
+            if board.chunk_versions[chunk]:
+                board.clear_chunk(chunk)
+
+        # and put the snapshot's version back
+        restored = []
+        added = []
+        for chunk, (version, records, immutable) in enumerate(snapshot.chunks):
+            if chunk in changed:
+                live.update((entity.unique_id, entity) for entity in immutable)
+                added.extend(_load(record, live) for record in records)
+            else:
+                restored.extend(live[values[0]] for _, values in records)
+        added.extend(_load(record, live) for record in snapshot.entities)
+        board.add_all(added)
+        restored.extend(added)
+
+        # every chunk now holds exactly what it did when the snapshot was taken
+        board.chunk_versions = [version for version, _, _ in snapshot.chunks]
+        self._chunks = list(snapshot.chunks)
+
+        game.entities.clear()
+        game.entities.add_all(restored)
+        game.ids.set_state(snapshot.ids)
+        game.clock.now, game.clock.dt = snapshot.time
+
+        referable = {entity.unique_id: entity for entity in restored}
+        for record in snapshot.detached:
+            entity = _load(record, live)
+            referable[entity.unique_id] = entity
+
+        records, unstarted, integrated, schedule, next_sequence, last_update = snapshot.tasks
+        tasks = [self._load_task(record, referable) for record in records]
+        game.tasks.set_state((
+            tasks,
+            [tasks[position] for position in unstarted],
+            [tasks[position] for position in integrated],
+            [(deadline, sequence, tasks[position]) for deadline, sequence, position in schedule],
+            next_sequence,
+            last_update
+        ))
+
+    def _task_record(self, task, detached):
+        state = []
+        for attr, value in vars(task).items():
+            if attr in TASK_CONTEXT:
+                continue
+            if isinstance(value, entities.Entity):
+                if self.game.entities.get(value.unique_id) is not value:
+                    detached[value.unique_id] = _record(value)
+                value = EntityReference(value.unique_id)
+            state.append((attr, value))
+        return task.__class__, tuple(state)
+
+    def _load_task(self, record, referable):
+        cls, state = record
+        task = cls.__new__(cls)
+        task.game = self.game
+        task.board = self.game.board
+        task.task_manager = self.game.tasks
+        task.clock = self.game.clock
+        for attr, value in state:
+            setattr(task, attr, referable[value.unique_id] if isinstance(value, EntityReference) else value)
+        return task
+
+
+_getters = {}
+
+
+def _record(entity):
+    cls = entity.__class__
+    getter = _getters.get(cls)
+    if getter is None:
+        getter = _getters[cls] = operator.attrgetter(*cls.state_attributes)
+    return cls, getter(entity)
+
+
+def _load(record, live):
+    # restores an entity in place if it still exists, or recreates it if it doesn't
+    cls, values = record
+    entity = live.get(values[0])
+    if entity is None or entity.__class__ is not cls:
+        entity = cls.__new__(cls)
+    elif cls.immutable:
+        return entity
+    for attr, value in zip(cls.state_attributes, values):
+        setattr(entity, attr, value)
+    return entity
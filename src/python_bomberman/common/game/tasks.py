@@ -1,38 +1,113 @@
-import time
+import heapq
 from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.detonation import DetonationResolver
+from python_bomberman.common.game.movement import MovementIntegrator
 import python_bomberman.common.utils as utils
-import python_bomberman.common.game.entities as entities
 
 
 class TaskManager(object):
     def __init__(self, game):
         self.game = game
-        self._tasks = {}
 
-    def _register_task(self, task):
-        entity = task.entity
+        # one queue per task type, each mapping entity id -> task (only one of each task for
+        # any entity at any given time).  together they act as an (entity id, task type) index
+        # so replacing or cancelling a task never has to search through anything.
+        # queues are processed in this order each run.
+        self._queues = {
+            MovementTask: {},
+            DetonationTask: {},
+            BurningTask: {}
+        }
 
-        # removes a task of the same class that might exist already for this entity
-        # (only one of each task for any entity at any given time)
-        self._tasks[entity.unique_id] = list(filter(
-            lambda val: val.__class__ != task.__class__,
-            self._tasks.get(entity.unique_id, [])
-        ))
+        # tasks that haven't started yet.  once started, tasks are handed off to either
+        # the movement integrator (which advances all movement tasks at once) or the schedule.
+        self._unstarted = []
+        self._integrator = MovementIntegrator(game.board.dimensions)
 
-        self._tasks[entity.unique_id].append(task)
+        # a heap of (deadline, sequence, task) for scheduled tasks.  scheduled tasks are only run when
+        # they start and when their deadline passes, so the cost of a tick scales with the timers that
+        # expire rather than the timers that exist.  unregistered tasks are left in the heap and skipped
+        # when they're popped.
+        self._schedule = []
+        self._next_sequence = 0
 
-    def unregister_task(self, task):
-        entity = task.entity
+        self.detonations = DetonationResolver(game)
 
-        # remove the task being unregistered
-        self._tasks[entity.unique_id] = list(filter(
-            lambda val: val != task,
-            self._tasks.get(entity.unique_id, [])
-        ))
+    def _register_task(self, task):
+        # replaces a task of the same type that might exist already for this entity
+        queue = self._queues.setdefault(task.__class__, {})
+        previous = queue.get(task.entity.unique_id)
+        if previous is not None:
+            self._integrator.discard(previous)
+        queue[task.entity.unique_id] = task
+        self._unstarted.append(task)
 
-        # remove the key if it has no active tasks
-        if not self._tasks[entity.unique_id]:
-            self._tasks.pop(entity.unique_id)
+    def unregister_task(self, task):
+        queue = self._queues.get(task.__class__, {})
+        if queue.get(task.entity.unique_id) is task:
+            queue.pop(task.entity.unique_id)
+            self._integrator.discard(task)
+
+    def unregister_entity(self, entity):
+        for queue in self._queues.values():
+            task = queue.get(entity.unique_id)
+            if task is not None:
+                self.unregister_task(task)
+
+    def get(self, entity, task_type):
+        return self._queues.get(task_type, {}).get(entity.unique_id)
+
+    def tasks(self, task_type):
+        return self._queues.get(task_type, {}).values()
+
+    def is_registered(self, task):
+        return self._queues.get(task.__class__, {}).get(task.entity.unique_id) is task
+
+    def schedule(self, task):
+        heapq.heappush(self._schedule, (task.deadline, self._next_sequence, task))
+        self._next_sequence += 1
+
+    def integrate(self, task):
+        self._integrator.add(task)
+
+    def get_state(self):
+        """
+        Returns everything needed to put the task manager back the way it is now, as a tuple of
+        (registered tasks, unstarted tasks, integrated tasks, schedule, next sequence number, last
+        integrator update).  Tasks that are no longer registered are left out.
+        :return:
+        """
+        return (
+            [task for queue in self._queues.values() for task in queue.values()],
+            [task for task in self._unstarted if self.is_registered(task)],
+            self._integrator.tasks(),
+            [entry for entry in self._schedule if self.is_registered(entry[2])],
+            self._next_sequence,
+            self._integrator.last_update
+        )
+
+    def set_state(self, state):
+        """
+        Puts the task manager back into a state returned by get_state.
+        :param state:
+        :return:
+        """
+        registered, unstarted, integrated, schedule, next_sequence, last_update = state
+        for queue in self._queues.values():
+            queue.clear()
+        for task in registered:
+            self._queues.setdefault(task.__class__, {})[task.entity.unique_id] = task
+        self._unstarted = list(unstarted)
+
+        # entries are unique by (deadline, sequence), so they pop in the same order however the heap is laid out.
+        self._schedule = list(schedule)
+        heapq.heapify(self._schedule)
+        self._next_sequence = next_sequence
+
+        self._integrator.clear()
+        self._integrator.last_update = last_update
+        for task in integrated:
+            self._integrator.add(task)
 
     def register_movement_task(self, entity, direction, distance):
         to_return = MovementTask(self.game, entity, direction, distance)
@@ -50,15 +125,75 @@ class TaskManager(object):
         return to_return
 
     def run(self):
-        for task in self._tasks.values():
-            task.run()
+        # tasks can register and unregister other tasks while running, so we make sure each task
+        # is still the registered one before running it.
+        now = self.game.clock.now
+        profiler = self.game.profiler
+        if profiler is None:
+            self._run_movement(now, None)
+            self._run_unstarted(None)
+            self._run_timers(now, None)
+            self.detonations.resolve()
+            return
+
+        start = profiler.timer()
+        self._run_movement(now, profiler)
+        movement = profiler.timer()
+        self._run_unstarted(profiler)
+        unstarted = profiler.timer()
+        self._run_timers(now, profiler)
+        timers = profiler.timer()
+        self.detonations.resolve()
+        detonation = profiler.timer()
+
+        profiler.record_phase("movement", movement - start)
+        profiler.record_phase("start", unstarted - movement)
+        profiler.record_phase("timers", timers - unstarted)
+        profiler.record_phase("detonation", detonation - timers)
+
+    def _run_movement(self, now, profiler):
+        # move everything that's in motion, then finish the moves that have arrived.
+        for task in self._integrator.advance(now):
+            if self.is_registered(task):
+                task.last_update = now
+                self._execute(task, task.finish, profiler)
+
+    def _run_unstarted(self, profiler):
+        # start new tasks (including moves chained by the ones that just finished).  anything
+        # registered from here on will be started on the next run.
+        unstarted, self._unstarted = self._unstarted, []
+        for task in unstarted:
+            if self.is_registered(task):
+                self._execute(task, task.run, profiler)
+
+    def _run_timers(self, now, profiler):
+        # every bomb that goes off this tick is resolved in one go once the schedule is processed.
+        self.detonations.deferred = True
+        while self._schedule and self._schedule[0][0] <= now:
+            _, _, task = heapq.heappop(self._schedule)
+            if self.is_registered(task):
+                self._execute(task, task.run, profiler)
+        self.detonations.deferred = False
+
+    @staticmethod
+    def _execute(task, action, profiler):
+        if profiler is None:
+            action()
+            return
+        start = profiler.timer()
+        action()
+        profiler.record_task(task.__class__, profiler.timer() - start)
 
 
 class TimedTask(object):
+    # whether the task manager schedules this task by deadline instead of running it every tick
+    scheduled = False
+
     def __init__(self, game, entity):
         self.game = game
         self.board = game.board
         self.task_manager = game.tasks
+        self.clock = game.clock
         self.entity = entity
         self.last_update = None
         self.started = False
@@ -66,7 +201,7 @@ class TimedTask(object):
 
     def _on_start(self):
         self.started = True
-        self.last_update = time.time()
+        self.last_update = self.clock.now
 
     def _on_finish(self):
         self.task_manager.unregister_task(self)
@@ -74,15 +209,26 @@ class TimedTask(object):
     def run(self):
         if self.needs_removal():
             self.done = True
+            self._on_finish()
+            return
         if not self.started:
             self._on_start()
             self.on_start()
-        if not self.done:
-            self.process()
-            self.last_update = time.time()
             if self.done:
+                # the task bailed out before doing any work - there's nothing to clean up.
                 self._on_finish()
-                self.on_finish()
+                return
+
+        now = self.clock.now
+        self.process(now - self.last_update)
+        self.last_update = now
+        if self.done:
+            self.finish()
+
+    def finish(self):
+        self.done = True
+        self._on_finish()
+        self.on_finish()
 
     def on_start(self):
         # use this hook to do any setup prior to starting the timed task.
@@ -93,9 +239,9 @@ class TimedTask(object):
         # should no longer exist, then we leverage this hook to prematurely kill the task
         return self.entity.destroyed
 
-    def process(self):
+    def process(self, dt):
         # this is the method that runs until it decides it's finished by setting the
-        # self.done flag to True
+        # self.done flag to True.  dt is the simulated time elapsed since the last update.
         pass
 
     def on_finish(self):
@@ -103,48 +249,87 @@ class TimedTask(object):
         pass
 
 
+class ScheduledTask(TimedTask):
+    """
+    A timed task that waits for its entity's duration to run out.
+
+    Rather than counting the duration down every tick, the deadline is computed once
+    when the task starts and the task manager only runs the task again once that deadline
+    has passed.  The entity's remaining duration is brought up to date whenever the task runs.
+    """
+    scheduled = True
+
+    def __init__(self, game, entity):
+        super().__init__(game, entity)
+        self.deadline = None
+
+    def _on_start(self):
+        super()._on_start()
+        self.deadline = self.clock.now + self.entity.duration
+        self.task_manager.schedule(self)
+
+    def process(self, dt):
+        self.entity.duration = self.deadline - self.clock.now
+        self.done = (self.entity.duration <= 0)
+
+
 class MovementTask(TimedTask):
+    """
+    Moves an entity a single space, then chains another movement task for any remaining distance.
+
+    When run by the task manager, the distance covered each tick is computed by the movement
+    integrator for all movement tasks at once - process() is the equivalent for a single task.
+    """
     def __init__(self, game, entity, direction, distance):
         super().__init__(game, entity)
         self.direction = direction
         self.distance = distance
+        self.remaining = None
 
     def on_start(self):
         space = self.board.get(self.entity.logical_location, self.direction, 1)
-        if not space.occupied(self.entity):
-            self.entity.moving = True
-            self.entity.logical_location = space.location
+        if space.vacant(self.entity):
+            self.game.entities.set_state(self.entity, "moving", True)
+            self.board.move(self.entity, space.location)
+            self.remaining = self._distance_to(space.location)
+            self.task_manager.integrate(self)
         else:
             self.done = True
 
-    def process(self):
-        entity = self.entity
-        duration = (time.time() - self.last_update)
-
-        old_loc = entity.physical_location
-        new_loc = self._new_physical_location(duration)
-
-        entity.physical_location = new_loc
-        self.done = self._done_moving(old_loc, new_loc, entity.logical_location)
+    def process(self, dt):
+        distance = self.entity.movement_speed * dt
+        self.entity.physical_location = self._new_physical_location(distance)
+        self.remaining -= distance
+        self.done = (self.remaining <= 0)
 
     def on_finish(self):
-        self.entity.moving = False
+        self.game.entities.set_state(self.entity, "moving", False)
         self.entity.physical_location = self.entity.logical_location
 
         space = self.board.get(self.entity.logical_location)
 
         if self.entity.can_be_modified and space.has_modifier():
             space.modifier.modify(self.entity)
-            space.modifier.destroyed = True
+            self.game.destroy(space.modifier)
         if self.entity.can_destroy and space.has_fire():
-            self.entity.destroyed = True
+            self.game.destroy(self.entity)
 
         if self.distance > 1:
             self.task_manager.register_movement_task(self.entity, self.direction, self.distance - 1)
 
-    def _new_physical_location(self, duration):
+    def _distance_to(self, location):
+        # distance from the entity's physical location to the given location, travelling
+        # in this task's direction (and wrapping around the board if necessary).
+        axis = 0 if MovementDirection.VECTORS[self.direction][0] else 1
+        sign = sum(MovementDirection.VECTORS[self.direction])
+        return ((location[axis] - self.entity.physical_location[axis]) * sign) % self.board.dimensions[axis]
+
+    def _new_physical_location(self, distance):
         # add distance traveled to each coordinate
-        new_loc = [coord + dist for coord, dist in zip(self.entity.physical_location, self._distance_moved(duration))]
+        new_loc = [
+            coord + (offset * distance)
+            for coord, offset in zip(self.entity.physical_location, MovementDirection.VECTORS[self.direction])
+        ]
 
         # no trendy shorthand for this bad boy - if we're going
         # off the edge of the board, move it to the other side.
@@ -156,61 +341,31 @@ class MovementTask(TimedTask):
 
         return utils.Coordinate(*new_loc)
 
-    def _distance_moved(self, duration):
-        distance = self.entity.movement_speed * duration
-        distance_map = {
-            MovementDirection.LEFT: utils.Coordinate(-distance, 0.0),
-            MovementDirection.RIGHT: utils.Coordinate(distance, 0.0),
-            MovementDirection.UP: utils.Coordinate(0.0, -distance),
-            MovementDirection.DOWN: utils.Coordinate(0.0, distance)
-        }
-        return distance_map.get(self.direction, utils.Coordinate(0.0, 0.0))
-
-    def _done_moving(self, old_loc, new_loc, target):
-        finished_map = {
-            MovementDirection.LEFT: new_loc.x <= target.x <= old_loc.x,
-            MovementDirection.RIGHT: old_loc.x <= target.x <= new_loc.x,
-            MovementDirection.UP: new_loc.y <= target.y <= old_loc.y,
-            MovementDirection.DOWN: old_loc.y <= target.y <= new_loc.y
-        }
-        return finished_map.get(self.direction, True)
 
-
-class DetonationTask(TimedTask):
+class DetonationTask(ScheduledTask):
     def __init__(self, game, entity, bomb_owner):
         super().__init__(game, entity)
         self.bomb_owner = bomb_owner
 
     def on_start(self):
-        self.entity.detonating = True
-
-    def process(self):
-        self.entity.duration -= (time.time() - self.last_update)
-        self.done = (self.entity.duration <= 0)
+        self.game.entities.set_state(self.entity, "detonating", True)
 
     def on_finish(self):
-        self.entity.detonating = False
-        self.entity.destroyed = True
+        self.game.entities.set_state(self.entity, "detonating", False)
+        self.game.destroy(self.entity)
 
         self.bomb_owner.bombs += 1
 
-        for space in self.board.blast_radius(self.entity.logical_location, self.entity.radius):
-            space.destroy_all()
-            fire = self.game.add(entities.Fire(space.location))
-            self.task_manager.register_burning_task(fire)
+        self.task_manager.detonations.add(self)
 
 
-class BurningTask(TimedTask):
+class BurningTask(ScheduledTask):
     def __init__(self, game, entity):
         super().__init__(game, entity)
 
     def on_start(self):
-        self.entity.burning = True
-
-    def process(self):
-        self.entity.duration -= (time.time() - self.last_update)
-        self.done = (self.entity.duration <= 0)
+        self.game.entities.set_state(self.entity, "burning", True)
 
     def on_finish(self):
-        self.entity.burning = False
-        self.entity.destroyed = True
+        self.game.entities.set_state(self.entity, "burning", False)
+        self.game.destroy(self.entity)
@@ -1,6 +1,7 @@
 from python_bomberman.common.logging import logger
 from python_bomberman.common.utils import Coordinate
 import json
+import random
 
 @logger.create()
 class Map(object):
@@ -111,3 +112,37 @@ class IndestructibleWall(MapObject):
     def __init__(self, location):
         super().__init__(location)
 
+
+def arena_map(dimensions, destructible_ratio, players, seed):
+    """
+    Builds a classic arena: indestructible pillars on every (odd, odd) space, destructible walls
+    scattered over a fraction of the remaining spaces, and players spread over the even spaces
+    (with their immediate surroundings kept clear).
+    :param dimensions:
+    :param destructible_ratio:
+    :param players:
+    :param seed:
+    :return:
+    """
+    rng = random.Random(seed)
+    game_map = Map(dimensions, name="arena {}x{}".format(*dimensions))
+
+    spawns = [Coordinate(x, y) for x in range(0, dimensions.x, 2) for y in range(0, dimensions.y, 2)]
+    rng.shuffle(spawns)
+    spawns = spawns[:players]
+    clear = {
+        Coordinate((spawn.x + offset_x) % dimensions.x, (spawn.y + offset_y) % dimensions.y)
+        for spawn in spawns for offset_x, offset_y in [(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)]
+    }
+
+    for x in range(0, dimensions.x):
+        for y in range(0, dimensions.y):
+            location = Coordinate(x, y)
+            if x % 2 and y % 2:
+                game_map.add(IndestructibleWall(location))
+            elif location not in clear and rng.random() < destructible_ratio:
+                game_map.add(DestructibleWall(location))
+    for spawn in spawns:
+        game_map.add(Player(spawn))
+
+    return game_map
@@ -0,0 +1,265 @@
+import collections
+import struct
+from python_bomberman.common.game.tasks import DetonationTask, BurningTask
+import python_bomberman.common.game.entities as entities
+
+# bumped whenever the layout of any message changes
+VERSION = 3
+
+# every message starts with the protocol version and the message type
+HEADER = struct.Struct("<BB")
+
+# message types
+JOIN = 1
+JOINED = 2
+ERROR = 3
+INPUT = 4
+LEAVE = 5
+STATE = 6
+ACK = 7
+DELTA = 8
+SPECTATE = 9
+
+# the messages themselves, as they're passed to encode() and returned from decode()
+Join = collections.namedtuple("Join", ["room"])
+# 'token' is a secret handed out with the connection id - datagrams have to carry both (see Input, Ack)
+Joined = collections.namedtuple("Joined", ["connection", "token", "player", "room"])
+Error = collections.namedtuple("Error", ["reason"])
+Input = collections.namedtuple("Input", ["connection", "token", "action"])
+Leave = collections.namedtuple("Leave", [])
+State = collections.namedtuple("State", ["tick", "time", "entities"])
+Ack = collections.namedtuple("Ack", ["connection", "token", "tick"])
+# the differences between the state at 'tick' and the state at 'baseline': the ids of the entities
+# that have been removed, and the entities that have been added or changed (see replication.py)
+Delta = collections.namedtuple("Delta", ["tick", "baseline", "time", "removed", "entities"])
+# joins a room without a player, to be sent the whole game every tick.  It's answered with a Joined
+# whose player is NO_PLAYER.
+Spectate = collections.namedtuple("Spectate", ["room"])
+
+# the player in a Joined message sent to a spectator
+NO_PLAYER = 0xFFFFFFFF
+
+# a single entity in a State message.  'timer' is the time left on a bomb's fuse or a fire's burn
+# (0 for everything else).
+EntityState = collections.namedtuple(
+    "EntityState", ["unique_id", "type", "flags", "x", "y", "physical_x", "physical_y", "timer"]
+)
+
+# entity types, by their code in EntityState.type
+ENTITY_TYPES = (
+    None,
+    entities.Player,
+    entities.Bomb,
+    entities.Fire,
+    entities.IndestructibleWall,
+    entities.DestructibleWall,
+    entities.BombModifier,
+    entities.BombRadiusModifier,
+    entities.MovementSpeedModifier
+)
+TYPE_CODES = {entity_type: code for code, entity_type in enumerate(ENTITY_TYPES) if entity_type is not None}
+
+# bits in EntityState.flags
+DESTROYED = 1
+MOVING = 2
+DETONATING = 4
+BURNING = 8
+
+# the fixed-size parts of each message
+_JOINED = struct.Struct("<IQI")
+_INPUT = struct.Struct("<IQB")
+_ACK = struct.Struct("<IQI")
+_STATE = struct.Struct("<IdI")
+_DELTA = struct.Struct("<IIdII")
+_ID = struct.Struct("<I")
+ENTITY = struct.Struct("<IBBHHfff")
+_STRING_LENGTH = struct.Struct("<B")
+
+
+class ProtocolException(Exception):
+    def __init__(self, *args):
+        super().__init__(*args)
+
+    @classmethod
+    def version_mismatch(cls, version):
+        return cls("Message is protocol version {}, expected {}.".format(version, VERSION))
+
+    @classmethod
+    def message_invalid(cls, reason):
+        return cls("Invalid message: {}".format(reason))
+
+
+def entity_states(game, subset=None):
+    """
+    Describes the entities in a game (or just those in 'subset'), as sent in a State message.
+    :param game:
+    :param subset:
+    :return:
+    """
+    now = game.clock.now
+    timers = {}
+    for task_type in (DetonationTask, BurningTask):
+        for task in game.tasks.tasks(task_type):
+            timers[task.entity.unique_id] = task.entity.duration if task.deadline is None else task.deadline - now
+
+    states = []
+    for entity in (game.entities.all_entities() if subset is None else subset):
+        logical, physical = entity.logical_location, entity.physical_location
+        states.append(EntityState(
+            entity.unique_id,
+            TYPE_CODES[entity.__class__],
+            (DESTROYED if entity.destroyed else 0) | (MOVING if entity.moving else 0) |
+            (DETONATING if entity.detonating else 0) | (BURNING if entity.burning else 0),
+            logical.x, logical.y, physical.x, physical.y,
+            timers.get(entity.unique_id, 0.0)
+        ))
+    return states
+
+
+class Encoder(object):
+    """
+    Encodes messages into a buffer that's allocated once and reused (growing when a message doesn't
+    fit).  encode() returns a memoryview of the encoded message, which is only valid until the next
+    call - copy it (bytes(...)) to keep it any longer.
+    """
+    def __init__(self, size=4096):
+        self._buffer = bytearray(size)
+
+    def encode(self, message):
+        kind = message.__class__
+        if kind is State:
+            size = HEADER.size + _STATE.size + ENTITY.size * len(message.entities)
+        elif kind is Delta:
+            size = HEADER.size + _DELTA.size + _ID.size * len(message.removed) + ENTITY.size * len(message.entities)
+        else:
+            size = 64 + 4 * sum(len(value) for value in message if isinstance(value, str))
+        if size > len(self._buffer):
+            self._buffer = bytearray(max(size, 2 * len(self._buffer)))
+
+        buffer = self._buffer
+        offset = HEADER.size
+        if kind is State:
+            HEADER.pack_into(buffer, 0, VERSION, STATE)
+            _STATE.pack_into(buffer, offset, message.tick, message.time, len(message.entities))
+            offset += _STATE.size
+            pack_into = ENTITY.pack_into
+            for entity in message.entities:
+                pack_into(buffer, offset, *entity)
+                offset += ENTITY.size
+        elif kind is Delta:
+            HEADER.pack_into(buffer, 0, VERSION, DELTA)
+            _DELTA.pack_into(
+                buffer, offset, message.tick, message.baseline, message.time, len(message.removed), len(message.entities)
+            )
+            offset += _DELTA.size
+            for unique_id in message.removed:
+                _ID.pack_into(buffer, offset, unique_id)
+                offset += _ID.size
+            pack_into = ENTITY.pack_into
+            for entity in message.entities:
+                pack_into(buffer, offset, *entity)
+                offset += ENTITY.size
+        elif kind is Ack:
+            HEADER.pack_into(buffer, 0, VERSION, ACK)
+            _ACK.pack_into(buffer, offset, message.connection, message.token, message.tick)
+            offset += _ACK.size
+        elif kind is Input:
+            HEADER.pack_into(buffer, 0, VERSION, INPUT)
+            _INPUT.pack_into(buffer, offset, message.connection, message.token, message.action)
+            offset += _INPUT.size
+        elif kind is Join:
+            HEADER.pack_into(buffer, 0, VERSION, JOIN)
+            offset = _pack_string(buffer, offset, message.room)
+        elif kind is Spectate:
+            HEADER.pack_into(buffer, 0, VERSION, SPECTATE)
+            offset = _pack_string(buffer, offset, message.room)
+        elif kind is Joined:
+            HEADER.pack_into(buffer, 0, VERSION, JOINED)
+            _JOINED.pack_into(buffer, offset, message.connection, message.token, message.player)
+            offset = _pack_string(buffer, offset + _JOINED.size, message.room)
+        elif kind is Error:
+            HEADER.pack_into(buffer, 0, VERSION, ERROR)
+            offset = _pack_string(buffer, offset, message.reason)
+        elif kind is Leave:
+            HEADER.pack_into(buffer, 0, VERSION, LEAVE)
+        else:
+            raise ProtocolException.message_invalid("can't encode {}".format(kind.__name__))
+        return memoryview(buffer)[:offset]
+
+
+def encode(message):
+    """
+    Encodes a single message into a new bytes object.
+    :param message:
+    :return:
+    """
+    return bytes(Encoder(size=64).encode(message))
+
+
+def decode(payload):
+    """
+    Decodes a message, raising a ProtocolException if it's malformed or from another protocol version.
+    :param payload:
+    :return:
+    """
+    payload = memoryview(payload)
+    try:
+        version, kind = HEADER.unpack_from(payload)
+        if version != VERSION:
+            raise ProtocolException.version_mismatch(version)
+
+        offset = HEADER.size
+        if kind == STATE:
+            tick, time, count = _STATE.unpack_from(payload, offset)
+            offset += _STATE.size
+            end = offset + count * ENTITY.size
+            if len(payload) < end:
+                raise ProtocolException.message_invalid("truncated state")
+            return State(tick, time, [EntityState._make(values) for values in ENTITY.iter_unpack(payload[offset:end])])
+        if kind == DELTA:
+            tick, baseline, time, removed, count = _DELTA.unpack_from(payload, offset)
+            offset += _DELTA.size
+            middle = offset + removed * _ID.size
+            end = middle + count * ENTITY.size
+            if len(payload) < end:
+                raise ProtocolException.message_invalid("truncated delta")
+            return Delta(
+                tick, baseline, time,
+                [unique_id for unique_id, in _ID.iter_unpack(payload[offset:middle])],
+                [EntityState._make(values) for values in ENTITY.iter_unpack(payload[middle:end])]
+            )
+        if kind == ACK:
+            return Ack(*_ACK.unpack_from(payload, offset))
+        if kind == INPUT:
+            return Input(*_INPUT.unpack_from(payload, offset))
+        if kind == JOIN:
+            return Join(_unpack_string(payload, offset))
+        if kind == SPECTATE:
+            return Spectate(_unpack_string(payload, offset))
+        if kind == JOINED:
+            connection, token, player = _JOINED.unpack_from(payload, offset)
+            return Joined(connection, token, player, _unpack_string(payload, offset + _JOINED.size))
+        if kind == ERROR:
+            return Error(_unpack_string(payload, offset))
+        if kind == LEAVE:
+            return Leave()
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolException.message_invalid(e)
+    raise ProtocolException.message_invalid("unknown message type {}".format(kind))
+
+
+def _pack_string(buffer, offset, value):
+    # strings are limited to 255 bytes, cut at a character boundary
+    encoded = value.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+    _STRING_LENGTH.pack_into(buffer, offset, len(encoded))
+    offset += _STRING_LENGTH.size
+    buffer[offset:offset + len(encoded)] = encoded
+    return offset + len(encoded)
+
+
+def _unpack_string(payload, offset):
+    length, = _STRING_LENGTH.unpack_from(payload, offset)
+    offset += _STRING_LENGTH.size
+    if len(payload) < offset + length:
+        raise ProtocolException.message_invalid("truncated string")
+    return bytes(payload[offset:offset + length]).decode("utf-8")
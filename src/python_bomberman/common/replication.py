@@ -0,0 +1,142 @@
+import collections
+from python_bomberman.common import protocol
+
+# how far a timer may drift from where it's expected to be before it's sent again
+TIMER_TOLERANCE = 1e-3
+
+# how many past snapshots are kept (by both ends) to diff against
+RING_SIZE = 32
+
+
+def extrapolate(entity, elapsed):
+    """
+    Returns where an entity's timer is expected to be after 'elapsed' seconds - timers that are
+    running count down to 0, and the rest stay at 0.
+    :param entity:
+    :param elapsed:
+    :return:
+    """
+    return max(entity.timer - elapsed, 0.0) if entity.timer > 0 else 0.0
+
+
+def diff(baseline, baseline_time, snapshot, time):
+    """
+    Returns (removed ids, added or changed entities) between two snapshots (dicts of entity id ->
+    EntityState).  An entity whose timer has simply counted down since the baseline isn't changed.
+    :param baseline:
+    :param baseline_time:
+    :param snapshot:
+    :param time:
+    :return:
+    """
+    elapsed = time - baseline_time
+    removed = [unique_id for unique_id in baseline if unique_id not in snapshot]
+    changed = []
+    for unique_id, entity in snapshot.items():
+        previous = baseline.get(unique_id)
+        if (
+            previous is None or previous[:-1] != entity[:-1] or
+            abs(extrapolate(previous, elapsed) - entity.timer) > TIMER_TOLERANCE
+        ):
+            changed.append(entity)
+    return removed, changed
+
+
+def apply_delta(baseline, delta):
+    """
+    Rebuilds the State a delta was taken from, given the State it was taken against.
+    :param baseline:
+    :param delta:
+    :return:
+    """
+    elapsed = delta.time - baseline.time
+    removed = set(delta.removed)
+    entities = {
+        entity.unique_id: entity._replace(timer=extrapolate(entity, elapsed))
+        for entity in baseline.entities if entity.unique_id not in removed
+    }
+    entities.update((entity.unique_id, entity) for entity in delta.entities)
+    return protocol.State(delta.tick, delta.time, list(entities.values()))
+
+
+class SnapshotRing(object):
+    """
+    The last 'size' snapshots, by tick.
+    """
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self._snapshots = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def push(self, tick, snapshot):
+        self._snapshots[tick] = snapshot
+        while len(self._snapshots) > self.size:
+            self._snapshots.popitem(last=False)
+
+    def get(self, tick):
+        return self._snapshots.get(tick)
+
+
+class Replicator(object):
+    """
+    The server's end of replicating a game to one client.
+
+    Every snapshot sent to the client is kept in a ring, as (time, snapshot).  Once the client has
+    acknowledged one of them, each new snapshot is sent as a Delta against the most recently
+    acknowledged one; until then - or if the acknowledged snapshot has dropped out of the ring,
+    because the client has stopped receiving (or acknowledging) them - a full State (a keyframe) is
+    sent instead.
+    """
+    def __init__(self, ring_size=RING_SIZE):
+        self.ring = SnapshotRing(ring_size)
+        self.acknowledged = None
+        self.keyframes = 0
+        self.deltas = 0
+
+    def acknowledge(self, tick):
+        if self.ring.get(tick) is not None and (self.acknowledged is None or tick > self.acknowledged):
+            self.acknowledged = tick
+
+    def message(self, tick, time, snapshot):
+        """
+        Returns the message to send the client for a snapshot (dict of entity id -> EntityState).
+        :param tick:
+        :param time:
+        :param snapshot:
+        :return:
+        """
+        baseline = None if self.acknowledged is None else self.ring.get(self.acknowledged)
+        self.ring.push(tick, (time, snapshot))
+        if baseline is None:
+            self.acknowledged = None
+            self.keyframes += 1
+            return protocol.State(tick, time, list(snapshot.values()))
+
+        baseline_time, baseline_snapshot = baseline
+        removed, changed = diff(baseline_snapshot, baseline_time, snapshot, time)
+        self.deltas += 1
+        return protocol.Delta(tick, self.acknowledged, time, removed, changed)
+
+
+class Replica(object):
+    """
+    The client's end: rebuilds the game's state from the States and Deltas it receives, keeping a
+    ring of them to apply later deltas to.  receive() returns the tick to acknowledge, or None if the
+    message couldn't be used (a delta against a state this replica doesn't have).
+    """
+    def __init__(self, ring_size=RING_SIZE):
+        self.ring = SnapshotRing(ring_size)
+        self.state = None
+
+    def receive(self, message):
+        if message.__class__ is protocol.Delta:
+            baseline = self.ring.get(message.baseline)
+            if baseline is None:
+                return None
+            message = apply_delta(baseline, message)
+        if self.state is None or message.tick > self.state.tick:
+            self.state = message
+        self.ring.push(message.tick, message)
+        return message.tick
@@ -0,0 +1,123 @@
+import numpy
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.game import Game
+from python_bomberman.env.observation import ObservationEncoder, observation_shape
+import python_bomberman.common.map as map
+
+
+def survival_reward(env, agent):
+    """
+    The default reward: -1 on the step an agent is blown up, +1 on the step it becomes the last
+    one standing, 0 otherwise.
+    :param env:
+    :param agent:
+    :return:
+    """
+    if not env.alive(agent):
+        return -1.0
+    if len(env.agents) == 1 and len(env.possible_agents) > 1:
+        return 1.0
+    return 0.0
+
+
+class BombermanEnv(object):
+    """
+    A multi-agent, gym-style environment around a Game built from a map.
+
+    Agents are the map's players, named "player_<index>" in the order they appear in the map.
+    Actions are the same integer codes BatchGame uses (batch.NOOP, batch.MOVE_*, batch.DROP_BOMB),
+    one per agent per step, and every step advances the game by one tick of 'step' seconds.
+
+    Every agent sees the whole board - an observation is a (CHANNELS, width, height) uint8 array (see
+    observation.py), and each agent's entry in an observation dict is that same array.  The array is
+    reused (and overwritten) by every step; pass 'out' to have it written somewhere in particular.
+
+    After each step, 'reward(env, agent)' is called for every agent that acted.  An agent's episode
+    ends when it's blown up; everyone's ends when only one agent is left (or none, for single agent
+    maps) or after 'max_steps'.
+    """
+    def __init__(self, game_map, reward=survival_reward, step=1 / 60, max_steps=None, out=None):
+        self.game_map = game_map
+        self.reward = reward
+        self.step_size = step
+        self.max_steps = max_steps
+        self.observation = out if out is not None else numpy.zeros(
+            observation_shape(game_map.dimensions), dtype=numpy.uint8
+        )
+
+        players = sum(1 for obj in game_map.all_objects() if isinstance(obj, map.Player))
+        self.possible_agents = ["player_{}".format(index) for index in range(0, players)]
+        self.agents = []
+        self.game = None
+        self.steps = 0
+        self._ids = {}
+        self._encoder = None
+
+    def reset(self):
+        """
+        Starts a new episode, returning (observations, infos).
+        :return:
+        """
+        self.game = Game(self.game_map, clock=FastForwardClock(step=self.step_size))
+        self.steps = 0
+
+        ids = self.game.map_players()
+        self._ids = dict(zip(self.possible_agents, ids))
+        self.agents = list(self.possible_agents)
+
+        if self._encoder is not None:
+            self._encoder.detach()
+        players = {unique_id: index for index, unique_id in enumerate(ids)}
+        self._encoder = ObservationEncoder(self.game, players, self.observation)
+        self._encoder.update()
+        return self.observations(), {agent: {} for agent in self.agents}
+
+    def step(self, actions):
+        """
+        Applies a dict of agent -> action and advances the game by one tick, returning (observations,
+        rewards, terminated, truncated, infos) - each a dict keyed by the agents that were in the episode
+        at the start of the step.
+        :param actions:
+        :return:
+        """
+        game = self.game
+        converted = []
+        for agent, action in actions.items():
+            player = self.player(agent)
+            if player is not None:
+                converted.append(batch.game_action(action, player.unique_id, player.moving))
+        game.step([action for action in converted if action is not None])
+        self.steps += 1
+        self._encoder.update()
+
+        acting = self.agents
+        self.agents = [agent for agent in acting if self.alive(agent)]
+        rewards = {agent: self.reward(self, agent) for agent in acting}
+        finished = not self.agents or (len(self.agents) == 1 and len(self.possible_agents) > 1)
+        truncate = self.max_steps is not None and self.steps >= self.max_steps and not finished
+        terminated = {agent: finished or not self.alive(agent) for agent in acting}
+        if finished or truncate:
+            self.agents = []
+
+        return (
+            {agent: self.observation for agent in acting},
+            rewards,
+            terminated,
+            {agent: truncate for agent in acting},
+            {agent: {} for agent in acting}
+        )
+
+    def observations(self):
+        return {agent: self.observation for agent in self.agents}
+
+    def player(self, agent):
+        """
+        Returns an agent's player entity, or None if it's been removed from the game.
+        :param agent:
+        :return:
+        """
+        return self.game.entities.get(self._ids[agent])
+
+    def alive(self, agent):
+        return self.player(agent) is not None
@@ -0,0 +1,141 @@
+import numpy
+from python_bomberman.common.game import batch
+import python_bomberman.common.game.entities as entities
+from python_bomberman.common.game.tasks import DetonationTask, BurningTask
+
+# the channels of an observation, each a (width, height) layer of uint8 codes
+WALLS = 0  # batch.NO_WALL / DESTRUCTIBLE_WALL / INDESTRUCTIBLE_WALL
+BOMBS = 1  # 1 where there's a bomb
+FIRE = 2  # 1 where there's fire
+MODIFIERS = 3  # batch.NO_MODIFIER or one of the batch.*_MODIFIER types
+PLAYERS = 4  # index of the player in the space + 1 (OTHER_PLAYER if it has no index), or 0 if there isn't one
+BOMB_FUSE = 5  # how much of a bomb's fuse is left, scaled to 1-255 (255 until it's lit)
+FIRE_REMAINING = 6  # how much of a fire's burn time is left, scaled the same way
+CHANNELS = 7
+
+# the code for players that aren't in the 'players' passed to encode() - ones added mid-game
+OTHER_PLAYER = 255
+
+# (channel, code) for each kind of entity
+_CODES = {
+    entities.IndestructibleWall: (WALLS, batch.INDESTRUCTIBLE_WALL),
+    entities.DestructibleWall: (WALLS, batch.DESTRUCTIBLE_WALL),
+    entities.Bomb: (BOMBS, 1),
+    entities.Fire: (FIRE, 1),
+    entities.BombModifier: (MODIFIERS, batch.BOMB_MODIFIER),
+    entities.BombRadiusModifier: (MODIFIERS, batch.BOMB_RADIUS_MODIFIER),
+    entities.MovementSpeedModifier: (MODIFIERS, batch.MOVEMENT_SPEED_MODIFIER)
+}
+
+# (channel, task type) for each timer channel
+_TIMERS = ((BOMB_FUSE, DetonationTask), (FIRE_REMAINING, BurningTask))
+
+
+def observation_shape(dimensions):
+    return CHANNELS, dimensions.x, dimensions.y
+
+
+def encode(game, players, out=None):
+    """
+    Writes a game's board into a (CHANNELS, width, height) uint8 array, returning the array.  The codes
+    written are the same ones BatchGame uses for its layers.
+    :param game:
+    :param players: maps player entity id -> player index
+    :param out: the array to write into (a new one if not given)
+    :return:
+    """
+    if out is None:
+        out = numpy.zeros(observation_shape(game.board.dimensions), dtype=numpy.uint8)
+    else:
+        out[:] = 0
+
+    for entity in game.entities.all_entities():
+        if entity.destroyed:
+            continue
+        channel, code = _code(entity, players)
+        x, y = entity.logical_location
+        out[channel, x, y] = code
+    _encode_timers(game, out.reshape(CHANNELS, -1))
+    return out
+
+
+def _code(entity, players):
+    code = _CODES.get(entity.__class__)
+    if code is None:
+        index = players.get(entity.unique_id)
+        return PLAYERS, OTHER_PLAYER if index is None else index + 1
+    return code
+
+
+def _encode_timers(game, flat):
+    # every timer channel is written in one go from the tasks counting them down
+    height = game.board.dimensions.y
+    now = game.clock.now
+    for channel, task_type in _TIMERS:
+        layer = flat[channel]
+        layer[:] = 0
+        tasks = [task for task in game.tasks.tasks(task_type) if not task.entity.destroyed]
+        if not tasks:
+            continue
+
+        indices = numpy.array(
+            [task.entity.logical_location.x * height + task.entity.logical_location.y for task in tasks]
+        )
+        durations = numpy.array([task.entity.duration for task in tasks], dtype=numpy.float64)
+        # tasks that haven't started yet have no deadline - their timer is still full
+        deadlines = numpy.array(
+            [now + task.entity.duration if task.deadline is None else task.deadline for task in tasks]
+        )
+        remaining = numpy.clip((deadlines - now) / numpy.maximum(durations, 1e-9), 0, 1)
+        layer[indices] = numpy.maximum(numpy.ceil(remaining * 255), 1)
+
+
+class ObservationEncoder(object):
+    """
+    Keeps an observation of a game up to date incrementally, rather than re-encoding it from scratch.
+
+    The encoder listens to the game's board (see Board.listeners), so entity channels are updated
+    cell by cell as entities are added, removed and destroyed - destroyed entities disappear from the
+    observation straight away, even though they stay on the board until the end of the tick.  Timer
+    channels change every tick for every bomb and fire, so they're rewritten in bulk by update().
+
+    Call update() once per tick (after the game has processed it) to get the observation, and
+    detach() when it's no longer needed.
+    """
+    def __init__(self, game, players, out=None):
+        self.game = game
+        self.players = players
+        self.observation = encode(game, players, out)
+        self._flat = self.observation.reshape(CHANNELS, -1)
+        self._height = game.board.dimensions.y
+        game.board.listeners.append(self)
+
+    def detach(self):
+        self.game.board.listeners.remove(self)
+
+    def update(self):
+        """
+        Brings the timer channels up to date, returning the observation.
+        :return:
+        """
+        _encode_timers(self.game, self._flat)
+        return self.observation
+
+    def entity_added(self, entity):
+        if not entity.destroyed:
+            self._set(entity, True)
+
+    def entities_added(self, entities):
+        for entity in entities:
+            self.entity_added(entity)
+
+    def entity_removed(self, entity):
+        self._set(entity, False)
+
+    def entity_destroyed(self, entity):
+        self._set(entity, False)
+
+    def _set(self, entity, present):
+        channel, code = _code(entity, self.players)
+        location = entity.logical_location
+        self._flat[channel, location.x * self._height + location.y] = code if present else 0
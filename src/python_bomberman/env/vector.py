@@ -0,0 +1,141 @@
+import multiprocessing
+import numpy
+from multiprocessing import shared_memory
+from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.env.env import BombermanEnv
+from python_bomberman.env.observation import observation_shape
+
+
+def _worker(connection, memory_name, shape, index, game_map, env_kwargs):
+    # runs one environment, writing its observations straight into its slice of the shared buffer
+    memory = shared_memory.SharedMemory(name=memory_name)
+    observations = numpy.ndarray(shape, dtype=numpy.uint8, buffer=memory.buf)
+    env = BombermanEnv(game_map, out=observations[index], **env_kwargs)
+    agents = env.possible_agents
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == "reset":
+                env.reset()
+                connection.send(None)
+            elif command == "step":
+                _, rewards, terminated, truncated, _ = env.step(
+                    {agent: data[position] for position, agent in enumerate(agents) if agent in env.agents}
+                )
+                done = not env.agents
+                if done:
+                    env.reset()
+                connection.send((
+                    [rewards.get(agent, 0.0) for agent in agents],
+                    [terminated.get(agent, True) for agent in agents],
+                    [truncated.get(agent, False) for agent in agents],
+                    done
+                ))
+            else:
+                break
+    finally:
+        # the buffer can't be closed while anything still refers to it
+        del env, observations
+        memory.close()
+        connection.close()
+
+
+class VectorEnv(object):
+    """
+    Runs one BombermanEnv per map, each in its own worker process, and steps them all together.
+
+    Observations are written by the workers directly into a single shared memory buffer, exposed as
+    'observations' - an (envs, CHANNELS, width, height) uint8 array that every reset() and step()
+    returns (and overwrites).  Only actions, rewards and done flags go through the pipes, so nothing
+    the size of a board is pickled per step.  Every map needs the same dimensions.
+
+    Actions are an (envs, agents) array of action codes, with agents in the order of each env's
+    possible_agents (envs with fewer agents ignore the extra columns).  Rewards, terminated and
+    truncated come back as arrays of the same shape; agents that weren't in an episode on a step get
+    a reward of 0 and count as terminated.
+
+    Envs whose episode ends are reset straight away, so the observation returned for them is the first
+    one of their next episode.  'done' (per env) marks when this has happened.
+    """
+    def __init__(self, game_maps, context=None, **env_kwargs):
+        dimensions = game_maps[0].dimensions
+        for game_map in game_maps:
+            if game_map.dimensions != dimensions:
+                raise GameException.batch_dimensions_mismatch(dimensions, game_map.dimensions)
+
+        self.num_envs = len(game_maps)
+        self.num_agents = max(len(BombermanEnv(game_map).possible_agents) for game_map in game_maps)
+        shape = (self.num_envs,) + observation_shape(dimensions)
+        self._memory = shared_memory.SharedMemory(create=True, size=int(numpy.prod(shape)))
+        self.observations = numpy.ndarray(shape, dtype=numpy.uint8, buffer=self._memory.buf)
+        self.observations[:] = 0
+
+        context = multiprocessing.get_context(context)
+        self._connections = []
+        self._processes = []
+        for index, game_map in enumerate(game_maps):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(worker_connection, self._memory.name, shape, index, game_map, env_kwargs),
+                daemon=True
+            )
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def reset(self):
+        for connection in self._connections:
+            connection.send(("reset", None))
+        for connection in self._connections:
+            connection.recv()
+        return self.observations
+
+    def step(self, actions):
+        """
+        Steps every env, returning (observations, rewards, terminated, truncated, done).
+        :param actions:
+        :return:
+        """
+        actions = numpy.asarray(actions)
+        for connection, row in zip(self._connections, actions):
+            connection.send(("step", row.tolist()))
+        results = [connection.recv() for connection in self._connections]
+
+        rewards, terminated, truncated, done = zip(*results)
+        return (
+            self.observations,
+            self._pad(rewards, 0.0, numpy.float32),
+            self._pad(terminated, True, bool),
+            self._pad(truncated, False, bool),
+            numpy.array(done, dtype=bool)
+        )
+
+    def _pad(self, rows, fill, dtype):
+        array = numpy.full((self.num_envs, self.num_agents), fill, dtype=dtype)
+        for index, row in enumerate(rows):
+            array[index, :len(row)] = row
+        return array
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self._connections:
+            connection.send(("close", None))
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+
+        self.observations = None
+        self._memory.close()
+        self._memory.unlink()
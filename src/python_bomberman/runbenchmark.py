@@ -0,0 +1,4 @@
+import sys
+from python_bomberman.benchmark.runner import main
+
+sys.exit(main())
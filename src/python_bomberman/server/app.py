@@ -1,18 +1,257 @@
-from python_bomberman.server.configuration import ServerConfiguration
-from python_bomberman.common.logging import logger
-import pyglet.app
-current_app = None
-
-
-@logger.create()
-class App(object):
-    def __init__(self, config_file):
-        global current_app
-
-        self.config = ServerConfiguration(config_file=config_file)
-        current_app = self
-
-    def run(self):
-        # let's use pyglet's eventing system for the server's event loop.
-        # then we can use pyglet's event system to drive server behaviors as well.
-        pyglet.app.EventLoop().run()
+import asyncio
+from python_bomberman.server.configuration import ServerConfiguration
+from python_bomberman.server.network import StreamProtocol, DatagramProtocol, MAX_DATAGRAM_SIZE, frame
+from python_bomberman.server.room import Connection, Room
+from python_bomberman.common.logging import logger
+import python_bomberman.common.protocol as protocol
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+current_app = None
+
+
+@logger.create()
+class App(object):
+    """
+    The game server: a single asyncio event loop hosting any number of rooms.
+
+    Clients connect over TCP on the configured port, and may also send inputs as datagrams to the
+    same port over UDP.  Messages are encoded with the binary protocol (see protocol.py):
+        - Join: joins (creating if needed) the named room, answered with Joined or Error
+        - Spectate: joins the named room as a spectator, answered with Joined
+        - Input: queues an action (see batch.NOOP, MOVE_*, DROP_BOMB) for the next tick
+        - Leave: leaves the current room
+        - Ack: acknowledges the State or Delta for a tick (see Replicator)
+    Inputs and acks sent as datagrams are matched to their connection by the connection id and token
+    (sent back in Joined), and dropped if either doesn't match; over a stream, both are ignored.
+    Malformed messages are dropped.
+
+    After every tick, each connection in a room is sent the room's state (only what's within the
+    configured view radius of its player, if there is one) - a keyframe over the stream, or a delta
+    against the last state it acknowledged.  Deltas go out as datagrams once the connection has sent
+    one (and they're small enough), and over the stream otherwise.
+
+    Spectators are all sent the same thing - the room's whole state, as a keyframe - so it's encoded and
+    framed once per tick, and that one buffer is written to every spectator's stream.  A spectator whose
+    stream is backed up skips frames until it catches up (it only ever needs the latest one), and is
+    disconnected once it's gone SPECTATOR_TIMEOUT seconds without catching up.
+
+    Every room is ticked by a single task, at the configured tick rate.  Ticks are scheduled against
+    absolute deadlines so they don't drift; if a tick runs past the next deadline, the schedule
+    restarts from now rather than running ticks back to back to catch up ('late_ticks' counts these).
+    A room that raises while it's being ticked is closed, and everyone in it is sent an Error.
+    """
+    # how long (in seconds) a spectator's stream can stay backed up before it's disconnected
+    SPECTATOR_TIMEOUT = 5
+
+    def __init__(self, config_file):
+        global current_app
+
+        self.config = ServerConfiguration(config_file=config_file)
+        self.rooms = {}
+        self.connections = {}
+        self.late_ticks = 0
+        self.port = None
+        self._next_connection_id = 1
+        self._encoder = protocol.Encoder()
+        self._datagrams = None
+        self._stopping = None
+        current_app = self
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """
+        Runs the server until stop() is called.
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+
+        server = await loop.create_server(lambda: StreamProtocol(self), self.config.host(), self.config.port())
+        self.port = server.sockets[0].getsockname()[1]
+        datagram_transport, self._datagrams = await loop.create_datagram_endpoint(
+            lambda: DatagramProtocol(self), local_addr=(self.config.host(), self.port)
+        )
+        ticker = asyncio.create_task(self._tick_loop())
+        self.logger.info("serving on {}:{} at {} ticks/s".format(self.config.host(), self.port, self.config.tick_rate()))
+
+        try:
+            await self._stopping.wait()
+        finally:
+            ticker.cancel()
+            server.close()
+            for connection in list(self.connections.values()):
+                connection.close()
+            await server.wait_closed()
+            datagram_transport.close()
+
+    def stop(self):
+        self._stopping.set()
+
+    def room(self, name):
+        """
+        Returns the room with the given name, creating it if it doesn't exist.
+        :param name:
+        :return:
+        """
+        if name not in self.rooms:
+            self.rooms[name] = Room(
+                name, self._load_map(), self.config.tick_rate(), view_radius=self.config.view_radius()
+            )
+        return self.rooms[name]
+
+    def _load_map(self):
+        if self.config.map_file():
+            return map.Map.load(self.config.map_file())
+        return map.arena_map(Coordinate(15, 13), .5, 4, len(self.rooms))
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        period = 1 / self.config.tick_rate()
+        deadline = loop.time()
+        while True:
+            self._tick()
+
+            deadline += period
+            delay = deadline - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _tick(self):
+        for room in list(self.rooms.values()):
+            try:
+                room.tick()
+                self._replicate(room)
+                self._broadcast(room)
+            except Exception:
+                # one broken room mustn't stop every other room from ticking
+                self.logger.exception("room {} failed, closing it".format(room.name))
+                self._close(room)
+
+    def _close(self, room):
+        """
+        Removes a room, sending an Error to everyone in it - they stay connected, and can join another.
+        :param room:
+        :return:
+        """
+        self.rooms.pop(room.name, None)
+        error = protocol.encode(protocol.Error("room {} was closed".format(room.name)))
+        for connection in list(room.connections.values()) + list(room.spectators.values()):
+            room.leave(connection)
+            connection.send(error)
+
+    def _replicate(self, room):
+        if not room.connections:
+            return
+        snapshots = room.snapshots()
+        now = room.game.clock.now
+
+        # connections that share a snapshot (every connection, without a view radius) are sent the
+        # same message if they also share the snapshot it's a delta against - sharing a view now doesn't
+        # mean they shared one at the acknowledged tick.  Every snapshot involved is held in a ring, so
+        # their ids can't be reused while this runs.
+        encoded = {}
+        for connection_id, connection in room.connections.items():
+            snapshot = snapshots[connection_id]
+            message = connection.replicator.message(room.ticks, now, snapshot)
+            delta = message.__class__ is protocol.Delta
+            baseline = connection.replicator.ring.get(message.baseline)[1] if delta else None
+            key = (id(snapshot), id(baseline))
+            payload = encoded.get(key)
+            if payload is None:
+                payload = encoded[key] = bytes(self._encoder.encode(message))
+
+            if delta and connection.datagram_address is not None and len(payload) <= MAX_DATAGRAM_SIZE:
+                self.send_datagram(connection, payload)
+            else:
+                connection.send(payload)
+
+    def _broadcast(self, room):
+        if not room.spectators:
+            return
+        state = protocol.State(room.ticks, room.game.clock.now, list(room.snapshot().values()))
+        framed = frame(self._encoder.encode(state))
+        stall_limit = self.SPECTATOR_TIMEOUT * self.config.tick_rate()
+
+        for connection in list(room.spectators.values()):
+            if not connection.paused:
+                connection.stalled_frames = 0
+                connection.send_frame(framed)
+                continue
+            connection.skipped_frames += 1
+            connection.stalled_frames += 1
+            if connection.stalled_frames > stall_limit:
+                self.logger.info("dropping spectator {}: not keeping up".format(connection.connection_id))
+                room.leave(connection)
+                connection.abort()
+
+    def connect(self, send, close, send_frame=None, abort=None):
+        connection = Connection(self._next_connection_id, send, close, send_frame=send_frame, abort=abort)
+        self._next_connection_id += 1
+        self.connections[connection.connection_id] = connection
+        return connection
+
+    def disconnect(self, connection):
+        if connection.room is not None:
+            connection.room.leave(connection)
+        self.connections.pop(connection.connection_id, None)
+
+    def receive(self, connection, payload):
+        message = self._decode(payload)
+        if message is not None:
+            self._handle(connection, message)
+
+    def receive_datagram(self, payload, address):
+        message = self._decode(payload)
+        if message.__class__ not in (protocol.Input, protocol.Ack):
+            return
+        connection = self.connections.get(message.connection)
+        if connection is None or message.token != connection.token:
+            return
+        connection.datagram_address = address
+        self._handle(connection, message)
+
+    def send_datagram(self, connection, payload):
+        if connection.datagram_address is not None:
+            self._datagrams.send(payload, connection.datagram_address)
+
+    def _decode(self, payload):
+        try:
+            return protocol.decode(payload)
+        except protocol.ProtocolException as e:
+            self.logger.debug("dropping message: {}".format(e))
+            return None
+
+    def _handle(self, connection, message):
+        kind = message.__class__
+        if kind is protocol.Input:
+            if connection.player_id is not None:
+                connection.queue_input(message.action)
+        elif kind is protocol.Ack:
+            connection.replicator.acknowledge(message.tick)
+        elif kind is protocol.Join:
+            if connection.room is not None:
+                connection.room.leave(connection)
+            room = self.room(message.room)
+            player_id = room.join(connection)
+            if player_id is None:
+                connection.send(protocol.encode(protocol.Error("room is full")))
+            else:
+                connection.send(protocol.encode(
+                    protocol.Joined(connection.connection_id, connection.token, player_id, room.name)
+                ))
+        elif kind is protocol.Spectate:
+            if connection.room is not None:
+                connection.room.leave(connection)
+            room = self.room(message.room)
+            room.spectate(connection)
+            connection.send(protocol.encode(
+                protocol.Joined(connection.connection_id, connection.token, protocol.NO_PLAYER, room.name)
+            ))
+        elif kind is protocol.Leave:
+            if connection.room is not None:
+                connection.room.leave(connection)
@@ -1,19 +1,48 @@
-from python_bomberman.common.configuration import Configuration
-
-class ServerConfiguration(Configuration):
-    PORT = "port"
-    DEFAULTS = {
-        PORT: 12000
-    }
-
-    def __init__(self, config_file):
-        super().__init__(
-            root="server",
-            defaults=self.DEFAULTS,
-            config_file=config_file
-        )
-
-    def port(self, value=None):
-        if not value:
-            return self.get(self.PORT)
-        self.set(self.PORT, value)
+from python_bomberman.common.configuration import Configuration
+
+class ServerConfiguration(Configuration):
+    HOST = "host"
+    PORT = "port"
+    TICK_RATE = "tick_rate"
+    MAP_FILE = "map_file"
+    VIEW_RADIUS = "view_radius"
+    DEFAULTS = {
+        HOST: "0.0.0.0",
+        PORT: 12000,
+        TICK_RATE: 60,
+        MAP_FILE: None,
+        # how far (in spaces) each client can see - 0 sends every client the whole map
+        VIEW_RADIUS: 0
+    }
+
+    def __init__(self, config_file):
+        super().__init__(
+            root="server",
+            defaults=self.DEFAULTS,
+            config_file=config_file
+        )
+
+    def host(self, value=None):
+        if not value:
+            return self.get(self.HOST)
+        self.set(self.HOST, value)
+
+    def port(self, value=None):
+        if not value:
+            return self.get(self.PORT)
+        self.set(self.PORT, value)
+
+    def tick_rate(self, value=None):
+        if not value:
+            return self.get(self.TICK_RATE)
+        self.set(self.TICK_RATE, value)
+
+    def map_file(self, value=None):
+        if not value:
+            return self.get(self.MAP_FILE)
+        self.set(self.MAP_FILE, value)
+
+    def view_radius(self, value=None):
+        if not value:
+            return self.get(self.VIEW_RADIUS)
+        self.set(self.VIEW_RADIUS, value)
@@ -0,0 +1,128 @@
+from python_bomberman.common import protocol
+
+
+class InterestGrid(object):
+    """
+    Area-of-interest management for a room: which entities each subscriber (a connection) is sent.
+
+    The board is divided into cells - the board's chunks.  Each subscriber has a view centre and
+    watches every cell within 'view_radius' (plus 'margin') spaces of it, wrapping around the edges of
+    the board the same way movement does; 'subscribers' maps each cell to the subscribers watching it,
+    and is only updated when a subscriber's centre moves to another space.
+
+    snapshots() only looks at watched cells: the static entities of a cell (walls, modifiers) are
+    described once per chunk version (see Board._build_chunks), and dynamic entities are bucketed by
+    cell once per call.  Each subscriber's snapshot is then the union of its cells, so its cost depends
+    on the size of its view rather than the size of the map - and subscribers watching the same cells
+    share the same snapshot.
+    """
+    def __init__(self, board, view_radius, margin=1):
+        self.board = board
+        self.view_radius = view_radius
+        self.margin = margin
+        self.subscribers = {}
+        self._views = {}
+        self._static = {}
+
+    def visible_cells(self, location):
+        """
+        Returns the cells within view of the given location, as a frozenset of chunk indices.
+        :param location:
+        :return:
+        """
+        reach = self.view_radius + self.margin
+        size = self.board.CHUNK_SIZE
+        width, height = self.board.dimensions
+        x, y = location
+
+        if 2 * reach + 1 >= width:
+            columns = set(range(0, width, size))
+        else:
+            columns = {(column % width) // size * size for column in range(x - reach, x + reach + 1)}
+        if 2 * reach + 1 >= height:
+            rows = set(range(0, height, size))
+        else:
+            rows = {(row % height) // size * size for row in range(y - reach, y + reach + 1)}
+        return frozenset(self.board.chunk((column, row)) for column in columns for row in rows)
+
+    def move(self, subscriber, location):
+        """
+        Centres a subscriber's view on the given location (subscribing it if it isn't already).
+        :param subscriber:
+        :param location:
+        :return:
+        """
+        width, height = self.board.dimensions
+        center = (round(location[0]) % width, round(location[1]) % height)
+        view = self._views.get(subscriber)
+        if view is not None and view[0] == center:
+            return
+        cells = self.visible_cells(center)
+        previous = view[1] if view is not None else frozenset()
+        for cell in previous - cells:
+            self._unwatch(subscriber, cell)
+        for cell in cells - previous:
+            self.subscribers.setdefault(cell, set()).add(subscriber)
+        self._views[subscriber] = (center, cells)
+
+    def unsubscribe(self, subscriber):
+        view = self._views.pop(subscriber, None)
+        if view is not None:
+            for cell in view[1]:
+                self._unwatch(subscriber, cell)
+
+    def _unwatch(self, subscriber, cell):
+        watching = self.subscribers[cell]
+        watching.discard(subscriber)
+        if not watching:
+            del self.subscribers[cell]
+            self._static.pop(cell, None)
+
+    def cells(self, subscriber):
+        return self._views[subscriber][1]
+
+    def snapshots(self, game):
+        """
+        Returns each subscriber's snapshot of the game, as a dict of subscriber -> (dict of entity id
+        -> protocol.EntityState).
+        :param game:
+        :return:
+        """
+        board = self.board
+        versions = board.chunk_versions
+        watched = self.subscribers
+
+        visible, visible_cells = [], []
+        for entity in game.entities.dynamic_entities():
+            cell = board.chunk(entity.logical_location)
+            if cell in watched:
+                visible.append(entity)
+                visible_cells.append(cell)
+        dynamic_states = {}
+        for cell, state in zip(visible_cells, protocol.entity_states(game, visible)):
+            dynamic_states.setdefault(cell, []).append(state)
+
+        snapshots = {}
+        by_cells = {}
+        for subscriber, (center, cells) in self._views.items():
+            snapshot = by_cells.get(cells)
+            if snapshot is None:
+                snapshot = by_cells[cells] = {}
+                for cell in cells:
+                    snapshot.update(self._static_states(game, cell, versions[cell]))
+                    for state in dynamic_states.get(cell, ()):
+                        snapshot[state.unique_id] = state
+            snapshots[subscriber] = snapshot
+        return snapshots
+
+    def _static_states(self, game, cell, version):
+        cached = self._static.get(cell)
+        if cached is None or cached[0] != version:
+            in_cell = [
+                entity for index in self.board.chunk_indices(cell)
+                for entity in self.board.space_at(index).all_entities() if not entity.dynamic
+            ]
+            cached = self._static[cell] = (
+                version, {state.unique_id: state for state in protocol.entity_states(game, in_cell)}
+            )
+        return cached[1]
@@ -0,0 +1,103 @@
+import asyncio
+import struct
+
+# every message sent over a stream is prefixed with its length
+FRAME_HEADER = struct.Struct("<I")
+
+# the largest message a client may send - anything bigger closes the connection
+MAX_FRAME_SIZE = 64 * 1024
+
+# the largest datagram the server sends - bigger messages go over the stream instead
+MAX_DATAGRAM_SIZE = 1200
+
+# how much can be waiting to be written to a stream before it's considered backed up (see
+# StreamProtocol.pause_writing)
+WRITE_BUFFER_LIMIT = 256 * 1024
+
+
+def frame(payload):
+    """
+    Returns a message as it's written to a stream, length prefix and all - so a message sent to many
+    streams can be framed once, and written to each of them as-is.
+    :param payload:
+    :return:
+    """
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class StreamProtocol(asyncio.Protocol):
+    """
+    A TCP connection to the server, carrying length-prefixed messages in both directions.
+
+    While more than WRITE_BUFFER_LIMIT bytes are waiting to be written to the socket, its connection is
+    marked as paused, so the server can hold off on sending it anything that can be skipped.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.connection = None
+        self._buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        self.connection = self.server.connect(
+            self.send, self.transport.close, send_frame=self.send_frame, abort=self.transport.abort
+        )
+
+    def data_received(self, data):
+        buffer = self._buffer
+        buffer += data
+        while len(buffer) >= FRAME_HEADER.size:
+            size, = FRAME_HEADER.unpack_from(buffer)
+            if size > MAX_FRAME_SIZE:
+                self.transport.close()
+                return
+            end = FRAME_HEADER.size + size
+            if len(buffer) < end:
+                break
+            payload = bytes(buffer[FRAME_HEADER.size:end])
+            del buffer[:end]
+            self.server.receive(self.connection, payload)
+
+    def connection_lost(self, exc):
+        self.server.disconnect(self.connection)
+
+    def send(self, payload):
+        if not self.transport.is_closing():
+            self.transport.write(FRAME_HEADER.pack(len(payload)))
+            self.transport.write(payload)
+
+    def send_frame(self, framed):
+        """
+        Sends a message that's already been framed (see frame()).  The transport only copies what it
+        can't write to the socket straight away, so the same frame can be sent to any number of streams.
+        :param framed:
+        :return:
+        """
+        if not self.transport.is_closing():
+            self.transport.write(framed)
+
+    def pause_writing(self):
+        self.connection.paused = True
+
+    def resume_writing(self):
+        self.connection.paused = False
+
+
+class DatagramProtocol(asyncio.DatagramProtocol):
+    """
+    The server's UDP endpoint.  Each datagram is a single message.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.server.receive_datagram(data, address)
+
+    def send(self, payload, address):
+        self.transport.sendto(payload, address)
@@ -0,0 +1,182 @@
+import asyncio
+import secrets
+from python_bomberman.common import protocol
+from python_bomberman.common.replication import Replicator
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.logging import logger
+from python_bomberman.server.interest import InterestGrid
+
+
+class Connection(object):
+    """
+    A client connected to the server.  Inputs received from it (over either transport) wait in its
+    input queue until the next tick of its room; anything sent to it goes out through 'send', over
+    its stream.  Once it's sent a datagram, 'datagram_address' is where datagrams for it go.
+
+    Connection ids are sequential, so datagrams are only matched to a connection if they also carry
+    its 'token' - a random secret that's only ever sent to the client over its stream.
+
+    The queue is bounded - inputs that arrive while it's full are dropped, so a flooding client
+    can't make its room's ticks any slower.
+
+    'send_frame' sends a message that's already been framed for its stream (see network.frame), and
+    'abort' closes it without waiting for anything still to be written.  'paused' is set while its
+    stream is backed up.
+    """
+    # the most inputs that can be waiting for a single tick
+    INPUT_QUEUE_SIZE = 32
+
+    def __init__(self, connection_id, send, close=None, send_frame=None, abort=None):
+        self.connection_id = connection_id
+        self.token = secrets.randbits(64)
+        self.send = send
+        self.close = close
+        self.send_frame = send_frame
+        self.abort = abort
+        self.paused = False
+        self.skipped_frames = 0
+        self.stalled_frames = 0
+        self.datagram_address = None
+        self.replicator = Replicator()
+        self.inputs = asyncio.Queue(maxsize=self.INPUT_QUEUE_SIZE)
+        self.room = None
+        self.player_id = None
+        self.dropped_inputs = 0
+
+    def queue_input(self, action):
+        try:
+            self.inputs.put_nowait(action)
+        except asyncio.QueueFull:
+            self.dropped_inputs += 1
+
+    def drain_inputs(self):
+        inputs = []
+        while not self.inputs.empty():
+            inputs.append(self.inputs.get_nowait())
+        return inputs
+
+
+@logger.create()
+class Room(object):
+    """
+    A single game hosted by the server, along with the connections playing in it.
+
+    Rooms don't keep time themselves - the server calls tick() at its tick rate, and each tick
+    advances the game by exactly one step of 1 / tick_rate seconds.  Each connection controls one of
+    the players from the room's map, handed out in map order as connections join.
+
+    With a 'view_radius', each connection is only sent the entities around its player (see
+    InterestGrid); otherwise every connection is sent the whole game.
+
+    Spectators are connections that watch the room without a player - they're always sent the whole
+    game, and never have a player or an area of interest.
+    """
+    def __init__(self, name, game_map, tick_rate, view_radius=None):
+        self.name = name
+        self.game_map = game_map
+        self.game = Game(game_map, clock=FastForwardClock(step=1 / tick_rate))
+        self.connections = {}
+        self.spectators = {}
+        self.ticks = 0
+        self.interest = InterestGrid(self.game.board, view_radius) if view_radius else None
+        self._free_players = self.game.map_players()
+
+    def join(self, connection):
+        """
+        Adds a connection to the room, giving it control of a player.  Returns the player's entity id,
+        or None if every player is taken (or has been blown up).
+        :param connection:
+        :return:
+        """
+        self._prune_free_players()
+        if not self._free_players:
+            return None
+        connection.room = self
+        connection.player_id = self._free_players.pop(0)
+        connection.replicator = Replicator()
+        self.connections[connection.connection_id] = connection
+        if self.interest is not None:
+            player = self.game.entities.get(connection.player_id)
+            self.interest.move(connection.connection_id, player.physical_location)
+        self.logger.info("connection {} joined room {} as player {}".format(
+            connection.connection_id, self.name, connection.player_id
+        ))
+        return connection.player_id
+
+    def spectate(self, connection):
+        """
+        Adds a connection to the room as a spectator.
+        :param connection:
+        :return:
+        """
+        connection.room = self
+        connection.player_id = None
+        self.spectators[connection.connection_id] = connection
+        self.logger.info("connection {} is spectating room {}".format(connection.connection_id, self.name))
+
+    def leave(self, connection):
+        if self.spectators.pop(connection.connection_id, None) is not None:
+            connection.room = None
+            return
+        if self.connections.pop(connection.connection_id, None) is None:
+            return
+        if self.interest is not None:
+            self.interest.unsubscribe(connection.connection_id)
+        if self.game.entities.get(connection.player_id) is not None:
+            self._free_players.append(connection.player_id)
+            self._free_players.sort()
+        connection.room = None
+        connection.player_id = None
+
+    def tick(self):
+        """
+        Applies every input waiting in the room's connections, then advances the game by one step.
+        :return:
+        """
+        actions = []
+        for connection in self.connections.values():
+            for action in connection.drain_inputs():
+                player = self.game.entities.get(connection.player_id)
+                if player is None:
+                    continue
+                converted = batch.game_action(action, player.unique_id, player.moving)
+                if converted is not None:
+                    actions.append(converted)
+        self.game.step(actions)
+        self._prune_free_players()
+        self.ticks += 1
+
+    def _prune_free_players(self):
+        # players nobody controls can still be blown up, and can't be handed out after that
+        live = []
+        for unique_id in self._free_players:
+            player = self.game.entities.get(unique_id)
+            if player is not None and not player.destroyed:
+                live.append(unique_id)
+        self._free_players = live
+
+    def snapshot(self):
+        """
+        Returns the state of the game, as a dict of entity id -> protocol.EntityState.
+        :return:
+        """
+        return {entity.unique_id: entity for entity in protocol.entity_states(self.game)}
+
+    def snapshots(self):
+        """
+        Returns the state of the game as each connection should see it, as a dict of connection id ->
+        snapshot (see snapshot()).  Connections that see the same thing share the same snapshot.
+        :return:
+        """
+        if self.interest is None:
+            snapshot = self.snapshot()
+            return {connection_id: snapshot for connection_id in self.connections}
+
+        # a connection whose player has been destroyed keeps watching where it was
+        for connection in self.connections.values():
+            player = self.game.entities.get(connection.player_id)
+            if player is not None:
+                self.interest.move(connection.connection_id, player.physical_location)
+        return self.interest.snapshots(self.game)
@@ -0,0 +1,65 @@
+import json
+import pytest
+from python_bomberman.benchmark.runner import percentile, run, compare, main
+from python_bomberman.benchmark.scenarios import SCENARIOS, ChainReactionScenario, EmptyArenaScenario
+from python_bomberman.common.game.entities import Fire
+
+
+class TestRunnerSuite:
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, .5) == 50
+        assert percentile(values, .99) == 99
+        assert percentile(values, 1) == 100
+        assert percentile([3], .99) == 3
+
+    @pytest.mark.parametrize("name", sorted(SCENARIOS))
+    def test_run(self, name):
+        result = run(SCENARIOS[name](), ticks=5, warmup=1, allocation_ticks=2)
+        assert result["scenario"] == name
+        assert result["ticks"] == 5
+        assert result["ticks_per_second"] > 0
+        assert result["p50_ms"] <= result["p99_ms"]
+        assert result["alloc_kib_per_tick"] >= 0
+
+    def test_reproducible(self):
+        first, second = EmptyArenaScenario(seed=1), EmptyArenaScenario(seed=1)
+        for scenario in (first, second):
+            scenario.setup()
+            for tick in range(0, 120):
+                scenario.prepare(tick)
+                scenario.tick()
+        assert [entity.logical_location for entity in first.game.entities.all_entities()] == \
+            [entity.logical_location for entity in second.game.entities.all_entities()]
+
+    def test_chain_reaction(self):
+        scenario = ChainReactionScenario()
+        scenario.setup()
+        for tick in range(0, 40):
+            scenario.prepare(tick)
+            scenario.tick()
+        # every row and column with a bomb in it is on fire
+        fires = {fire.logical_location for fire in scenario.game.entities.of_type(Fire)}
+        assert len(fires) == 64 * 64 - 32 * 32
+
+    def test_compare(self):
+        baseline = [{"scenario": "a", "ticks_per_second": 100.0, "p50_ms": 1.0, "p99_ms": 2.0}]
+        results = [{"scenario": "a", "ticks_per_second": 80.0, "p50_ms": 1.05, "p99_ms": 1.0},
+                   {"scenario": "b", "ticks_per_second": 1.0, "p50_ms": 1.0, "p99_ms": 1.0}]
+        comparisons = {metric: (change, regressed) for _, metric, _, _, change, regressed in compare(results, baseline)}
+        assert comparisons["ticks_per_second"] == (pytest.approx(-.2), True)
+        assert comparisons["p50_ms"] == (pytest.approx(.05), False)
+        assert comparisons["p99_ms"] == (pytest.approx(-.5), False)
+        assert "alloc_kib_per_tick" not in comparisons
+
+    def test_main(self, tmpdir):
+        path = str(tmpdir.join("baseline.json"))
+        args = ["empty_arena", "--ticks", "5", "--warmup", "0", "--allocation-ticks", "1"]
+        assert main(args + ["--save", path]) == 0
+        with open(path) as f:
+            assert [result["scenario"] for result in json.load(f)] == ["empty_arena"]
+        assert main(args + ["--compare", path, "--tolerance", "1000"]) == 0
+
+    def test_main_unknown_scenario(self):
+        with pytest.raises(SystemExit):
+            main(["nonexistent"])
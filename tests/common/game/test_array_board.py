@@ -0,0 +1,98 @@
+import pytest
+import numpy
+from python_bomberman.common.game.array_board import ArrayBoard, ArrayBoardSpace, FIRE_LAYER, ENTITY_LAYER
+from python_bomberman.common.game.entities import Player, Bomb, Fire, IndestructibleWall, BombModifier
+from python_bomberman.common.game.exceptions import GameException
+import python_bomberman.common.utils as utils
+from tests.common.game import test_board
+
+
+class TestArrayBoardSuite(test_board.TestBoardSuite):
+    @pytest.fixture
+    def board(self, dimensions):
+        return ArrayBoard(dimensions)
+
+    def test_init(self, board, dimensions):
+        assert board.dimensions == dimensions
+        assert board.occupancy.shape == tuple(dimensions)
+        assert not board.occupancy.any()
+        assert isinstance(board.get(utils.Coordinate(0, 0)), ArrayBoardSpace)
+
+        # array boards don't need a location object per space, so they don't build any
+        assert not hasattr(board, "_locations")
+        assert not hasattr(board.blank(), "_locations")
+
+    def test_space(self, board, location):
+        player = Player(location)
+        bomb = Bomb(location, radius=0)
+        fire = Fire(location)
+        modifier = BombModifier(location)
+        for entity in [player, bomb, fire, modifier]:
+            board.add(entity)
+
+        space = board.get(location)
+        assert space.entity is player
+        assert space.bomb is bomb
+        assert space.fire is fire
+        assert space.modifier is modifier
+        assert space.has_bomb() and space.has_fire() and space.has_modifier()
+        assert space.has_indestructible_entity()
+        with pytest.raises(GameException):
+            space.add(Player(location))
+        with pytest.raises(GameException):
+            space.remove(Player(location))
+
+        for entity in space.all_entities():
+            if entity.can_destroy:
+                board.destroy(entity)
+        assert player.destroyed and fire.destroyed and modifier.destroyed
+        assert not bomb.destroyed
+        assert not space.has_fire() and not space.has_modifier() and not space.occupied(player)
+        assert not space.vacant(player)
+
+        board.remove(player)
+        assert space.entity is None
+        assert space.vacant(player)
+
+    def test_live(self, board):
+        fire_location = utils.Coordinate(1, 3)
+        fire = Fire(fire_location)
+        board.add(fire)
+        board.add(Player(utils.Coordinate(0, 0)))
+
+        expected = numpy.zeros(tuple(board.dimensions), dtype=bool)
+        expected[fire_location] = True
+        assert (board.live(FIRE_LAYER) == expected).all()
+        assert board.live(FIRE_LAYER | ENTITY_LAYER).sum() == 2
+
+        board.destroy(fire)
+        assert not board.live(FIRE_LAYER).any()
+
+    def test_blockers(self, board):
+        wall = IndestructibleWall(utils.Coordinate(0, 1))
+        bomb = Bomb(utils.Coordinate(2, 2), radius=0)
+        board.add(wall)
+        board.add(bomb)
+        board.add(Player(utils.Coordinate(3, 3)))
+
+        blockers = board.blockers()
+        assert blockers.sum() == 2
+        assert blockers[wall.logical_location] and blockers[bomb.logical_location]
+
+        board.destroy(bomb)
+        assert not board.blockers()[bomb.logical_location]
+
+    def test_handles_reused(self, board, location):
+        player = Player(location)
+        board.add(player)
+        board.remove(player)
+        board.add(Player(location))
+        assert len(board._entities) == 1
+        assert len(board.all_entities()) == 1
+
+    def test_add_all_checked_first(self, board, location):
+        # nothing is added if any of the entities can't be.
+        with pytest.raises(GameException):
+            board.add_all([Player(location), Player(utils.Coordinate(1, 1)), Player(location)])
+        assert not board.occupancy.any()
+        assert board.all_entities() == []
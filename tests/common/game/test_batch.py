@@ -0,0 +1,137 @@
+import numpy
+import pytest
+import random
+from python_bomberman.common.map import arena_map
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.batch import BatchGame
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.entities import Player, Bomb, Fire, DestructibleWall, BombRadiusModifier
+from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.common.game.game import Game
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+def state(game, player_ids):
+    # a Game's state, laid out the way BatchGame's is
+    shape = tuple(game.board.dimensions)
+    walls = numpy.zeros(shape, dtype=numpy.int8)
+    bombs = numpy.zeros(shape, dtype=bool)
+    fires = numpy.zeros(shape, dtype=bool)
+    for entity in game.entities.all_entities():
+        location = tuple(entity.logical_location)
+        if isinstance(entity, DestructibleWall):
+            walls[location] = batch.DESTRUCTIBLE_WALL
+        elif isinstance(entity, Bomb):
+            bombs[location] = True
+        elif isinstance(entity, Fire):
+            fires[location] = True
+        elif not isinstance(entity, Player) and not entity.can_destroy:
+            walls[location] = batch.INDESTRUCTIBLE_WALL
+
+    players = []
+    for unique_id in player_ids:
+        player = game.entities.get(unique_id)
+        if player is None:
+            players.append(None)
+        else:
+            players.append((
+                tuple(player.logical_location), tuple(player.physical_location), player.moving,
+                player.bombs, player.bomb_radius, player.movement_speed
+            ))
+    return walls, bombs, fires, players
+
+
+def batch_state(games, game):
+    players = []
+    for player in range(0, games.present.shape[1]):
+        if not games.present[game, player]:
+            players.append(None)
+        else:
+            players.append((
+                (games.x[game, player], games.y[game, player]),
+                (games.physical_x[game, player], games.physical_y[game, player]),
+                games.moving[game, player], games.player_bombs[game, player],
+                games.player_bomb_radius[game, player], games.movement_speed[game, player]
+            ))
+    return games.walls[game], games.bombs[game], games.fires[game], players
+
+
+class TestSuite:
+    step = 1 / 10
+
+    @pytest.fixture
+    def game_maps(self):
+        return [arena_map(Coordinate(11, 9), .4, players, seed) for seed, players in enumerate([4, 4, 3, 2])]
+
+    def test_dimensions(self):
+        with pytest.raises(GameException):
+            BatchGame([map.Map(Coordinate(5, 5)), map.Map(Coordinate(5, 6))])
+
+    def test_init(self, game_maps):
+        games = BatchGame(game_maps)
+        assert len(games) == 4
+        assert games.walls.shape == (4, 11, 9)
+        assert games.present.shape == (4, 4)
+        assert games.present.sum(axis=1).tolist() == [4, 4, 3, 2]
+        assert (games.walls[:, 1::2, 1::2] == batch.INDESTRUCTIBLE_WALL).all()
+
+    def test_matches_game(self, game_maps):
+        # random players in every game - the batch and a Game per map must agree after every tick
+        rng = random.Random(0)
+        batch_games = BatchGame(game_maps, step=self.step)
+        games = [Game(game_map, clock=FastForwardClock(step=self.step)) for game_map in game_maps]
+        player_ids = [sorted(player.unique_id for player in game.entities.of_type(Player)) for game in games]
+
+        # a modifier in the first game, to check it's picked up the same way
+        location = next(
+            Coordinate(x, y) for x in range(0, 11) for y in range(0, 9)
+            if not games[0].board.get(Coordinate(x, y)).entity
+        )
+        games[0].add(BombRadiusModifier(location))
+        batch_games.modifiers[(0,) + tuple(location)] = batch.BOMB_RADIUS_MODIFIER
+
+        exploded = False
+        for tick in range(0, 300):
+            actions = numpy.array([
+                [rng.choice([batch.NOOP, batch.DROP_BOMB] + [batch.MOVE_UP + d for d in range(0, 4)] * 2) for _ in range(4)]
+                for _ in games
+            ])
+            for index, game in enumerate(games):
+                game.step(batch_games.game_actions(index, actions[index], player_ids[index]))
+            batch_games.step(actions)
+
+            for index, game in enumerate(games):
+                expected_walls, expected_bombs, expected_fires, expected_players = state(game, player_ids[index])
+                walls, bombs, fires, players = batch_state(batch_games, index)
+                assert (walls == expected_walls).all(), tick
+                assert (bombs == expected_bombs).all(), tick
+                assert (fires == expected_fires).all(), tick
+                assert players[:len(expected_players)] == expected_players, tick
+                exploded = exploded or fires.any()
+
+        # make sure the run actually covered explosions and deaths
+        assert exploded
+        assert not batch_games.present.all()
+
+    def test_step(self):
+        game_map = map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(0, 0)), map.Player(Coordinate(2, 0))])
+        games = BatchGame([game_map], step=.25)
+
+        # both players try to move into (1, 0) - the first one gets there
+        games.step([[batch.MOVE_RIGHT, batch.MOVE_LEFT]])
+        assert games.moving[0].tolist() == [True, False]
+        assert (games.x[0, 0], games.y[0, 0]) == (1, 0)
+        for _ in range(0, 4):
+            games.step([[batch.NOOP, batch.NOOP]])
+        assert not games.moving[0, 0]
+        assert games.physical_x[0, 0] == 1
+
+        # the second player drops a bomb, and it goes off two seconds after the tick it's dropped in
+        games.step([[batch.NOOP, batch.DROP_BOMB]])
+        assert games.bombs[0, 2, 0] and games.player_bombs[0, 1] == 0
+        for _ in range(0, 8):
+            games.step([[batch.NOOP, batch.NOOP]])
+        assert not games.bombs[0, 2, 0] and games.player_bombs[0, 1] == 1
+        assert games.fires[0, :, 0].all() and games.fires[0, 2].all()
+        assert not games.present[0].any()
@@ -44,6 +44,23 @@ class TestBoardSuite:
         with pytest.raises(GameException):
             board.add(out_of_bounds)
 
+    def test_add_all(self, board, location, oob_location):
+        player = Player(location)
+        wall = IndestructibleWall(utils.Coordinate(1, 0))
+        bomb = Bomb(location, radius=3)
+        board.blast(utils.Coordinate(0, 0), 3)
+        board.add_all([player, wall, bomb])
+
+        assert board.get(location).entity is player
+        assert board.get(location).bomb is bomb
+        assert board.get(wall.logical_location).has_indestructible_entity()
+        assert board.index(wall.logical_location) in board.blast(utils.Coordinate(0, 0), 3)[1]
+
+        with pytest.raises(GameException):
+            board.add_all([Player(oob_location)])
+        with pytest.raises(GameException):
+            board.add_all([Player(location)])
+
     def test_remove(self, board, location, oob_location):
         self.test_add(board, location, oob_location)
         player = board.get(location).entity
@@ -88,6 +105,30 @@ class TestBoardSuite:
             space = board.get(location, direction=direction, distance=1)
             assert space.location == expected_map[direction]
 
+    def test_index(self, board, location, oob_location):
+        assert board.index(location) == 0
+        assert board.index(utils.Coordinate(2, 3)) == 2 * board.dimensions.y + 3
+        with pytest.raises(GameException):
+            board.index(oob_location)
+
+    def test_walk(self, board):
+        origin = board.index(utils.Coordinate(1, 0))
+
+        # walking wraps around the board
+        indices = board.walk(origin, MovementDirection.UP, 2)
+        assert indices == [board.index(utils.Coordinate(1, 4)), board.index(utils.Coordinate(1, 3))]
+        indices = board.walk(origin, MovementDirection.LEFT, 3)
+        assert indices == [board.index(utils.Coordinate(x, 0)) for x in [0, 4, 3]]
+        assert board.walk(origin, MovementDirection.RIGHT, 0) == []
+
+        # walking the full width of the board brings us back to the start
+        assert board.walk(origin, MovementDirection.RIGHT, board.dimensions.x)[-1] == origin
+
+    def test_get_distance(self, board):
+        location = utils.Coordinate(1, 1)
+        assert board.get(location, direction=MovementDirection.DOWN, distance=7).location == utils.Coordinate(1, 3)
+        assert board.get(location, direction=MovementDirection.LEFT, distance=3).location == utils.Coordinate(3, 1)
+
     def test_blast_radius(self, board):
         dimensions = board.dimensions
 
@@ -150,6 +191,112 @@ class TestBoardSuite:
             locations.remove(space.location)
         assert len(locations) == 0
 
+    def test_blast_cache(self, board):
+        location = utils.Coordinate(2, 2)
+        blast = board.blast(location, 3)
+        assert board.blast(location, 3) is blast
+
+        # entities that can't stop a blast don't invalidate anything.
+        board.add(Player(utils.Coordinate(2, 3)))
+        assert board.blast(location, 3) is blast
+
+        # adding a wall to the same row does.
+        wall = IndestructibleWall(utils.Coordinate(3, 2))
+        board.add(wall)
+        walled = board.blast(location, 3)
+        assert walled is not blast
+        assert board.index(wall.logical_location) in walled[1]
+
+        # as does removing it.
+        board.remove(wall)
+        assert board.blast(location, 3) == blast
+
+        # and destroying a bomb in the same column.
+        bomb = Bomb(utils.Coordinate(2, 0), radius=0)
+        board.add(bomb)
+        bombed = board.blast(location, 3)
+        assert board.index(bomb.logical_location) in bombed[1]
+        board.destroy(bomb)
+        assert board.blast(location, 3) == blast
+
+    def test_blast_cache_eviction(self, board):
+        board.BLAST_CACHE_SIZE = 2
+        first = board.blast(utils.Coordinate(0, 0), 3)
+        board.blast(utils.Coordinate(1, 1), 3)
+        assert board.blast(utils.Coordinate(0, 0), 3) is first
+        board.blast(utils.Coordinate(2, 2), 3)
+
+        # (1, 1) was the least recently used, so it's the one that got evicted.
+        assert len(board._blast_cache) == 2
+        assert board.blast(utils.Coordinate(0, 0), 3) is first
+
+    def test_chunks(self):
+        board = Board(utils.Coordinate(20, 10))
+        board.CHUNK_SIZE = 8
+        board._build_chunks()
+        assert len(board.chunk_versions) == 3 * 2
+        assert board.chunk(utils.Coordinate(0, 0)) == 0
+        assert board.chunk(utils.Coordinate(0, 9)) == 1
+        assert board.chunk(utils.Coordinate(19, 9)) == 5
+        assert board.chunk_indices(5) == [x * 10 + y for x in range(16, 20) for y in range(8, 10)]
+
+    def test_chunk_versions(self, board):
+        versions = list(board.chunk_versions)
+
+        # dynamic entities don't change a chunk's version
+        player = Player(utils.Coordinate(1, 1))
+        board.add(player)
+        board.move(player, utils.Coordinate(1, 2))
+        assert board.chunk_versions == versions
+
+        # anything else being added, destroyed or removed does, and versions are never reused
+        seen = set(versions)
+        wall = IndestructibleWall(utils.Coordinate(2, 2))
+        modifier = BombModifier(utils.Coordinate(3, 3))
+        for change in [lambda: board.add(wall), lambda: board.add(modifier), lambda: board.destroy(modifier),
+                       lambda: board.remove(wall)]:
+            change()
+            assert board.chunk_versions[0] not in seen
+            seen.add(board.chunk_versions[0])
+
+    def test_clear_chunk(self, board):
+        wall = IndestructibleWall(utils.Coordinate(2, 2))
+        player = Player(utils.Coordinate(4, 4))
+        board.add_all([wall, player])
+        board.clear_chunk(0)
+        assert board.all_entities() == []
+
+    def test_listeners(self, board, location):
+        class Listener:
+            def __init__(self):
+                self.events = []
+
+            def entity_added(self, entity):
+                self.events.append(("added", entity))
+
+            def entities_added(self, entities):
+                self.events.append(("all added", list(entities)))
+
+            def entity_removed(self, entity):
+                self.events.append(("removed", entity))
+
+            def entity_destroyed(self, entity):
+                self.events.append(("destroyed", entity))
+
+        listener = Listener()
+        board.listeners.append(listener)
+        player = Player(location)
+        wall = IndestructibleWall(utils.Coordinate(1, 1))
+        board.add(player)
+        board.move(player, utils.Coordinate(0, 1))
+        board.destroy(player)
+        board.remove(player)
+        board.add_all([wall])
+        assert listener.events == [
+            ("added", player), ("removed", player), ("added", player), ("destroyed", player), ("removed", player),
+            ("all added", [wall])
+        ]
+
 
 class TestBoardSpaceSuite:
     @pytest.fixture
@@ -283,17 +430,3 @@ class TestBoardSpaceSuite:
         board_space.add(wall)
         assert board_space.has_indestructible_entity() is True
         board_space.remove(wall)
-
-    def test_destroy_all(self, board_space, location):
-        self.test_add(board_space, location)
-
-        player = board_space.entity
-        bomb = board_space.bomb
-        fire = board_space.fire
-        modifier = board_space.modifier
-
-        board_space.destroy_all()
-        assert player.destroyed is True
-        assert bomb.destroyed is False
-        assert fire.destroyed is True
-        assert modifier.destroyed is True
@@ -0,0 +1,62 @@
+import pytest
+from python_bomberman.common.game.clock import Clock, FixedStepClock, FastForwardClock
+
+
+class FakeTimeSource:
+    def __init__(self):
+        self.current = 100.0
+
+    def __call__(self):
+        return self.current
+
+
+@pytest.fixture
+def time_source():
+    return FakeTimeSource()
+
+
+class TestClockSuite:
+    def test_init(self):
+        clock = Clock()
+        assert clock.now == 0.0
+        assert clock.dt == 0.0
+
+    def test_advance(self):
+        clock = Clock()
+        clock.advance(.5)
+        clock.advance(.25)
+        assert clock.now == .75
+        assert clock.dt == .25
+
+    def test_steps(self, time_source):
+        clock = Clock(time_source=time_source)
+        # the first call has nothing to measure against
+        assert clock.steps() == [0.0]
+        time_source.current += 1.5
+        assert clock.steps() == [1.5]
+
+
+class TestFixedStepClockSuite:
+    def test_steps(self, time_source):
+        clock = FixedStepClock(step=.25, max_steps=10, time_source=time_source)
+        assert clock.steps() == []
+        time_source.current += .6
+        assert clock.steps() == [.25, .25]
+        # the leftover .1 carries over into the next call
+        time_source.current += .15
+        assert clock.steps() == [.25]
+        assert clock.accumulator == pytest.approx(0.0)
+
+    def test_max_steps(self, time_source):
+        clock = FixedStepClock(step=.25, max_steps=2, time_source=time_source)
+        clock.steps()
+        time_source.current += 10
+        assert clock.steps() == [.25, .25]
+        assert clock.accumulator == 0.0
+
+
+class TestFastForwardClockSuite:
+    def test_steps(self):
+        clock = FastForwardClock(step=.1)
+        for _ in range(0, 3):
+            assert clock.steps() == [.1]
@@ -0,0 +1,85 @@
+import pytest
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.entities import Bomb, Player, DestructibleWall, IndestructibleWall, Fire
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.tasks import DetonationTask, BurningTask
+from python_bomberman.common.map import Map
+from python_bomberman.common.utils import Coordinate
+
+
+@pytest.fixture
+def game():
+    return Game(game_map=Map(dimensions=Coordinate(9, 9)), clock=FastForwardClock())
+
+
+@pytest.fixture
+def owner(game):
+    player = game.add(Player(Coordinate(8, 8)))
+    player.bombs = 0
+    return player
+
+
+def plant(game, owner, location, duration):
+    bomb = game.add(Bomb(location, radius=3, duration=duration))
+    game.tasks.register_detonation_task(bomb, owner)
+    return bomb
+
+
+class TestDetonationResolverSuite:
+    def test_single(self, game, owner):
+        bomb = plant(game, owner, Coordinate(4, 4), 1)
+        wall = game.add(DestructibleWall(Coordinate(4, 6)))
+        game.process(dt=0)
+        game.process(dt=1)
+
+        assert bomb.destroyed is True
+        assert wall.destroyed is True and game.entities.get(wall.unique_id) is None
+        assert owner.bombs == 1
+        fires = [entity for entity in game.entities.all_entities() if isinstance(entity, Fire)]
+        assert len(fires) == 9
+        for fire in fires:
+            assert game.tasks.get(fire, BurningTask) is not None
+
+    def test_chain_reaction(self, game, owner):
+        first = plant(game, owner, Coordinate(1, 1), 1)
+        second = plant(game, owner, Coordinate(3, 1), 10)
+        third = plant(game, owner, Coordinate(3, 3), 10)
+        out_of_range = plant(game, owner, Coordinate(7, 7), 10)
+        game.process(dt=0)
+        game.process(dt=1)
+
+        # the first bomb sets off the second, which sets off the third.
+        for bomb in [first, second, third]:
+            assert game.entities.get(bomb.unique_id) is None
+            assert game.tasks.get(bomb, DetonationTask) is None
+        assert out_of_range.destroyed is False
+        assert owner.bombs == 3
+
+        # the union of the blasts is on fire, with one fire per space.
+        assert game.board.get(Coordinate(5, 1)).has_fire()
+        assert game.board.get(Coordinate(3, 5)).has_fire()
+        assert game.board.get(Coordinate(1, 3)).has_fire()
+        fires = [entity for entity in game.entities.all_entities() if isinstance(entity, Fire)]
+        assert len(fires) == len({fire.logical_location for fire in fires}) == 20
+
+    def test_blocked(self, game, owner):
+        plant(game, owner, Coordinate(1, 1), 1)
+        game.add(IndestructibleWall(Coordinate(2, 1)))
+        other = plant(game, owner, Coordinate(3, 1), 10)
+        game.process(dt=0)
+        game.process(dt=1)
+        assert other.destroyed is False
+        assert not game.board.get(Coordinate(3, 1)).has_fire()
+
+    def test_existing_fire(self, game, owner):
+        plant(game, owner, Coordinate(1, 1), 1)
+        old_fire = game.add(Fire(Coordinate(1, 2), duration=.5))
+        game.tasks.register_burning_task(old_fire)
+        game.process(dt=0)
+        game.process(dt=1)
+
+        # the old fire burnt out this tick, and the blast replaced it with a fresh one.
+        new_fire = game.board.get(Coordinate(1, 2)).fire
+        assert new_fire is not None and new_fire is not old_fire
+        assert new_fire.destroyed is False
+        assert game.entities.get(old_fire.unique_id) is None
@@ -0,0 +1,50 @@
+import pytest
+from python_bomberman.common.game.entities import (
+    Capability, Entity, Player, Bomb, Fire, IndestructibleWall, DestructibleWall, BombModifier
+)
+import python_bomberman.common.utils as utils
+
+
+class TestSuite:
+    @pytest.fixture
+    def location(self):
+        return utils.Coordinate(0, 0)
+
+    def test_capabilities(self, location):
+        player = Player(location)
+        assert player.can_move and player.can_destroy and player.can_drop_bombs and player.can_be_modified
+        assert not player.can_burn and not player.can_detonate and not player.can_modify
+
+        assert Bomb.can_detonate and not Bomb.can_destroy
+        assert Fire.can_burn and Fire.can_destroy
+        assert BombModifier.can_modify and BombModifier.can_destroy
+        assert IndestructibleWall.capabilities == Capability.COLLIDE
+        assert DestructibleWall.can_destroy and not IndestructibleWall.can_destroy
+        assert not any(getattr(Entity, attr) for attr in ["can_move", "can_destroy", "can_collide"])
+
+    def test_capabilities_constant(self, location):
+        # capabilities belong to the class - they can't be changed per instance.
+        with pytest.raises(AttributeError):
+            Player(location).can_move = False
+
+    def test_slots(self, location):
+        for entity in [Player(location), Bomb(location, 1), Fire(location), BombModifier(location)]:
+            assert not hasattr(entity, "__dict__")
+            with pytest.raises(AttributeError):
+                entity.something_else = True
+
+    def test_init(self, location):
+        bomb = Bomb(location, radius=2, duration=3)
+        assert bomb.logical_location == bomb.physical_location == location
+        assert bomb.unique_id is None
+        assert not bomb.destroyed and not bomb.moving and not bomb.detonating and not bomb.burning
+        assert bomb.radius == 2 and bomb.duration == 3
+
+    def test_dynamic(self):
+        assert Player.dynamic and Bomb.dynamic and Fire.dynamic
+        assert not IndestructibleWall.dynamic and not DestructibleWall.dynamic and not BombModifier.dynamic
+
+    def test_state_attributes(self):
+        assert Entity.state_attributes == Entity.__slots__
+        assert Bomb.state_attributes == Entity.__slots__ + ("movement_speed", "duration", "radius")
+        assert BombModifier.state_attributes == Entity.__slots__ + ("amount",)
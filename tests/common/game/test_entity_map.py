@@ -1,6 +1,8 @@
 import pytest
 from python_bomberman.common.game.entity_map import EntityMap
-from python_bomberman.common.game.entities import Player
+from python_bomberman.common.game.entities import (
+    Player, Bomb, Modifier, BombModifier, BombRadiusModifier, DestructibleWall
+)
 import python_bomberman.common.utils as utils
 from python_bomberman.common.game.exceptions import GameException
 
@@ -35,6 +37,16 @@ class TestSuite:
         with pytest.raises(GameException):
             entity_map.remove(player)
 
+    def test_ids(self, entity_map, player):
+        assert player.unique_id is None
+        entity_map.add(player)
+        unique_id = player.unique_id
+        assert entity_map.ids.is_live(unique_id)
+
+        # removing the entity releases its id, so anything holding onto it can tell it's stale.
+        entity_map.remove(player)
+        assert not entity_map.ids.is_live(unique_id)
+
     def test_get(self, entity_map, player):
         assert entity_map.get(player.unique_id) is None
         entity_map.add(player)
@@ -60,8 +72,76 @@ class TestSuite:
         ]
         for entity in destroyed_entities:
             entity.destroyed = True
+            entity_map.mark_destroyed(entity)
 
         assert len(entity_map.destroyed_entities()) == len(destroyed_entities)
         for entity in entity_map.destroyed_entities():
             destroyed_entities.remove(entity)
         assert len(destroyed_entities) == 0
+
+        # removed entities are no longer reported
+        entity_map.remove(entities[0])
+        assert entities[0] not in entity_map.destroyed_entities()
+
+        # entities that are destroyed before they're added are picked up when they're added
+        destroyed = Player(location=utils.Coordinate(0, 0))
+        destroyed.destroyed = True
+        entity_map.mark_destroyed(destroyed)
+        entity_map.add(destroyed)
+        assert destroyed in entity_map.destroyed_entities()
+
+    def test_of_type(self, entity_map, player):
+        players = entity_map.of_type(Player)
+        modifiers = entity_map.of_type(Modifier)
+        assert len(players) == 0
+
+        bomb_modifier = BombModifier(location=utils.Coordinate(1, 1))
+        radius_modifier = BombRadiusModifier(location=utils.Coordinate(2, 2))
+        for entity in [player, bomb_modifier, radius_modifier, Bomb(utils.Coordinate(3, 3), radius=1)]:
+            entity_map.add(entity)
+
+        # views stay up to date as entities come and go
+        assert list(players) == [player]
+        assert set(modifiers) == {bomb_modifier, radius_modifier}
+        assert list(entity_map.of_type(BombModifier)) == [bomb_modifier]
+        entity_map.remove(bomb_modifier)
+        assert list(modifiers) == [radius_modifier]
+
+    def test_in_state(self, entity_map, player):
+        moving = entity_map.in_state("moving")
+        entity_map.add(player)
+        assert len(moving) == 0
+
+        entity_map.set_state(player, "moving", True)
+        assert player.moving is True
+        assert list(moving) == [player]
+        entity_map.set_state(player, "moving", False)
+        assert len(moving) == 0
+
+        entity_map.set_state(player, "moving", True)
+        entity_map.remove(player)
+        assert len(moving) == 0
+
+        # entities added with a state flag already set are indexed straight away
+        bomb = Bomb(utils.Coordinate(0, 0), radius=1)
+        bomb.detonating = True
+        entity_map.add(bomb)
+        assert list(entity_map.in_state("detonating")) == [bomb]
+
+    def test_dynamic_entities(self, entity_map, player):
+        wall = DestructibleWall(utils.Coordinate(1, 1))
+        entity_map.add_all([player, wall])
+        assert list(entity_map.dynamic_entities()) == [player]
+        entity_map.remove(player)
+        assert len(entity_map.dynamic_entities()) == 0
+
+    def test_clear(self, entity_map, player):
+        entity_map.add(player)
+        entity_map.set_state(player, "moving", True)
+        entity_map.clear()
+        assert len(entity_map.all_entities()) == 0
+        assert len(entity_map.in_state("moving")) == 0
+        assert len(entity_map.dynamic_entities()) == 0
+
+        # ids aren't released
+        assert entity_map.ids.is_live(player.unique_id)
@@ -1,9 +1,47 @@
 import pytest
+from python_bomberman.common.game.array_board import ArrayBoard
+from python_bomberman.common.game.board import Board
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection, GameAction
+from python_bomberman.common.game.exceptions import GameException
+from python_bomberman.common.game.tasks import MovementTask
+from python_bomberman.common.game.entities import Player, IndestructibleWall, DestructibleWall, registry
+import python_bomberman.common.map as map
+from python_bomberman.common.map import Map
+from python_bomberman.common.utils import Coordinate
 
 
 class TestSuite:
+    @pytest.fixture(params=[Board, ArrayBoard])
+    def game(self, request):
+        return Game(game_map=Map(dimensions=Coordinate(5, 5)), clock=FastForwardClock(step=.25), board_cls=request.param)
+
     def test_init(self):
-        pass
+        game_map = Map(dimensions=Coordinate(5, 5), objects=[
+            map.Player(Coordinate(0, 0)),
+            map.IndestructibleWall(Coordinate(1, 1)),
+            map.DestructibleWall(Coordinate(2, 2))
+        ])
+        game = Game(game_map=game_map)
+        assert isinstance(game.board.get(Coordinate(0, 0)).entity, Player)
+        assert isinstance(game.board.get(Coordinate(1, 1)).entity, IndestructibleWall)
+        assert isinstance(game.board.get(Coordinate(2, 2)).entity, DestructibleWall)
+        assert len(game.entities.all_entities()) == 3
+        assert len(game.entities.of_type(Player)) == 1
+
+    def test_map_players(self):
+        locations = [Coordinate(3, 3), Coordinate(0, 0), Coordinate(1, 4)]
+        game_map = Map(dimensions=Coordinate(5, 5), objects=[map.Player(location) for location in locations])
+        game = Game(game_map=game_map)
+        assert [game.entities.get(unique_id).logical_location for unique_id in game.map_players()] == [
+            obj.location for obj in game_map.all_objects()
+        ]
+
+    def test_registry(self):
+        assert registry["player"] is Player
+        assert registry["indestructible_wall"] is IndestructibleWall
+        assert "bomb_modifier" in registry
 
     def test_add(self):
         pass
@@ -14,8 +52,111 @@ class TestSuite:
     def test_move(self):
         pass
 
-    def test_drop_bomb(self):
-        pass
+    def test_destroy(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        other = game.add(Player(Coordinate(3, 3)))
+        game.destroy(player)
+        assert player.destroyed is True
+        assert game.entities.destroyed_entities() == [player]
 
-    def test_process(self):
-        pass
+        game.process()
+        assert game.entities.get(player.unique_id) is None
+        assert game.entities.get(other.unique_id) is other
+        assert game.entities.destroyed_entities() == []
+
+    def test_drop_bomb(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        game.drop_bomb(player)
+        bomb = game.board.get(player.logical_location).bomb
+        assert bomb is not None
+        assert player.bombs == 0
+
+        # no bombs left to drop
+        game.drop_bomb(player)
+        assert game.board.get(player.logical_location).bomb is bomb
+
+        for _ in range(0, 9):
+            game.process()
+        assert player.destroyed is True
+        assert player.bombs == 1
+        assert game.entities.get(bomb.unique_id) is None
+
+    def test_process(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        game.move(player, MovementDirection.RIGHT, 1)
+
+        # the first tick starts the movement task, the next four cover the distance.
+        game.process()
+        assert player.moving is True
+        assert player.logical_location == Coordinate(3, 2)
+        for _ in range(0, 4):
+            game.process()
+        assert player.moving is False
+        assert player.physical_location == Coordinate(3, 2)
+        assert game.clock.now == 1.25
+
+    def test_process_explicit_dt(self, game):
+        game.process(dt=3)
+        assert game.clock.now == 3
+
+    def test_step(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        game.step([(GameAction.DROP_BOMB, player.unique_id), (GameAction.MOVE, player.unique_id, MovementDirection.UP, 1)])
+        assert game.board.get(Coordinate(2, 2)).bomb is not None
+        assert player.logical_location == Coordinate(2, 1)
+
+        # actions for entities that don't exist are ignored
+        game.step([(GameAction.DROP_BOMB, player.unique_id + 1000)], dt=.5)
+        assert game.clock.now == .75
+
+        with pytest.raises(GameException):
+            game.step([("dance", player.unique_id)])
+
+    def test_fork(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        wall = game.add(IndestructibleWall(Coordinate(4, 4)))
+        game.process()
+        fork = game.fork(step=.25)
+        assert isinstance(fork.clock, FastForwardClock)
+        assert fork.clock.now == game.clock.now
+        assert isinstance(fork.board, game.board.__class__)
+
+        # nothing that can change is shared
+        forked = fork.entities.get(player.unique_id)
+        assert forked is not player and forked.logical_location == player.logical_location
+        assert fork.entities.get(wall.unique_id) is wall
+
+        fork.step([(GameAction.MOVE, player.unique_id, MovementDirection.RIGHT, 1)])
+        assert forked.logical_location == Coordinate(3, 2)
+        assert player.logical_location == Coordinate(2, 2)
+        assert game.board.get(Coordinate(3, 2)).entity is None
+        assert game.tasks.get(player, MovementTask) is None
+
+    def test_fork_chunk_versions(self, game):
+        walls = [game.add(DestructibleWall(Coordinate(x, 4))) for x in (1, 3)]
+        game.process()
+        forks = [game.fork(step=.25) for _ in range(0, 2)]
+
+        # the same chunk changes differently in two forks, which mustn't end up on the same version
+        for fork, wall in zip(forks, walls):
+            fork.destroy(fork.entities.get(wall.unique_id))
+            fork.process()
+        assert forks[0].board.chunk_versions != forks[1].board.chunk_versions
+
+        forks[1].restore(forks[0].snapshot())
+        assert forks[1].board.get(Coordinate(1, 4)).entity is None
+        assert forks[1].board.get(Coordinate(3, 4)).entity.unique_id == walls[1].unique_id
+
+    def test_fork_deterministic(self, game):
+        player = game.add(Player(Coordinate(2, 2)))
+        actions = [(GameAction.DROP_BOMB, player.unique_id), (GameAction.MOVE, player.unique_id, MovementDirection.UP, 2)]
+        forks = [game.fork(step=.25) for _ in range(0, 2)]
+        for fork in forks + [game]:
+            fork.step(actions)
+            for _ in range(0, 20):
+                fork.step()
+        states = {
+            tuple(sorted((entity.unique_id, entity.logical_location) for entity in fork.entities.all_entities()))
+            for fork in forks + [game]
+        }
+        assert len(states) == 1
@@ -0,0 +1,71 @@
+import pytest
+from python_bomberman.common.game.ids import EntityIdAllocator
+from python_bomberman.common.game.exceptions import GameException
+
+
+class TestSuite:
+    @pytest.fixture
+    def allocator(self):
+        allocator = EntityIdAllocator()
+        allocator.MINIMUM_FREE_INDICES = 2
+        return allocator
+
+    def test_allocate(self, allocator):
+        ids = [allocator.allocate() for _ in range(0, 3)]
+        assert ids == [0, 1, 2]
+        assert len(allocator) == 3
+        assert all(allocator.is_live(unique_id) for unique_id in ids)
+
+    def test_release(self, allocator):
+        first = allocator.allocate()
+        allocator.release(first)
+        assert not allocator.is_live(first)
+        assert len(allocator) == 0
+        with pytest.raises(GameException):
+            allocator.release(first)
+
+    def test_recycle(self, allocator):
+        ids = [allocator.allocate() for _ in range(0, 3)]
+        allocator.release(ids[0])
+
+        # not enough free indices yet, so we get a brand new one.
+        assert allocator.allocate() == 3
+        allocator.release(ids[1])
+
+        # now index 0 is recycled, with a new generation.
+        recycled = allocator.allocate()
+        assert EntityIdAllocator.index(recycled) == 0
+        assert EntityIdAllocator.generation(recycled) == 1
+        assert recycled != ids[0]
+        assert allocator.is_live(recycled) and not allocator.is_live(ids[0])
+        assert recycled < 2 ** 32
+
+    def test_generation_wraps(self, allocator):
+        allocator.MINIMUM_FREE_INDICES = 1
+        unique_id = allocator.allocate()
+        for _ in range(0, EntityIdAllocator.GENERATION_MASK + 1):
+            allocator.release(unique_id)
+            unique_id = allocator.allocate()
+        assert unique_id == 0
+
+    def test_exhausted(self, allocator):
+        allocator._generations = [0] * (EntityIdAllocator.INDEX_MASK + 1)
+        with pytest.raises(GameException):
+            allocator.allocate()
+
+    def test_is_live(self, allocator):
+        assert not allocator.is_live(None)
+        assert not allocator.is_live(0)
+
+    def test_state(self, allocator):
+        ids = [allocator.allocate() for _ in range(0, 3)]
+        allocator.release(ids[0])
+        allocator.release(ids[1])
+        state = allocator.get_state()
+
+        recycled = allocator.allocate()
+        allocator.release(ids[2])
+        allocator.set_state(state)
+        assert allocator.get_state() == state
+        assert allocator.is_live(ids[2])
+        assert allocator.allocate() == recycled
@@ -0,0 +1,113 @@
+import pytest
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player, IndestructibleWall, BombModifier
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.movement import MovementIntegrator
+from python_bomberman.common.game.tasks import MovementTask
+from python_bomberman.common.map import Map
+from python_bomberman.common.utils import Coordinate
+
+
+@pytest.fixture
+def game():
+    return Game(game_map=Map(dimensions=Coordinate(5, 5)), clock=FastForwardClock(step=.25))
+
+
+class TestMovementIntegratorSuite:
+    @pytest.fixture
+    def integrator(self, game):
+        return game.tasks._integrator
+
+    def _start(self, game, location, direction):
+        player = game.add(Player(location))
+        task = game.tasks.register_movement_task(player, direction, 1)
+        task.run()
+        return task
+
+    def test_add_discard(self, integrator, game):
+        tasks = [self._start(game, Coordinate(x, 0), MovementDirection.DOWN) for x in range(0, 3)]
+        assert len(integrator) == 3
+
+        # removing from the middle moves the last task into the empty slot.
+        integrator.discard(tasks[0])
+        assert tasks[0] not in integrator
+        assert integrator._slots[tasks[2]] == 0
+        assert integrator._remaining[0] == tasks[2].remaining
+
+        integrator.discard(tasks[0])
+        assert len(integrator) == 2
+
+    def test_grow(self, game):
+        integrator = MovementIntegrator(game.board.dimensions, capacity=1)
+        for x in range(0, 3):
+            task = self._start(game, Coordinate(x, 0), MovementDirection.DOWN)
+            integrator.add(task)
+        assert len(integrator) == 3
+        assert len(integrator._speed) >= 3
+
+    def test_advance(self, integrator, game):
+        task = self._start(game, Coordinate(0, 2), MovementDirection.LEFT)
+        assert integrator.advance(0) == []
+        assert integrator.advance(.25) == []
+        assert task.entity.physical_location == Coordinate(-.25, 2)
+        assert task.remaining == .75
+
+        # off the left edge of the board, we wrap around to the right.
+        assert integrator.advance(.75) == []
+        assert task.entity.physical_location == Coordinate(4.25, 2)
+        assert integrator.advance(1.0) == [task]
+
+
+class TestMovementSuite:
+    def test_move(self, game):
+        player = game.add(Player(Coordinate(0, 0)))
+        game.move(player, MovementDirection.UP, 2)
+
+        game.process()
+        assert player.logical_location == Coordinate(0, 4)
+        assert game.board.get(Coordinate(0, 4)).entity is player
+        assert game.board.get(Coordinate(0, 0)).entity is None
+
+        for _ in range(0, 4):
+            game.process()
+        assert player.physical_location == Coordinate(0, 4)
+
+        # the second space is covered by a chained task, which starts as soon as the first arrives.
+        assert game.tasks.get(player, MovementTask).distance == 1
+        assert player.moving is True
+        assert player.logical_location == Coordinate(0, 3)
+        for _ in range(0, 4):
+            game.process()
+        assert player.physical_location == Coordinate(0, 3)
+        assert player.moving is False
+        assert game.tasks.get(player, MovementTask) is None
+
+    def test_move_blocked(self, game):
+        player = game.add(Player(Coordinate(0, 0)))
+        game.add(IndestructibleWall(Coordinate(1, 0)))
+        game.move(player, MovementDirection.RIGHT, 1)
+
+        game.process()
+        assert player.moving is False
+        assert player.logical_location == Coordinate(0, 0)
+        assert game.tasks.get(player, MovementTask) is None
+
+    def test_move_modifier(self, game):
+        player = game.add(Player(Coordinate(0, 0)))
+        modifier = game.add(BombModifier(Coordinate(1, 0)))
+        game.move(player, MovementDirection.RIGHT, 1)
+
+        for _ in range(0, 5):
+            game.process()
+        assert player.bombs == 2
+        assert game.entities.get(modifier.unique_id) is None
+
+    def test_remove_while_moving(self, game):
+        player = game.add(Player(Coordinate(0, 0)))
+        game.move(player, MovementDirection.RIGHT, 1)
+        game.process()
+
+        game.remove(player)
+        assert game.tasks.get(player, MovementTask) is None
+        assert len(game.tasks._integrator) == 0
@@ -0,0 +1,91 @@
+import logging
+import pytest
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.profiler import PHASES, RollingHistogram, TickProfiler
+from python_bomberman.common.map import Map
+from python_bomberman.common.utils import Coordinate
+
+
+class TestRollingHistogramSuite:
+    def test_window(self):
+        histogram = RollingHistogram(window=3)
+        for value in [1, 2, 3, 4]:
+            histogram.add(value)
+        assert len(histogram) == 3
+        assert list(histogram.samples) == [2, 3, 4]
+
+    def test_summary(self):
+        histogram = RollingHistogram(window=100)
+        for value in range(1, 101):
+            histogram.add(value)
+        assert histogram.summary() == {"count": 100, "mean": 50.5, "p50": 50, "p99": 99, "max": 100}
+
+    def test_summary_empty(self):
+        assert RollingHistogram(window=10).summary() == {"count": 0, "mean": 0, "p50": 0, "p99": 0, "max": 0}
+
+    def test_buckets(self):
+        histogram = RollingHistogram(window=10)
+        for value in [0, 1, 3, 4, 1000]:
+            histogram.add(value)
+        assert histogram.buckets() == {1: 1, 2: 1, 4: 1, 8: 1, 1024: 1}
+
+
+class TestTickProfilerSuite:
+    @pytest.fixture
+    def game(self):
+        return Game(game_map=Map(dimensions=Coordinate(5, 5)), clock=FastForwardClock(step=.25))
+
+    def test_disabled(self, game):
+        assert game.profiler is None
+        game.process()
+
+    def test_phases(self, game):
+        game.profiler = TickProfiler(window=10)
+        for _ in range(0, 12):
+            game.process()
+        summary = game.profiler.summary()
+        assert summary["ticks"] == 12
+        assert summary["tick"]["count"] == 10
+        for phase in PHASES:
+            assert summary["phases"][phase]["count"] == 10
+            assert summary["phases"][phase]["max"] <= summary["tick"]["max"]
+
+    def test_tasks(self, game):
+        game.profiler = TickProfiler()
+        player = game.add(Player(Coordinate(2, 2)))
+        game.drop_bomb(player)
+        game.move(player, MovementDirection.RIGHT, 1)
+        game.process()
+
+        tasks = game.profiler.summary()["tasks"]
+        assert tasks["MovementTask"]["count"]["max"] == 1
+        assert tasks["DetonationTask"]["count"]["max"] == 1
+        assert "BurningTask" not in tasks
+
+        # the bomb goes off after 2 seconds and its fires burn for another 2
+        for _ in range(0, 16):
+            game.process()
+        tasks = game.profiler.summary()["tasks"]
+        assert tasks["BurningTask"]["count"]["max"] > 0
+        assert tasks["MovementTask"]["count"]["count"] == game.profiler.ticks
+
+    def test_dump(self, game, caplog):
+        game.profiler = TickProfiler(dump_interval=2)
+        with caplog.at_level(logging.INFO):
+            game.process()
+            assert not caplog.records
+            game.process()
+        assert len(caplog.records) == 1
+        assert "tick profile over the last 2 of 2 ticks" in caplog.records[0].getMessage()
+
+    def test_reset(self, game):
+        game.profiler = TickProfiler(window=5, dump_interval=100)
+        game.process()
+        game.profiler.reset()
+        assert game.profiler.ticks == 0
+        assert game.profiler.window == 5
+        assert game.profiler.dump_interval == 100
+        assert game.profiler.summary()["tick"]["count"] == 0
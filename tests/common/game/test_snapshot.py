@@ -0,0 +1,153 @@
+import pytest
+from python_bomberman.common.game.array_board import ArrayBoard
+from python_bomberman.common.game.board import Board
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player, DestructibleWall, Bomb, BombModifier
+from python_bomberman.common.game.game import Game
+from python_bomberman.common.game.tasks import DetonationTask, MovementTask
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+def state(game):
+    # everything observable about a game, in a form that can be compared
+    entities = sorted(
+        (entity.__class__.__name__,) + tuple(repr(getattr(entity, attr)) for attr in entity.state_attributes)
+        for entity in game.entities.all_entities()
+    )
+    board = sorted(
+        (entity.__class__.__name__, entity.unique_id, tuple(entity.logical_location))
+        for entity in game.board.all_entities()
+    )
+    tasks = sorted(
+        (task_type.__name__, task.entity.unique_id, repr(getattr(task, "remaining", None)))
+        for task_type in (MovementTask, DetonationTask) for task in game.tasks.tasks(task_type)
+    )
+    return game.clock.now, entities, board, tasks
+
+
+class TestSuite:
+    @pytest.fixture(params=[Board, ArrayBoard])
+    def game(self, request):
+        game_map = map.Map(dimensions=Coordinate(9, 9), objects=[
+            map.Player(Coordinate(0, 0)),
+            map.Player(Coordinate(4, 4)),
+            map.DestructibleWall(Coordinate(2, 0)),
+            map.DestructibleWall(Coordinate(8, 8)),
+            map.IndestructibleWall(Coordinate(1, 1))
+        ])
+        game = Game(game_map=game_map, clock=FastForwardClock(step=.1), board_cls=request.param)
+        game.add(BombModifier(Coordinate(0, 3)))
+        return game
+
+    @staticmethod
+    def run(game, ticks):
+        states = []
+        for _ in range(0, ticks):
+            game.process()
+            states.append(state(game))
+        return states
+
+    @staticmethod
+    def play(game, ticks):
+        # both players drop a bomb and run, repeatedly
+        states = []
+        for tick in range(0, ticks):
+            players = list(game.entities.of_type(Player))
+            for direction, player in zip([MovementDirection.DOWN, MovementDirection.LEFT], players):
+                if not player.moving and not player.destroyed:
+                    game.drop_bomb(player)
+                    game.move(player, direction, 2)
+            game.process()
+            states.append(state(game))
+        return states
+
+    def test_restore(self, game):
+        self.play(game, 10)
+        snapshot = game.snapshot()
+        expected = self.play(game, 60)
+
+        # walls and players have been blown up since the snapshot
+        assert len(game.entities.of_type(DestructibleWall)) < 2
+
+        game.restore(snapshot)
+        assert self.play(game, 60) == expected
+
+        # snapshots can be restored any number of times
+        game.restore(snapshot)
+        assert self.play(game, 60) == expected
+
+    def test_restore_in_place(self, game):
+        player = list(game.entities.of_type(Player))[0]
+        wall = game.board.get(Coordinate(2, 0)).entity
+        snapshot = game.snapshot()
+
+        game.move(player, MovementDirection.RIGHT, 1)
+        game.destroy(wall)
+        game.process()
+        game.process()
+        assert game.entities.get(wall.unique_id) is None
+
+        game.restore(snapshot)
+        assert player.logical_location == player.physical_location == Coordinate(0, 0)
+        assert not player.moving
+        assert game.board.get(Coordinate(0, 0)).entity is player
+        assert game.tasks.get(player, MovementTask) is None
+
+        # the wall was removed from the game, so it's been recreated
+        restored = game.board.get(Coordinate(2, 0)).entity
+        assert isinstance(restored, DestructibleWall) and restored is not wall
+        assert restored.unique_id == wall.unique_id and not restored.destroyed
+        assert game.entities.get(wall.unique_id) is restored
+        assert game.ids.is_live(wall.unique_id)
+
+    def test_detached_entities(self, game):
+        # a bomb whose owner has been removed from the game still needs its owner
+        player = list(game.entities.of_type(Player))[0]
+        game.drop_bomb(player)
+        bomb = game.board.get(player.logical_location).bomb
+        game.process()
+        game.destroy(player)
+        game.process()
+        assert game.entities.get(player.unique_id) is None
+
+        snapshot = game.snapshot()
+        assert [values[0] for _, values in snapshot.detached] == [player.unique_id]
+
+        game.restore(snapshot)
+        owner = game.tasks.get(bomb, DetonationTask).bomb_owner
+        assert owner.unique_id == player.unique_id and owner.bombs == 0
+        for _ in range(0, 30):
+            game.process()
+        assert owner.bombs == 1
+
+    def test_copy_on_write(self, game):
+        first = game.snapshot()
+        second = game.snapshot()
+        assert all(a is b for a, b in zip(first.chunks, second.chunks))
+
+        # only chunks that have changed are copied
+        game.board.CHUNK_SIZE = 4
+        game.board._build_chunks()
+        game._snapshotter = type(game._snapshotter)(game)
+        first = game.snapshot()
+        game.destroy(game.board.get(Coordinate(8, 8)).entity)
+        game.process()
+        second = game.snapshot()
+        changed = game.board.chunk(Coordinate(8, 8))
+        assert first.chunks[changed] is not second.chunks[changed]
+        assert all(a is b for chunk, (a, b) in enumerate(zip(first.chunks, second.chunks)) if chunk != changed)
+
+    def test_bombs_in_flight(self, game):
+        player = list(game.entities.of_type(Player))[1]
+        game.drop_bomb(player)
+        game.move(player, MovementDirection.UP, 3)
+        for _ in range(0, 5):
+            game.process()
+        snapshot = game.snapshot()
+        expected = self.run(game, 40)
+
+        game.restore(snapshot)
+        assert isinstance(game.board.get(Coordinate(4, 4)).bomb, Bomb)
+        assert self.run(game, 40) == expected
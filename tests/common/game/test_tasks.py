@@ -5,7 +5,6 @@ from python_bomberman.common.game.entities import Bomb, Player, Fire
 from python_bomberman.common.game.constants import MovementDirection
 from python_bomberman.common.map import Map
 from python_bomberman.common.utils import Coordinate
-import time
 
 
 @pytest.fixture
@@ -47,32 +46,92 @@ def task_manager(game):
 
 class TestTaskManagerSuite:
     def test_init(self, task_manager, game):
-        assert task_manager._tasks is not None
+        assert task_manager._queues is not None
         assert task_manager.game == game
 
     def test_register_movement_task(self, task_manager, player):
         task_1 = task_manager.register_movement_task(player, direction=MovementDirection.UP, distance=2)
         task_2 = task_manager.register_movement_task(player, direction=MovementDirection.DOWN, distance=1)
-        task_list = task_manager._tasks.get(player.unique_id, None)
-        assert task_list is not None and task_2 in task_list and task_1 not in task_list
+        assert task_manager.get(player, MovementTask) is task_2
+        assert task_manager.is_registered(task_1) is False
 
     def test_register_burning_task(self, task_manager, fire):
         task_1 = task_manager.register_burning_task(fire)
         task_2 = task_manager.register_burning_task(fire)
-        task_list = task_manager._tasks.get(fire.unique_id, None)
-        assert task_list is not None and task_2 in task_list and task_1 not in task_list
+        assert task_manager.get(fire, BurningTask) is task_2
+        assert task_manager.is_registered(task_1) is False
 
     def test_register_detonation_task(self, task_manager, bomb, player):
         task_1 = task_manager.register_detonation_task(bomb, player)
         task_2 = task_manager.register_detonation_task(bomb, player)
-        task_list = task_manager._tasks.get(bomb.unique_id, None)
-        assert task_list is not None and task_2 in task_list and task_1 not in task_list
+        assert task_manager.get(bomb, DetonationTask) is task_2
+        assert task_manager.is_registered(task_1) is False
 
     def test_add_multiple(self, task_manager, player, bomb):
         movement = task_manager.register_movement_task(bomb, direction=MovementDirection.UP, distance=2)
         detonation = task_manager.register_detonation_task(bomb, player)
-        task_list = task_manager._tasks.get(bomb.unique_id, None)
-        assert task_list is not None and movement in task_list and detonation in task_list
+        assert task_manager.get(bomb, MovementTask) is movement
+        assert task_manager.get(bomb, DetonationTask) is detonation
+
+    def test_unregister_task(self, task_manager, player, bomb):
+        movement = task_manager.register_movement_task(player, direction=MovementDirection.UP, distance=2)
+        detonation = task_manager.register_detonation_task(bomb, player)
+        task_manager.unregister_task(movement)
+        assert task_manager.get(player, MovementTask) is None
+        assert task_manager.get(bomb, DetonationTask) is detonation
+
+        # unregistering a task that's already been replaced leaves its replacement alone.
+        replacement = task_manager.register_detonation_task(bomb, player)
+        task_manager.unregister_task(detonation)
+        assert task_manager.get(bomb, DetonationTask) is replacement
+
+    def test_run_unregistered_during_run(self, game):
+        players = [game.add(Player(Coordinate(x, 0))) for x in range(0, 2)]
+        tasks = [game.tasks.register_movement_task(player, MovementDirection.DOWN, 1) for player in players]
+
+        # the first task cancels the second while the tick is in progress.
+        on_start = tasks[0].on_start
+
+        def on_start_and_cancel():
+            on_start()
+            game.tasks.unregister_task(tasks[1])
+
+        tasks[0].on_start = on_start_and_cancel
+        game.process(dt=0)
+        assert tasks[0].started is True
+        assert tasks[1].started is False
+        assert game.tasks.get(players[1], MovementTask) is None
+
+    def test_run_scheduled(self, game, fire):
+        game.add(fire)
+        task = game.tasks.register_burning_task(fire)
+
+        game.process(dt=0)
+        assert task.started is True
+        assert task.deadline == fire.duration
+
+        # scheduled tasks aren't touched until their deadline passes.
+        game.process(dt=1)
+        assert fire.duration == task.deadline
+        assert fire.burning is True
+
+        game.process(dt=1.5)
+        assert task.done is True
+        assert fire.destroyed is True
+        assert game.entities.get(fire.unique_id) is None
+
+    def test_run_scheduled_replaced(self, game, fire):
+        game.add(fire)
+        task_1 = game.tasks.register_burning_task(fire)
+        game.process(dt=0)
+        fire.duration = 5
+        task_2 = game.tasks.register_burning_task(fire)
+
+        # the replaced task's deadline passes, but it's no longer registered so it never runs.
+        game.process(dt=3)
+        assert task_1.done is False
+        assert task_2.started is True
+        assert fire.destroyed is False
 
 
 class TestMovementTaskSuite:
@@ -93,7 +152,20 @@ class TestMovementTaskSuite:
         assert task.distance == 2
 
     def test_run(self, task):
-        pass
+        task.run()
+        assert task.started is True
+        assert task.remaining == 1
+        assert task.entity.logical_location == Coordinate(2, 1)
+        task.game.clock.advance(.5)
+        task.run()
+        assert task.done is False
+        assert task.entity.physical_location == Coordinate(2, 1.5)
+        task.game.clock.advance(.5)
+        task.run()
+        assert task.done is True
+        assert task.entity.moving is False
+        assert task.entity.physical_location == task.entity.logical_location
+        assert task.task_manager.get(task.entity, MovementTask) is not None
 
 
 class TestBurningTaskSuite:
@@ -137,12 +209,12 @@ class TestDetonationTaskSuite:
         task.run()
         assert task.started is True
         assert task.done is False
-        time.sleep(duration/2)
+        task.game.clock.advance(duration/2)
         task.run()
         assert task.started is True
         assert task.done is False
         assert 0 < task.entity.duration < duration
-        time.sleep(duration/2)
+        task.game.clock.advance(duration/2)
         task.run()
         assert task.done is True
         assert task.entity.duration <= 0
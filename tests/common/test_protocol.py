@@ -0,0 +1,82 @@
+import pytest
+from python_bomberman.common import protocol
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player, Bomb
+from python_bomberman.common.game.game import Game
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+class TestSuite:
+    @pytest.mark.parametrize("message", [
+        protocol.Join("lobby"),
+        protocol.Join(""),
+        protocol.Joined(7, 2 ** 64 - 1, 123456, "sälen"),
+        protocol.Spectate("final"),
+        protocol.Joined(7, 99, protocol.NO_PLAYER, "final"),
+        protocol.Error("room is full"),
+        protocol.Input(7, 99, 5),
+        protocol.Leave(),
+        protocol.State(42, 1.5, []),
+        protocol.Ack(7, 99, 42),
+        protocol.Delta(43, 42, 1.75, [], []),
+        protocol.Delta(43, 40, 1.75, [3, 9], [
+            protocol.EntityState(1, protocol.TYPE_CODES[Player], 0, 3, 5, 3.0, 4.75, 0.0)
+        ]),
+        protocol.State(42, 1.5, [
+            protocol.EntityState(1, protocol.TYPE_CODES[Player], protocol.MOVING, 3, 4, 3.5, 4.0, 0.0),
+            protocol.EntityState(2, protocol.TYPE_CODES[Bomb], protocol.DETONATING, 0, 65535, 0.0, 65535.0, 1.25)
+        ])
+    ])
+    def test_round_trip(self, message):
+        assert protocol.decode(protocol.encode(message)) == message
+
+    def test_strings(self):
+        # strings are cut down to 255 bytes without splitting a character
+        decoded = protocol.decode(protocol.encode(protocol.Join("é" * 200)))
+        assert decoded.room == "é" * 127
+
+    def test_game_state(self):
+        game = Game(map.arena_map(Coordinate(9, 9), .5, 2, 0), clock=FastForwardClock(step=.5))
+        player = sorted(game.entities.of_type(Player), key=lambda entity: entity.unique_id)[0]
+        game.drop_bomb(player)
+        game.move(player, MovementDirection.all_directions()[0], 1)
+        game.process()
+        game.process()
+
+        states = protocol.entity_states(game)
+        decoded = protocol.decode(protocol.encode(protocol.State(2, game.clock.now, states)))
+        assert decoded.tick == 2 and decoded.time == game.clock.now
+        assert len(decoded.entities) == len(game.entities.all_entities())
+        by_id = {entity.unique_id: entity for entity in decoded.entities}
+
+        state = by_id[player.unique_id]
+        assert protocol.ENTITY_TYPES[state.type] is Player
+        assert (state.x, state.y) == player.logical_location
+        assert (state.physical_x, state.physical_y) == pytest.approx(player.physical_location)
+        bomb = next(entity for entity in decoded.entities if protocol.ENTITY_TYPES[entity.type] is Bomb)
+        assert bomb.flags & protocol.DETONATING
+        assert bomb.timer == 1.5
+
+    def test_encoder(self):
+        # the encoder reuses its buffer, growing it when it has to
+        encoder = protocol.Encoder(size=16)
+        state = protocol.State(1, 0.0, [protocol.EntityState(1, 1, 0, 0, 0, 0.0, 0.0, 0.0)] * 100)
+        encoded = encoder.encode(state)
+        assert len(encoded) == protocol.HEADER.size + 16 + protocol.ENTITY.size * 100
+        assert protocol.decode(encoded) == state
+        assert encoder.encode(protocol.Leave()).obj is encoded.obj
+
+    def test_invalid(self):
+        payload = protocol.encode(protocol.Joined(1, 99, 2, "room"))
+        with pytest.raises(protocol.ProtocolException):
+            protocol.decode(bytes([protocol.VERSION + 1]) + payload[1:])
+        with pytest.raises(protocol.ProtocolException):
+            protocol.decode(payload[:-1])
+        with pytest.raises(protocol.ProtocolException):
+            protocol.decode(bytes([protocol.VERSION, 99]))
+        with pytest.raises(protocol.ProtocolException):
+            protocol.decode(protocol.encode(protocol.State(1, 0.0, [protocol.EntityState(1, 1, 0, 0, 0, 0.0, 0.0, 0.0)]))[:-1])
+        with pytest.raises(protocol.ProtocolException):
+            protocol.decode(b"")
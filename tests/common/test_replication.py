@@ -0,0 +1,105 @@
+import pytest
+import random
+from python_bomberman.common import protocol
+from python_bomberman.common import replication
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player
+from python_bomberman.common.game.game import Game
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+def entities(state):
+    # a state's entities by id, with timers rounded so extrapolated ones compare equal
+    return {entity.unique_id: entity._replace(timer=round(entity.timer, 3)) for entity in state.entities}
+
+
+class TestSuite:
+    @pytest.fixture
+    def game(self):
+        return Game(map.arena_map(Coordinate(15, 13), .5, 4, 0), clock=FastForwardClock(step=.1))
+
+    @staticmethod
+    def play(game, rng):
+        for player in list(game.entities.of_type(Player)):
+            if not player.moving:
+                if rng.random() < .1:
+                    game.drop_bomb(player)
+                game.move(player, rng.choice(MovementDirection.all_directions()), 1)
+        game.process()
+
+    @staticmethod
+    def snapshot(game):
+        return {entity.unique_id: entity for entity in protocol.entity_states(game)}
+
+    def test_diff(self):
+        player = protocol.EntityState(1, 1, 0, 0, 0, 0.0, 0.0, 0.0)
+        bomb = protocol.EntityState(2, 2, 0, 0, 0, 0.0, 0.0, 2.0)
+        wall = protocol.EntityState(3, 4, 0, 1, 1, 1.0, 1.0, 0.0)
+        baseline = {1: player, 2: bomb, 3: wall}
+
+        # a timer that's just counted down isn't a change
+        snapshot = {1: player._replace(physical_x=.5), 2: bomb._replace(timer=1.5)}
+        assert replication.diff(baseline, 1.0, snapshot, 1.5) == ([3], [snapshot[1]])
+        snapshot[2] = bomb._replace(timer=1.75)
+        assert replication.diff(baseline, 1.0, snapshot, 1.5) == ([3], [snapshot[1], snapshot[2]])
+
+    def test_ring(self):
+        ring = replication.SnapshotRing(size=2)
+        for tick in range(0, 3):
+            ring.push(tick, tick * 10)
+        assert len(ring) == 2
+        assert ring.get(0) is None and ring.get(2) == 20
+
+    def test_replication(self, game):
+        # packets are lost in both directions, but the client always ends up with the server's state
+        rng = random.Random(0)
+        replicator = replication.Replicator(ring_size=8)
+        replica = replication.Replica(ring_size=8)
+        sizes = {protocol.State: [], protocol.Delta: []}
+        for tick in range(1, 300):
+            self.play(game, rng)
+            message = replicator.message(tick, game.clock.now, self.snapshot(game))
+            payload = protocol.encode(message)
+            sizes[message.__class__].append(len(payload))
+            if rng.random() < .3:
+                continue
+
+            acknowledged = replica.receive(protocol.decode(payload))
+            if acknowledged is not None:
+                assert acknowledged == tick
+                assert entities(replica.state) == entities(protocol.decode(protocol.encode(
+                    protocol.State(tick, game.clock.now, protocol.entity_states(game))
+                )))
+                if rng.random() > .3:
+                    replicator.acknowledge(acknowledged)
+
+        assert replicator.deltas > 200
+        assert max(sizes[protocol.Delta]) < min(sizes[protocol.State]) / 4
+
+    def test_keyframe_fallback(self, game):
+        replicator = replication.Replicator(ring_size=4)
+        replica = replication.Replica(ring_size=4)
+        for tick in range(1, 4):
+            game.process()
+            replicator.acknowledge(replica.receive(replicator.message(tick, game.clock.now, self.snapshot(game))))
+        assert replicator.keyframes == 1 and replicator.deltas == 2
+
+        # the client stops hearing from the server until its last acknowledged tick is out of the ring
+        for tick in range(4, 8):
+            game.process()
+            message = replicator.message(tick, game.clock.now, self.snapshot(game))
+            assert isinstance(message, protocol.Delta) and message.baseline == 3
+        game.process()
+        assert isinstance(replicator.message(8, game.clock.now, self.snapshot(game)), protocol.State)
+
+        # acknowledgements of ticks that were never sent (or have been forgotten) are ignored
+        replicator.acknowledge(100)
+        replicator.acknowledge(2)
+        assert replicator.acknowledged is None
+
+    def test_unknown_baseline(self):
+        replica = replication.Replica()
+        assert replica.receive(protocol.Delta(5, 4, 1.0, [], [])) is None
+        assert replica.state is None
@@ -0,0 +1,61 @@
+import pytest
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.entities import Player
+from python_bomberman.env import observation
+from python_bomberman.env.env import BombermanEnv
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+class TestSuite:
+    @pytest.fixture
+    def env(self):
+        game_map = map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(0, 0)), map.Player(Coordinate(2, 2))])
+        return BombermanEnv(game_map, step=.25)
+
+    def test_reset(self, env):
+        observations, infos = env.reset()
+        assert env.agents == env.possible_agents == ["player_0", "player_1"]
+        assert set(observations) == set(infos) == {"player_0", "player_1"}
+        assert observations["player_0"] is env.observation
+        assert env.observation[observation.PLAYERS, 2, 2] == 2
+
+    def test_added_player(self, env):
+        # players added mid-episode have no agent, but are still observed
+        env.reset()
+        player = env.game.add(Player(Coordinate(4, 4)))
+        assert env.game.entities.get(player.unique_id) is player
+        assert env.observation[observation.PLAYERS, 4, 4] == observation.OTHER_PLAYER
+        assert (env.observation == observation.encode(env.game, env._encoder.players)).all()
+
+    def test_step(self, env):
+        env.reset()
+        _, rewards, terminated, truncated, _ = env.step({"player_0": batch.MOVE_RIGHT, "player_1": batch.NOOP})
+        assert rewards == {"player_0": 0.0, "player_1": 0.0}
+        assert not any(terminated.values()) and not any(truncated.values())
+        assert env.observation[observation.PLAYERS, 1, 0] == 1
+
+    def test_episode(self, env):
+        # player_1 blows itself up, leaving player_0 the winner
+        env.reset()
+        env.step({"player_1": batch.DROP_BOMB})
+        for _ in range(0, 8):
+            _, rewards, terminated, _, _ = env.step({})
+        assert rewards == {"player_0": 1.0, "player_1": -1.0}
+        assert terminated == {"player_0": True, "player_1": True}
+        assert env.agents == []
+
+    def test_truncation(self, env):
+        env.max_steps = 2
+        env.reset()
+        env.step({})
+        _, _, terminated, truncated, _ = env.step({})
+        assert truncated == {"player_0": True, "player_1": True}
+        assert not any(terminated.values())
+        assert env.agents == []
+
+    def test_reward_hook(self, env):
+        env.reward = lambda env, agent: float(env.steps)
+        env.reset()
+        _, rewards, _, _, _ = env.step({})
+        assert rewards == {"player_0": 1.0, "player_1": 1.0}
@@ -0,0 +1,87 @@
+import numpy
+import pytest
+import random
+from python_bomberman.common.map import arena_map
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.array_board import ArrayBoard
+from python_bomberman.common.game.board import Board
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.constants import MovementDirection
+from python_bomberman.common.game.entities import Player, BombModifier
+from python_bomberman.common.game.game import Game
+from python_bomberman.env import observation
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+class TestSuite:
+    def test_encode(self):
+        game = Game(map.Map(Coordinate(5, 4), objects=[
+            map.Player(Coordinate(0, 0)),
+            map.Player(Coordinate(4, 3)),
+            map.IndestructibleWall(Coordinate(1, 1)),
+            map.DestructibleWall(Coordinate(2, 2))
+        ]))
+        game.add(BombModifier(Coordinate(3, 0)))
+        players = sorted(player.unique_id for player in game.entities.of_type(Player))
+        game.drop_bomb(game.entities.get(players[1]))
+
+        encoded = observation.encode(game, {unique_id: index for index, unique_id in enumerate(players)})
+        assert encoded.shape == (observation.CHANNELS, 5, 4) and encoded.dtype == numpy.uint8
+        assert encoded[observation.WALLS, 1, 1] == batch.INDESTRUCTIBLE_WALL
+        assert encoded[observation.WALLS, 2, 2] == batch.DESTRUCTIBLE_WALL
+        assert encoded[observation.MODIFIERS, 3, 0] == batch.BOMB_MODIFIER
+        assert encoded[observation.BOMBS, 4, 3] == 1
+        assert encoded[observation.PLAYERS, 0, 0] == 1 and encoded[observation.PLAYERS, 4, 3] == 2
+        assert encoded[observation.BOMB_FUSE, 4, 3] == 255
+        assert encoded.sum() == 2 + 1 + 1 + 1 + 3 + 255
+        assert not encoded[observation.FIRE].any() and not encoded[observation.FIRE_REMAINING].any()
+
+        # encoding into an existing array overwrites it
+        out = numpy.full(encoded.shape, 9, dtype=numpy.uint8)
+        assert observation.encode(game, {unique_id: index for index, unique_id in enumerate(players)}, out) is out
+        assert (out == encoded).all()
+
+    def test_timers(self):
+        game = Game(map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(2, 2))]), clock=FastForwardClock(step=.5))
+        player = next(iter(game.entities.of_type(Player)))
+        players = {player.unique_id: 0}
+        game.drop_bomb(player)
+        game.process()
+        assert observation.encode(game, players)[observation.BOMB_FUSE, 2, 2] == 255
+        game.process()
+        assert observation.encode(game, players)[observation.BOMB_FUSE, 2, 2] == 192
+
+    @pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+    def test_encoder(self, board_cls):
+        # the incremental encoder always matches encoding the game from scratch
+        rng = random.Random(0)
+        game = Game(arena_map(Coordinate(11, 9), .5, 4, 0), clock=FastForwardClock(step=.1), board_cls=board_cls)
+        game.add(BombModifier(next(
+            space.location for space in (game.board.get(Coordinate(x, 0)) for x in range(0, 11))
+            if space.entity is None
+        )))
+        players = {
+            unique_id: index for index, unique_id in enumerate(sorted(p.unique_id for p in game.entities.of_type(Player)))
+        }
+        encoder = observation.ObservationEncoder(game, players)
+        assert (encoder.update() == observation.encode(game, players)).all()
+
+        snapshot = None
+        for tick in range(0, 200):
+            for player in list(game.entities.of_type(Player)):
+                if not player.moving:
+                    if rng.random() < .2:
+                        game.drop_bomb(player)
+                    game.move(player, rng.choice(MovementDirection.all_directions()), 1)
+            game.process()
+            assert (encoder.update() == observation.encode(game, players)).all(), tick
+            if tick == 50:
+                snapshot = game.snapshot()
+
+        # restoring a snapshot changes the board through the same hooks
+        game.restore(snapshot)
+        assert (encoder.update() == observation.encode(game, players)).all()
+
+        encoder.detach()
+        assert game.board.listeners == []
@@ -0,0 +1,38 @@
+import numpy
+from python_bomberman.common.game import batch
+from python_bomberman.env import observation
+from python_bomberman.env.vector import VectorEnv
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+
+
+class TestSuite:
+    def test_vector(self):
+        game_maps = [
+            map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(0, 0)), map.Player(Coordinate(2, 2))]),
+            map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(4, 4))])
+        ]
+        with VectorEnv(game_maps, step=.25) as envs:
+            observations = envs.reset()
+            assert observations.shape == (2, observation.CHANNELS, 5, 5)
+            assert observations[0, observation.PLAYERS, 2, 2] == 2
+            assert observations[1, observation.PLAYERS, 4, 4] == 1
+
+            actions = numpy.array([[batch.MOVE_RIGHT, batch.DROP_BOMB], [batch.MOVE_UP, batch.NOOP]])
+            stepped, rewards, terminated, truncated, done = envs.step(actions)
+            assert stepped is observations
+            assert observations[0, observation.BOMBS, 2, 2] == 1
+            assert observations[0, observation.PLAYERS, 1, 0] == 1
+            assert observations[1, observation.PLAYERS, 4, 3] == 1
+            assert rewards.shape == terminated.shape == truncated.shape == (2, 2)
+            assert terminated.tolist() == [[False, False], [False, True]]
+            assert not done.any()
+
+            # the bomb takes out player 1 and the first env starts over
+            for _ in range(0, 8):
+                _, rewards, terminated, _, done = envs.step(numpy.zeros((2, 2), dtype=int))
+            assert done.tolist() == [True, False]
+            assert rewards[0].tolist() == [1.0, -1.0]
+            assert observations[0, observation.PLAYERS, 0, 0] == 1
+            assert not observations[0, observation.BOMBS].any()
+        assert envs.closed
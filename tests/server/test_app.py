@@ -0,0 +1,229 @@
+import asyncio
+import json
+import socket
+import sys
+import pytest
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.entities import Bomb
+import python_bomberman.common.protocol as protocol
+from python_bomberman.common import replication
+from python_bomberman.common.testutils import temp_file
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+from python_bomberman.server.app import App
+from python_bomberman.server.room import Room
+from python_bomberman.server.network import FRAME_HEADER
+
+
+async def read_message(reader):
+    size, = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return protocol.decode(await reader.readexactly(size))
+
+
+def write_message(writer, message):
+    payload = message if isinstance(message, bytes) else protocol.encode(message)
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def run_client(app, client):
+    """
+    Serves the app while 'client' (a coroutine function, given a stream reader and writer connected to
+    the app) runs, then stops it - returning whatever the client returned.
+    :param app:
+    :param client:
+    :return:
+    """
+    async def connected():
+        while app.port is None:
+            await asyncio.sleep(.01)
+        reader, writer = await asyncio.open_connection("127.0.0.1", app.port)
+        try:
+            return await client(reader, writer)
+        finally:
+            writer.close()
+            # give the server a moment to notice the connection closing
+            await asyncio.sleep(.05)
+            app.stop()
+
+    async def main():
+        result, _ = await asyncio.gather(connected(), app.serve())
+        return result
+    return asyncio.run(main())
+
+
+class TestSuite:
+    @pytest.fixture
+    def app(self, temp_file):
+        with open(temp_file, "w") as f:
+            f.write(json.dumps({"server": {"host": "127.0.0.1", "port": 0, "tick_rate": 100}}))
+        return App(temp_file)
+
+    def test_headless(self):
+        assert "pyglet" not in sys.modules
+
+    def test_serve(self, app):
+        async def client(reader, writer):
+            for message in [b"garbage", protocol.Join("lobby"), protocol.Input(0, 0, batch.DROP_BOMB)]:
+                write_message(writer, message)
+            joined = await read_message(reader)
+            spawn = app.rooms["lobby"].game.entities.get(joined.player).logical_location
+
+            # the garbage was dropped without closing the connection, which is still sent states
+            assert joined.__class__ is protocol.Joined
+            assert (await read_message(reader)).__class__ is protocol.State
+            assert joined.connection in app.connections
+
+            # inputs can come in over udp too
+            datagrams = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            move = protocol.Input(joined.connection, joined.token, batch.MOVE_DOWN)
+            datagrams.sendto(protocol.encode(move), ("127.0.0.1", app.port))
+            datagrams.close()
+            await asyncio.sleep(.1)
+            return joined, spawn
+
+        joined, spawn = run_client(app, client)
+        assert isinstance(joined, protocol.Joined) and joined.room == "lobby"
+
+        room = app.rooms["lobby"]
+        assert room.ticks > 5
+        player = room.game.entities.get(joined.player)
+        # the bomb went down where the player spawned, and then the player started moving down from there
+        assert isinstance(room.game.board.get(spawn).bomb, Bomb)
+        assert player.bombs == 0
+        assert player.moving
+        assert player.logical_location == Coordinate(spawn.x, spawn.y + 1)
+        assert player.physical_location.x == spawn.x and spawn.y < player.physical_location.y < spawn.y + 1
+        assert room.connections == {} and app.connections == {}
+
+    def test_datagram_token(self, app):
+        connection = app.connect(send=lambda payload: None, close=None)
+        app.room("lobby").join(connection)
+        acknowledged = connection.replicator.acknowledged
+
+        # datagrams with the wrong token can't send inputs or redirect the connection's datagrams
+        spoofed = protocol.Input(connection.connection_id, connection.token ^ 1, batch.DROP_BOMB)
+        app.receive_datagram(protocol.encode(spoofed), "spoofed")
+        app.receive_datagram(protocol.encode(protocol.Ack(connection.connection_id, 0, 0)), "spoofed")
+        assert connection.datagram_address is None and connection.inputs.empty()
+        assert connection.replicator.acknowledged == acknowledged
+
+        genuine = protocol.Input(connection.connection_id, connection.token, batch.DROP_BOMB)
+        app.receive_datagram(protocol.encode(genuine), "client")
+        assert connection.datagram_address == "client" and connection.drain_inputs() == [batch.DROP_BOMB]
+
+    def test_broken_room(self, app):
+        received = []
+        connection = app.connect(send=lambda payload: received.append(protocol.decode(payload)), close=None)
+        broken, working = app.room("broken"), app.room("working")
+        broken.join(connection)
+
+        def tick():
+            raise RuntimeError("broken")
+        broken.tick = tick
+
+        app._tick()
+        app._tick()
+        assert set(app.rooms) == {"working"} and working.ticks == 2
+        assert connection.room is None and received == [protocol.Error("room broken was closed")]
+
+    def test_replication(self, app):
+        async def client(reader, writer):
+            write_message(writer, protocol.Join("lobby"))
+            joined = await read_message(reader)
+
+            # the first state is a keyframe, and once it's acknowledged the rest are deltas
+            replica = replication.Replica()
+            received = []
+            while len(received) < 5:
+                message = await read_message(reader)
+                received.append(message.__class__)
+                write_message(writer, protocol.Ack(joined.connection, joined.token, replica.receive(message)))
+            return received, replica
+
+        received, replica = run_client(app, client)
+        assert received[0] is protocol.State
+        assert protocol.Delta in received
+        assert len(replica.state.entities) == len(app.rooms["lobby"].game.entities.all_entities())
+
+    def test_replication_views(self, app):
+        room = app.rooms["views"] = Room(
+            "views", map.arena_map(Coordinate(40, 24), .5, 4, 0), tick_rate=60, view_radius=2
+        )
+        replicas = [replication.Replica() for _ in range(0, 2)]
+        connections = [
+            app.connect(send=lambda payload, replica=replica: replica.receive(protocol.decode(payload)), close=None)
+            for replica in replicas
+        ]
+        for connection in connections:
+            room.join(connection)
+        room.tick()
+        app._replicate(room)
+        for connection, replica in zip(connections, replicas):
+            connection.replicator.acknowledge(replica.state.tick)
+
+        # both acknowledged different views, and then the second player moves into the first one's -
+        # they now share a snapshot, but not the baseline their deltas are taken against
+        first, second = (room.game.entities.get(connection.player_id) for connection in connections)
+        location = Coordinate(first.logical_location.x, first.logical_location.y + 1)
+        room.game.board.move(second, location)
+        second.physical_location = location
+        room.tick()
+        app._replicate(room)
+        assert room.interest.cells(1) == room.interest.cells(2)
+
+        snapshots = room.snapshots()
+        for connection, replica in zip(connections, replicas):
+            assert connection.replicator.deltas == 1
+            assert {entity.unique_id for entity in replica.state.entities} == set(snapshots[connection.connection_id])
+
+    def test_spectate(self, app):
+        async def client(reader, writer):
+            for message in [protocol.Spectate("final"), protocol.Input(0, 0, batch.DROP_BOMB)]:
+                write_message(writer, message)
+            return [await read_message(reader) for _ in range(0, 4)]
+
+        joined, *states = run_client(app, client)
+        assert joined.player == protocol.NO_PLAYER and joined.room == "final"
+        assert all(state.__class__ is protocol.State for state in states)
+        assert [state.tick for state in states] == sorted(state.tick for state in states)
+
+        room = app.rooms["final"]
+        assert len(states[-1].entities) == len(room.game.entities.all_entities())
+        assert room.spectators == {} and room.connections == {}
+        # spectators don't have a player to send inputs to
+        assert len(room.game.entities.of_type(Bomb)) == 0
+
+    def test_broadcast(self, app):
+        sent = {}
+        aborted = []
+
+        def connect(connection_id):
+            connection = app.connect(
+                send=None, close=None,
+                send_frame=lambda framed: sent.setdefault(connection_id, []).append(framed),
+                abort=lambda: aborted.append(connection_id)
+            )
+            app.room("final").spectate(connection)
+            return connection
+
+        room = app.room("final")
+        spectators = [connect(connection_id) for connection_id in range(1, 4)]
+        spectators[2].paused = True
+        room.tick()
+        app._broadcast(room)
+
+        # every spectator is written the same buffer
+        assert sent[1][0] is sent[2][0]
+        state = protocol.decode(sent[1][0][FRAME_HEADER.size:])
+        assert state.tick == 1 and len(state.entities) == len(room.game.entities.all_entities())
+        assert 3 not in sent and spectators[2].skipped_frames == 1
+
+        # a spectator that catches up is sent the latest state, and one that doesn't is dropped
+        spectators[1].paused = True
+        spectators[2].paused = False
+        for _ in range(0, App.SPECTATOR_TIMEOUT * app.config.tick_rate() + 1):
+            room.tick()
+            app._broadcast(room)
+        assert protocol.decode(sent[3][0][FRAME_HEADER.size:]).tick == 2
+        assert aborted == [2]
+        assert spectators[1].room is None and set(room.spectators) == {1, 3}
@@ -0,0 +1,112 @@
+import pytest
+from python_bomberman.common import protocol
+from python_bomberman.common.game import batch
+from python_bomberman.common.game.clock import FastForwardClock
+from python_bomberman.common.game.entities import Player
+from python_bomberman.common.game.game import Game
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+from python_bomberman.server.interest import InterestGrid
+from python_bomberman.server.room import Connection, Room
+
+
+class TestSuite:
+    @pytest.fixture
+    def game(self):
+        # 40x24: 5x3 chunks
+        game_map = map.arena_map(Coordinate(40, 24), .5, 4, 0)
+        return Game(game_map, clock=FastForwardClock(step=1 / 60))
+
+    def test_visible_cells(self, game):
+        board = game.board
+        grid = InterestGrid(board, view_radius=2, margin=0)
+        assert grid.visible_cells((12, 12)) == {board.chunk((8, 8))}
+        assert grid.visible_cells((9, 12)) == {board.chunk((0, 8)), board.chunk((8, 8))}
+
+        # views wrap around the edges of the board
+        assert grid.visible_cells((0, 0)) == {
+            board.chunk((x, y)) for x in (32, 0) for y in (16, 0)
+        }
+        assert grid.visible_cells((39, 23)) == grid.visible_cells((0, 0))
+
+        # a view wider than the board sees all of it along that axis
+        grid = InterestGrid(board, view_radius=12, margin=0)
+        assert grid.visible_cells((20, 12)) == {board.chunk((x, y)) for x in (8, 16, 24, 32) for y in (0, 8, 16)}
+
+    def test_subscribers(self, game):
+        board = game.board
+        grid = InterestGrid(board, view_radius=2, margin=0)
+        grid.move(1, Coordinate(12, 12))
+        grid.move(2, Coordinate(12.2, 11.8))
+        assert grid.subscribers == {board.chunk((8, 8)): {1, 2}}
+
+        grid.move(1, Coordinate(20, 4))
+        assert grid.subscribers == {board.chunk((8, 8)): {2}, board.chunk((16, 0)): {1}}
+
+        grid.unsubscribe(2)
+        grid.unsubscribe(3)
+        assert grid.subscribers == {board.chunk((16, 0)): {1}}
+
+    def test_snapshots(self, game):
+        grid = InterestGrid(game.board, view_radius=3)
+        players = sorted(game.entities.of_type(Player), key=lambda player: player.unique_id)
+        for subscriber, player in enumerate(players):
+            grid.move(subscriber, player.physical_location)
+        game.step([batch.game_action(batch.DROP_BOMB, players[0].unique_id, False)])
+        game.step([])
+
+        everything = {state.unique_id: state for state in protocol.entity_states(game)}
+        snapshots = grid.snapshots(game)
+        for subscriber, player in enumerate(players):
+            snapshot = snapshots[subscriber]
+            assert player.unique_id in snapshot
+            assert len(snapshot) < len(everything)
+            cells = grid.cells(subscriber)
+            expected = {
+                unique_id: state for unique_id, state in everything.items()
+                if game.board.chunk((state.x, state.y)) in cells
+            }
+            assert snapshot == expected
+
+    def test_static_cache(self, game):
+        grid = InterestGrid(game.board, view_radius=2)
+        grid.move(1, Coordinate(12, 12))
+        cell = game.board.chunk((12, 12))
+        grid.snapshots(game)
+        cached = grid._static[cell]
+        grid.snapshots(game)
+        assert grid._static[cell] is cached
+
+        game.board.clear_chunk(cell)
+        grid.snapshots(game)
+        assert grid._static[cell] is not cached
+        assert grid._static[cell][1] == {}
+
+    def test_room(self):
+        game_map = map.arena_map(Coordinate(40, 24), .5, 4, 0)
+        room = Room("room", game_map, tick_rate=60, view_radius=3)
+        connections = [Connection(connection_id, send=lambda payload: None) for connection_id in range(1, 4)]
+        for connection in connections:
+            room.join(connection)
+        room.tick()
+        snapshots = room.snapshots()
+        assert set(snapshots) == {1, 2, 3}
+        for connection in connections:
+            assert connection.player_id in snapshots[connection.connection_id]
+
+        room.leave(connections[0])
+        assert 1 not in room.snapshots()
+        assert all(1 not in watching for watching in room.interest.subscribers.values())
+
+    def test_room_join_destroyed(self):
+        game_map = map.arena_map(Coordinate(40, 24), .5, 2, 0)
+        room = Room("room", game_map, tick_rate=60, view_radius=3)
+        first, second = room.game.map_players()
+        room.game.destroy(room.game.entities.get(first))
+        room.tick()
+
+        # the destroyed player is skipped, rather than subscribing a view around nothing
+        connections = [Connection(connection_id, send=lambda payload: None) for connection_id in range(1, 3)]
+        assert room.join(connections[0]) == second
+        assert room.interest.cells(1) == room.interest.visible_cells(room.game.entities.get(second).logical_location)
+        assert room.join(connections[1]) is None
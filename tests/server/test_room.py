@@ -0,0 +1,73 @@
+import pytest
+from python_bomberman.common.game import batch
+import python_bomberman.common.map as map
+from python_bomberman.common.utils import Coordinate
+from python_bomberman.server.room import Connection, Room
+
+
+class TestSuite:
+    @pytest.fixture
+    def room(self):
+        game_map = map.Map(Coordinate(5, 5), objects=[map.Player(Coordinate(0, 0)), map.Player(Coordinate(2, 2))])
+        return Room("room", game_map, tick_rate=4)
+
+    @pytest.fixture
+    def connections(self):
+        return [Connection(connection_id, send=lambda payload: None) for connection_id in range(1, 4)]
+
+    def test_join(self, room, connections):
+        first, second, third = connections
+        assert room.join(first) == room.game.board.get(Coordinate(0, 0)).entity.unique_id
+        assert room.join(second) == room.game.board.get(Coordinate(2, 2)).entity.unique_id
+        assert room.join(third) is None
+        assert first.room is room and third.room is None
+
+        room.leave(first)
+        assert first.room is None and first.player_id is None
+        assert room.join(third) == room.game.board.get(Coordinate(0, 0)).entity.unique_id
+
+    def test_join_destroyed(self, room, connections):
+        # players that are blown up before anyone claims them aren't handed out
+        first, second = connections[:2]
+        room.game.destroy(room.game.board.get(Coordinate(0, 0)).entity)
+        player_id = room.game.board.get(Coordinate(2, 2)).entity.unique_id
+        assert room.join(first) == player_id
+        assert room.join(second) is None
+
+        # and neither are ones blown up after they've been given back
+        room.leave(first)
+        room.game.destroy(room.game.entities.get(player_id))
+        room.tick()
+        assert room._free_players == []
+        assert room.join(second) is None and second.room is None
+
+    def test_tick(self, room, connections):
+        connection = connections[0]
+        room.join(connection)
+        connection.queue_input(batch.DROP_BOMB)
+        connection.queue_input(batch.MOVE_RIGHT)
+        room.tick()
+        assert room.ticks == 1
+        assert room.game.clock.now == .25
+        assert connection.inputs.empty()
+        assert room.game.board.get(Coordinate(0, 0)).has_bomb()
+        assert room.game.board.get(Coordinate(1, 0)).entity.unique_id == connection.player_id
+
+    def test_input_queue(self, connections):
+        connection = connections[0]
+        for _ in range(0, Connection.INPUT_QUEUE_SIZE + 3):
+            connection.queue_input(batch.NOOP)
+        assert connection.dropped_inputs == 3
+        assert len(connection.drain_inputs()) == Connection.INPUT_QUEUE_SIZE
+        assert connection.drain_inputs() == []
+
+    def test_spectate(self, room, connections):
+        player, spectator = connections[:2]
+        room.join(player)
+        room.spectate(spectator)
+        assert spectator.room is room and spectator.player_id is None
+        assert set(room.connections) == {1} and set(room.spectators) == {2}
+
+        room.leave(spectator)
+        assert spectator.room is None and room.spectators == {}
+        assert room.join(spectator) is not None